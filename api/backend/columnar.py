@@ -0,0 +1,154 @@
+"""
+Columnar exports for the summary and order list endpoints.
+
+    ?format=arrow     Arrow IPC stream (application/vnd.apache.arrow.stream)
+    ?format=parquet   Parquet file download (Content-Disposition: attachment)
+
+The column types come from the cursor description, not from the values:
+    integers -> int64           DECIMAL / FLOAT / DOUBLE -> float64
+    DATE -> date32              DATETIME / TIMESTAMP -> timestamp[us]
+    anything else -> string
+so every batch has the same schema even when a column is all NULL in it.
+
+Rows are read from an unbuffered cursor in BATCH_ROWS batches. The query
+runs before the response starts, so a failing query is still a 500. The
+Arrow stream writes each batch out as soon as it is built; an error after
+that can only end the stream early (logged), leaving a truncated body. Parquet has to finish
+its footer first, so it accumulates row groups in memory. Pandas reads
+either without parsing JSON:
+
+    pa.ipc.open_stream(resp.content).read_pandas()
+    pd.read_parquet(io.BytesIO(resp.content))
+
+pyarrow is optional. Without it these formats answer 406.
+"""
+from __future__ import annotations
+import datetime
+import io
+from typing import Iterator, Optional, Sequence
+
+from flask import Response, current_app, jsonify, request, stream_with_context
+from mysql.connector import FieldType
+
+from backend.db_connection import db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; requests for these formats get a 406
+    pa = pq = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+FORMATS = ("arrow", "parquet")
+BATCH_ROWS = 10_000
+
+_INT_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.LONG, FieldType.LONGLONG,
+              FieldType.INT24, FieldType.YEAR, FieldType.BIT}
+_FLOAT_TYPES = {FieldType.DECIMAL, FieldType.NEWDECIMAL, FieldType.FLOAT, FieldType.DOUBLE}
+_DATETIME_TYPES = {FieldType.DATETIME, FieldType.TIMESTAMP}
+
+
+def requested_format() -> Optional[str]:
+    """"arrow", "parquet" or None (plain JSON) from ?format=."""
+    fmt = (request.args.get("format") or "").strip().lower()
+    return fmt if fmt in FORMATS else None
+
+
+def _arrow_type(type_code):
+    if type_code in _INT_TYPES:
+        return pa.int64()
+    if type_code in _FLOAT_TYPES:
+        return pa.float64()
+    if type_code == FieldType.DATE:
+        return pa.date32()
+    if type_code in _DATETIME_TYPES:
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _schema(description) -> "pa.Schema":
+    return pa.schema([(d[0], _arrow_type(d[1])) for d in description])
+
+
+def _column(values: Sequence, typ) -> "pa.Array":
+    if pa.types.is_floating(typ):
+        values = [None if v is None else float(v) for v in values]
+    elif pa.types.is_string(typ):
+        values = [None if v is None else
+                  v.decode("utf-8", "replace") if isinstance(v, (bytes, bytearray)) else str(v)
+                  for v in values]
+    elif pa.types.is_date32(typ):
+        values = [v.date() if isinstance(v, datetime.datetime) else v for v in values]
+    return pa.array(values, type=typ)
+
+
+def _batches(query: str, params: tuple) -> Iterator["pa.RecordBatch"]:
+    """Yields the schema first, then one RecordBatch per BATCH_ROWS rows."""
+    conn = db.connect()
+    cursor = None
+    try:
+        cursor = conn.cursor()   # unbuffered, tuples
+        cursor.execute(query, params)
+        schema = _schema(cursor.description)
+        yield schema
+        while True:
+            rows = cursor.fetchmany(BATCH_ROWS)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [_column(col, field.type) for col, field in zip(columns, schema)], schema=schema
+            )
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass  # unread rows after a client disconnect; the pool rolls back / replaces it
+        conn.close()
+
+
+def _arrow_stream(schema: "pa.Schema", batches: Iterator) -> Iterator[bytes]:
+    sink = io.BytesIO()
+    try:
+        writer = pa.ipc.new_stream(sink, schema)
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+        writer.close()
+        yield sink.getvalue()
+    except Exception as e:
+        # status is already sent; log and end the stream early
+        current_app.logger.error(f"arrow export error: {e}")
+    finally:
+        batches.close()
+
+
+def export_response(fmt: str, query: str, params: Sequence = (), name: str = "export"):
+    """Answer with `query`'s rows as an Arrow IPC stream or a Parquet file."""
+    if pa is None:
+        return jsonify({"error": f"format={fmt} needs pyarrow on the server"}), 406
+    batches = _batches(query, tuple(params))
+    try:
+        schema = next(batches)   # runs the query: errors here surface as the route's 500
+    except BaseException:
+        batches.close()
+        raise
+    if fmt == "arrow":
+        resp = Response(stream_with_context(_arrow_stream(schema, batches)), mimetype=ARROW_STREAM)
+        resp.call_on_close(batches.close)   # also when the body is never iterated
+        return resp
+
+    sink = io.BytesIO()
+    try:
+        with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_batches([batch]))
+    finally:
+        batches.close()
+    resp = Response(sink.getvalue(), mimetype=PARQUET)
+    resp.headers["Content-Disposition"] = f'attachment; filename="{name}.parquet"'
+    return resp
@@ -0,0 +1,105 @@
+"""
+gzip / brotli response compression, negotiated from Accept-Encoding.
+
+An after_request hook compresses the body when all of these hold:
+
+    the client accepts br or gzip (br wins on equal q, when brotli is installed)
+    the body is at least COMPRESS_MIN_BYTES (small bodies grow or don't pay
+        for the CPU)
+    the mimetype is text-like: JSON, text/*, CSV, XML, JavaScript
+    the response isn't streamed (NDJSON, Arrow: see streaming.py,
+        columnar.py) and doesn't already carry a Content-Encoding
+    the status is 200-299 but not 204/206
+
+Compressible responses get "Vary: Accept-Encoding" whether or not they were
+compressed, so shared caches keep the variants apart. A strong ETag is
+weakened, because the bytes differ by encoding.
+
+The response cache stores uncompressed bodies; each hit is compressed for
+the client that asked. brotli is optional. Without it only gzip is offered.
+"""
+from __future__ import annotations
+import gzip
+from typing import Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+COMPRESSIBLE = (
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "application/problem+json", "image/svg+xml",
+)
+_SKIP_STATUS = (204, 206)
+
+
+class Compressor:
+    def __init__(self, enabled: bool = True, min_bytes: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def init_app(self, app) -> None:
+        self.enabled = bool(app.config.get("COMPRESS_ENABLED", self.enabled))
+        self.min_bytes = int(app.config.get("COMPRESS_MIN_BYTES", self.min_bytes))
+        self.gzip_level = int(app.config.get("COMPRESS_GZIP_LEVEL", self.gzip_level))
+        self.brotli_quality = int(app.config.get("COMPRESS_BROTLI_QUALITY", self.brotli_quality))
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    @property
+    def encodings(self):
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    @staticmethod
+    def compressible(mimetype: Optional[str]) -> bool:
+        return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE)
+
+    def _encoding(self) -> Optional[str]:
+        accept = request.accept_encodings
+        best = accept.best_match(self.encodings)
+        return best if best and accept[best] > 0 else None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    # ---------------------- hook ----------------------
+
+    def _after_request(self, response):
+        if not self.compressible(response.mimetype):
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or not 200 <= response.status_code < 300
+            or response.status_code in _SKIP_STATUS
+        ):
+            return response
+        length = response.content_length
+        if length is None or length < self.min_bytes:
+            return response
+        encoding = self._encoding()
+        if encoding is None:
+            return response
+
+        body = self.compress(response.get_data(), encoding)
+        if len(body) >= length:
+            return response
+        response.set_data(body)   # also resets Content-Length
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
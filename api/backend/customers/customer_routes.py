@@ -1,6 +1,10 @@
-import mysql.connector as mysql
 from flask import Blueprint, request, jsonify, current_app
 from mysql.connector import Error
+from backend.db_connection import db
+from backend.response_cache import cache
+from backend.spots.autocomplete import prefix_index
+from backend.customers.customer_search import search_customers
+from backend.pagination import CursorError, decode_cursor, page_limit, split_page
 from datetime import datetime
 
 # Blueprint setup
@@ -8,24 +12,12 @@ customer = Blueprint("customer", __name__, url_prefix="/customer")
 customer.strict_slashes = False
 
 
-def _get_database_connection():
-    """Get a fresh database connection using Flask config"""
-    cfg = current_app.config
-    return mysql.connect(
-        host=cfg.get("MYSQL_DATABASE_HOST", "127.0.0.1"),
-        port=int(cfg.get("MYSQL_DATABASE_PORT", 3306)),
-        user=cfg.get("MYSQL_DATABASE_USER", "root"),
-        password=cfg.get("MYSQL_DATABASE_PASSWORD", "changeme"),
-        database=cfg.get("MYSQL_DATABASE_DB", "SpotLight"),
-    )
-
-
 def _execute_query(query, params=None, fetch_one=False, fetch_all=False, dictionary=False):
     """Execute a database query with consistent error handling and connection management"""
     connection = None
     cursor = None
     try:
-        connection = _get_database_connection()
+        connection = db.connect()
         cursor = connection.cursor(dictionary=dictionary)
         cursor.execute(query, params or ())
         
@@ -51,16 +43,23 @@ def _execute_query(query, params=None, fetch_one=False, fetch_all=False, diction
             connection.close()
 
 
+_CUSTOMER_COLUMNS = (
+    "cID, fName, lName, email, position, companyName, "
+    "totalOrderTimes, VIP, avatarURL, balance, TEL"
+)
+
+# ids per batch request, and per IN (...) list
+BATCH_MAX_IDS = 5000
+BATCH_CHUNK = 1000
+
+
 @customer.route("/<int:c_id>", methods=["GET"])
+@cache.cached(ttl=60, tags=("customer:{c_id}",))
 def get_customer(c_id: int):
     """Get a specific customer by ID"""
-    query = (
-        "SELECT cID, fName, lName, email, position, companyName, "
-        "totalOrderTimes, VIP, avatarURL, balance, TEL "
-        "FROM Customers WHERE cID = %s"
-    )
+    query = f"SELECT {_CUSTOMER_COLUMNS} FROM Customers WHERE cID = %s"
     
-    result, error = _execute_query(query, (c_id,), fetch_one=True)
+    result, error = _execute_query(query, (c_id,), fetch_one=True, dictionary=True)
     
     if error:
         return jsonify({"error": error}), 500
@@ -71,6 +70,62 @@ def get_customer(c_id: int):
     return jsonify(result), 200
 
 
+def _batch_ids(raw):
+    """Parse ids from "1,2,3" or a JSON list into unique ints, keeping order"""
+    if isinstance(raw, str):
+        raw = [x for x in raw.split(",") if x.strip()]
+    if not isinstance(raw, list):
+        raise ValueError("ids must be a list or comma-separated string")
+    return list(dict.fromkeys(int(x) for x in raw))
+
+
+@customer.route("/batch", methods=["GET", "POST"])
+def get_customers_batch():
+    """
+    GET  /customer/batch?ids=1,2,3
+    POST /customer/batch  {"ids": [1, 2, 3]}   (for long lists)
+    Returns {"data": [customers in request order], "missing": [ids not found]}
+    """
+    if request.method == "POST":
+        raw = (request.get_json(silent=True) or {}).get("ids", [])
+    else:
+        raw = request.args.get("ids", "")
+    try:
+        ids = _batch_ids(raw)
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be integers"}), 400
+    if len(ids) > BATCH_MAX_IDS:
+        return jsonify({"error": f"at most {BATCH_MAX_IDS} ids per request"}), 400
+    if not ids:
+        return jsonify({"data": [], "missing": []}), 200
+
+    connection = cursor = None
+    try:
+        connection = db.connect()
+        cursor = connection.cursor(dictionary=True)
+        found = {}
+        for start in range(0, len(ids), BATCH_CHUNK):
+            chunk = ids[start:start + BATCH_CHUNK]
+            cursor.execute(
+                f"SELECT {_CUSTOMER_COLUMNS} FROM Customers WHERE cID IN ({', '.join(['%s'] * len(chunk))})",
+                tuple(chunk),
+            )
+            for row in cursor.fetchall():
+                found[row["cID"]] = row
+        return jsonify({
+            "data": [found[i] for i in ids if i in found],
+            "missing": [i for i in ids if i not in found],
+        }), 200
+    except Error as e:
+        current_app.logger.error(f"get_customers_batch error: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+
 @customer.route("/<int:c_id>", methods=["POST"])
 def update_customer(c_id: int):
     """Update a specific customer by ID"""
@@ -112,7 +167,18 @@ def update_customer(c_id: int):
         
         if error:
             return jsonify({"error": error}), 500
-        
+
+        # re-read rather than trust rowcount (0 for an unchanged row): a missing cID is a 404, not a phantom entry
+        row, error = _execute_query(
+            "SELECT fName, lName, companyName FROM Customers WHERE cID=%s", (c_id,), fetch_one=True, dictionary=True
+        )
+        if error:
+            return jsonify({"error": error}), 500
+        if not row:
+            return jsonify({"error": "Customer not found"}), 404
+
+        prefix_index.upsert_customer(c_id, row["fName"], row["lName"], row["companyName"])
+        cache.invalidate("customers", f"customer:{c_id}")
         return jsonify({"message": "updated", "cID": c_id}), 200
         
     except (ValueError, TypeError) as e:
@@ -132,39 +198,52 @@ def delete_customer(c_id: int):
     if error:
         return jsonify({"error": error}), 500
     
+    prefix_index.remove_customer(c_id)
+    cache.invalidate("customers", f"customer:{c_id}")
     return jsonify({"deleted": c_id, "rows_affected": rows_affected}), 200
 
 
 @customer.route("/", methods=["GET"])
 def list_customers():
-    """List customers with optional search functionality"""
+    """
+    GET /customer/?q=<name/email/company words, email or cID>&limit=200&cursor=<next_cursor>
+    Newest first; returns {"data": [...], "next_cursor": str|null}
+    """
     search_term = (request.args.get("q") or "").strip()
-    
-    if search_term:
-        query = """
-            SELECT cID, fName, lName, email, TEL
-            FROM Customers
-            WHERE fName LIKE %s OR lName LIKE %s OR email LIKE %s
-            ORDER BY cID DESC
-            LIMIT 200
-        """
-        like_pattern = f"%{search_term}%"
-        params = (like_pattern, like_pattern, like_pattern)
-    else:
-        query = """
-            SELECT cID, fName, lName, email, TEL 
-            FROM Customers 
-            ORDER BY cID DESC 
-            LIMIT 200
-        """
-        params = None
-    
-    result, error = _execute_query(query, params, fetch_all=True, dictionary=True)
-    
-    if error:
-        return jsonify({"error": error}), 500
-    
-    return jsonify(result), 200
+    try:
+        limit = page_limit(request.args.get("limit"), default=200)
+        token = (request.args.get("cursor") or "").strip()
+        before = decode_cursor(token, 1)[0] if token else None
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    columns = "cID, fName, lName, email, TEL"
+    connection = cursor = None
+    try:
+        connection = db.connect()
+        cursor = connection.cursor(dictionary=True)
+        if search_term:
+            rows = search_customers(cursor, search_term, columns, limit + 1, before_cid=before)
+        else:
+            query = f"SELECT {columns} FROM Customers"
+            params = []
+            if before is not None:
+                query += " WHERE cID < %s"
+                params.append(before)
+            cursor.execute(query + " ORDER BY cID DESC LIMIT %s", (*params, limit + 1))
+            rows = cursor.fetchall()
+        rows, next_cursor = split_page(rows, limit, key=lambda r: (r["cID"],))
+        return jsonify({"data": rows, "next_cursor": next_cursor}), 200
+    except Error as e:
+        current_app.logger.error(f"list_customers error: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
 
 @customer.route("/<int:c_id>/orders", methods=["GET"])
@@ -209,6 +288,7 @@ def add_funds(c_id: int):
         return jsonify({"error": err}), 500
     if not updated_rows:
         return jsonify({"error": "Customer not found"}), 404
+    cache.invalidate(f"customer:{c_id}")
 
     # Return the new balance
     sel_sql = "SELECT cID, balance FROM Customers WHERE cID = %s"
@@ -0,0 +1,74 @@
+"""
+Customer search shared by /customer/?q= and /o_and_m/search.
+
+    "1042"              -> cID = 1042                       (primary key)
+    "ann@acme.com"      -> email = 'ann@acme.com'           (idx_customers_email)
+    "ann acme"          -> MATCH(...) AGAINST ('+ann* +acme*' IN BOOLEAN MODE)
+                           over ft_customer_search (fName, lName, email, companyName)
+
+Every word must match as a word prefix. Words shorter than InnoDB's
+minimum token size aren't in the FULLTEXT index, so they become anchored
+LIKE 'xx%' conditions on the names instead of a '%xx%' scan. When an exact
+cID/email lookup finds nothing, the query is retried as a word search.
+"""
+from __future__ import annotations
+import re
+from typing import Any, List, Optional, Tuple
+
+MIN_FT_TOKEN = 3   # innodb_ft_min_token_size
+_WORD = re.compile(r"\w+", re.UNICODE)
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def word_clause(q: str) -> Tuple[Optional[str], List[Any]]:
+    """WHERE fragment + params for a word search, or (None, []) if q has no words."""
+    words = _WORD.findall(q)
+    long_words = [w for w in words if len(w) >= MIN_FT_TOKEN]
+    short_words = [w for w in words if len(w) < MIN_FT_TOKEN]
+    clauses: List[str] = []
+    params: List[Any] = []
+    if long_words:
+        clauses.append("MATCH(fName, lName, email, companyName) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(" ".join(f"+{w}*" for w in long_words))
+    for w in short_words:
+        clauses.append("(fName LIKE %s OR lName LIKE %s OR companyName LIKE %s)")
+        params += [f"{w}%"] * 3
+    if not clauses:
+        return None, []
+    return " AND ".join(clauses), params
+
+
+def exact_clause(q: str) -> Tuple[Optional[str], List[Any]]:
+    """cID / email fast path, or (None, []) if q is neither."""
+    if q.isdigit():
+        return "cID = %s", [int(q)]
+    if _EMAIL.match(q):
+        return "email = %s", [q]
+    return None, []
+
+
+def search_customers(cursor, q: str, columns: str, limit: int,
+                     before_cid: Optional[int] = None, hint: str = "") -> List[dict]:
+    """
+    Customers matching `q`, newest cID first, at most `limit` rows with
+    cID < before_cid when paging. `hint` is spliced in after SELECT
+    (e.g. a MAX_EXECUTION_TIME optimizer hint).
+    """
+    q = q.strip()
+    select = f"SELECT {hint + ' ' if hint else ''}{columns} FROM Customers WHERE "
+
+    exact_sql, exact_params = exact_clause(q)
+    if exact_sql and before_cid is None:
+        cursor.execute(select + exact_sql + " LIMIT %s", (*exact_params, limit))
+        rows = cursor.fetchall()
+        if rows:
+            return rows
+
+    where, params = word_clause(q)
+    if where is None:
+        return []
+    if before_cid is not None:
+        where += " AND cID < %s"
+        params.append(before_cid)
+    cursor.execute(select + where + " ORDER BY cID DESC LIMIT %s", (*params, limit))
+    return cursor.fetchall()
@@ -1,10 +1,227 @@
 #------------------------------------------------------------
 # This file creates a shared DB connection resource
 #------------------------------------------------------------
-from flaskext.mysql import MySQL
-from pymysql import cursors
+# Every blueprint borrows its MySQL connections from the single bounded pool
+# below instead of opening a fresh TCP + auth handshake per request.
+#
+#   conn = db.connect()     # borrow; conn.close() hands it back to the pool
+#   conn = db.get_db()      # one shared connection for the current request
+#
+# Connections borrowed inside a request that were never closed (early returns,
+# exceptions) are returned automatically when the app context tears down.
+#
+# Cursors are wrapped by the SQL profiler (see profiler.py), which times
+# every statement and logs slow ones with their EXPLAIN plan.
+import threading
+import time
+from collections import deque
 
+import mysql.connector as mysql
+from flask import g, has_app_context
+from mysql.connector.errors import PoolError
 
-# the parameter instructs the connection to return data
-# as a dictionary object.
-db = MySQL(cursorclass=cursors.DictCursor)
\ No newline at end of file
+from backend.db_connection.profiler import ProfiledCursor, profiler
+
+
+class PoolTimeoutError(PoolError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a mysql.connector connection.
+    close() returns the connection to its pool; everything else is delegated.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._closed = False
+        self._cursors = []
+        self._slow_statements = []
+
+    def cursor(self, *args, **kwargs):
+        if self._closed:
+            raise PoolError("connection already returned to the pool")
+        cur = profiler.wrap(self._raw.cursor(*args, **kwargs), self)
+        if isinstance(cur, ProfiledCursor) and len(self._cursors) < 64:
+            self._cursors.append(cur)
+        return cur
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            for cur in self._cursors:
+                cur._finish()
+            if self._slow_statements:
+                profiler.flush(self._raw, self._slow_statements)
+            self._cursors = self._slow_statements = []
+            self._pool._release(self._raw)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Bounded, lazily filled pool of MySQL connections.
+
+    - at most `size` connections exist at once; callers wait up to
+      `timeout` seconds for one to free up, then get PoolTimeoutError
+    - idle connections are pinged on borrow (when idle longer than
+      `ping_interval` seconds) and transparently replaced if dead
+    - any open transaction is rolled back when a connection is returned,
+      so the next borrower never sees a stale snapshot
+    """
+
+    def __init__(self, size=10, timeout=5.0, ping_interval=5.0):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self._connect_kwargs = {}
+        self._idle = deque()  # (raw_connection, returned_at)
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "borrowed": 0,
+            "returned": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    # ---------------------- setup ----------------------
+
+    def init_app(self, app):
+        cfg = app.config
+        self.size = int(cfg.get("MYSQL_POOL_SIZE", self.size))
+        self.timeout = float(cfg.get("MYSQL_POOL_TIMEOUT", self.timeout))
+        self.ping_interval = float(cfg.get("MYSQL_POOL_PING_INTERVAL", self.ping_interval))
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._connect_kwargs = {
+            "host": cfg.get("MYSQL_DATABASE_HOST", "127.0.0.1"),
+            "port": int(cfg.get("MYSQL_DATABASE_PORT", 3306)),
+            "user": cfg.get("MYSQL_DATABASE_USER", "root"),
+            "password": cfg.get("MYSQL_DATABASE_PASSWORD", "changeme"),
+            "database": cfg.get("MYSQL_DATABASE_DB", "SpotLight"),
+            "autocommit": False,
+        }
+        app.teardown_appcontext(self._teardown)
+
+    # ---------------------- borrow / return ----------------------
+
+    def connect(self):
+        """Borrow a connection. Call .close() on it to return it."""
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeoutError(
+                f"no database connection available within {self.timeout}s "
+                f"(pool size {self.size})"
+            )
+        try:
+            raw = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._stats["borrowed"] += 1
+            self._stats["wait_seconds_total"] += time.monotonic() - started
+
+        conn = PooledConnection(self, raw)
+        if has_app_context():
+            g.setdefault("_db_pool_borrowed", []).append(conn)
+        return conn
+
+    def get_db(self):
+        """Return the connection shared by the current request (flask-mysql style)."""
+        conn = g.get("_db_pool_request_conn")
+        if conn is None or conn.closed:
+            conn = self.connect()
+            g._db_pool_request_conn = conn
+        return conn
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+            if item is None:
+                return self._open()
+            raw, returned_at = item
+            if time.monotonic() - returned_at < self.ping_interval:
+                return raw
+            try:
+                raw.ping(reconnect=False)
+                return raw
+            except Exception:
+                with self._lock:
+                    self._stats["health_check_failures"] += 1
+                self._discard(raw)
+
+    def _open(self):
+        raw = mysql.connect(**self._connect_kwargs)
+        with self._lock:
+            self._stats["created"] += 1
+        return raw
+
+    def _release(self, raw):
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            raw = None
+        with self._lock:
+            if raw is not None:
+                self._idle.append((raw, time.monotonic()))
+            self._stats["returned"] += 1
+        self._slots.release()
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _teardown(self, exc):
+        for conn in g.pop("_db_pool_borrowed", []):
+            if not conn.closed:
+                conn.close()
+        g.pop("_db_pool_request_conn", None)
+
+    # ---------------------- introspection ----------------------
+
+    def stats(self):
+        with self._lock:
+            out = dict(self._stats)
+            idle = len(self._idle)
+        out["wait_seconds_total"] = round(out["wait_seconds_total"], 6)
+        out.update({
+            "size": self.size,
+            "timeout": self.timeout,
+            "idle": idle,
+            "in_use": out["borrowed"] - out["returned"],
+        })
+        return out
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _ in idle:
+            self._discard(raw)
+
+
+db = ConnectionPool()
@@ -0,0 +1,241 @@
+"""
+SQL profiler for every cursor handed out by the connection pool.
+
+PooledConnection.cursor() wraps the driver cursor in ProfiledCursor, which
+times execute()/executemany() plus the fetches that follow them. When the
+cursor runs its next statement, is closed, or its connection goes back to
+the pool, the statement is folded into per-fingerprint totals. A
+fingerprint is the SQL with literals, %s placeholders and IN (...) lists
+collapsed, so "WHERE cID IN (%s, %s)" and "WHERE cID IN (%s)" count as one.
+
+Statements slower than SQL_SLOW_MS are logged. With SQL_EXPLAIN_SLOW on,
+their EXPLAIN plan is logged too. The EXPLAIN runs on the same connection
+right before it is returned to the pool, after the route has read its
+results. The last few slow statements are kept for the admin endpoint:
+
+    GET    /o_and_m/admin/sql?top=20&order=total|max|count|avg
+    DELETE /o_and_m/admin/sql
+"""
+from __future__ import annotations
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+MAX_FINGERPRINTS = 1000
+OVERFLOW = "<other statements>"
+_EXPLAINABLE = ("select", "update", "delete", "insert", "replace", "with")
+
+_HINT = re.compile(r"/\*\+.*?\*/", re.S)
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_LIST = re.compile(r"\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*", re.I)
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Normalized form of a statement: literals -> ?, lists collapsed, whitespace squeezed."""
+    fp = _HINT.sub(" ", sql)
+    fp = _COMMENT.sub(" ", fp)
+    fp = _STRING.sub("?", fp)
+    fp = _PLACEHOLDER.sub("?", fp)
+    fp = _NUMBER.sub("?", fp)
+    fp = _IN_LIST.sub("IN (?+)", fp)
+    fp = _VALUES_LIST.sub(r"VALUES \1+", fp)
+    return _SPACE.sub(" ", fp).strip()
+
+
+class _Statement:
+    __slots__ = ("sql", "params", "seconds")
+
+    def __init__(self, sql, params, seconds):
+        self.sql = sql
+        self.params = params
+        self.seconds = seconds
+
+
+class ProfiledCursor:
+    """Cursor proxy that times statements and their fetches; everything else is delegated."""
+
+    def __init__(self, raw, profiler: "QueryProfiler", owner):
+        self._raw = raw
+        self._profiler = profiler
+        self._owner = owner
+        self._current: Optional[_Statement] = None
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return self._raw.execute(operation, params, *args, **kwargs)
+        finally:
+            self._current = _Statement(operation, params, time.perf_counter() - t0)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._finish()
+        t0 = time.perf_counter()
+        try:
+            return self._raw.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            self._current = _Statement(operation, None, time.perf_counter() - t0)
+
+    def _timed_fetch(self, name, *args):
+        t0 = time.perf_counter()
+        try:
+            return getattr(self._raw, name)(*args)
+        finally:
+            if self._current is not None:
+                self._current.seconds += time.perf_counter() - t0
+
+    def fetchone(self):
+        return self._timed_fetch("fetchone")
+
+    def fetchmany(self, *args):
+        return self._timed_fetch("fetchmany", *args)
+
+    def fetchall(self):
+        return self._timed_fetch("fetchall")
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def close(self):
+        self._finish()
+        return self._raw.close()
+
+    def _finish(self):
+        stmt, self._current = self._current, None
+        if stmt is not None and self._profiler.record(stmt.sql, stmt.seconds):
+            self._owner._slow_statements.append(stmt)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class QueryProfiler:
+    def __init__(self, enabled: bool = True, slow_ms: float = 200.0, explain: bool = True,
+                 keep_slow: int = 50):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.explain = explain
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, List[Any]] = {}   # fingerprint -> [count, total_s, max_s, sample sql]
+        self._fingerprints: Dict[str, str] = {}  # raw sql -> fingerprint
+        self._slow: deque = deque(maxlen=keep_slow)
+
+    def init_app(self, app) -> None:
+        self.enabled = bool(app.config.get("SQL_PROFILER_ENABLED", self.enabled))
+        self.slow_ms = float(app.config.get("SQL_SLOW_MS", self.slow_ms))
+        self.explain = bool(app.config.get("SQL_EXPLAIN_SLOW", self.explain))
+        self.logger = app.logger
+
+    def wrap(self, raw_cursor, owner):
+        return ProfiledCursor(raw_cursor, self, owner) if self.enabled else raw_cursor
+
+    # ---------------------- recording ----------------------
+
+    def _fingerprint(self, sql: str) -> str:
+        fp = self._fingerprints.get(sql)
+        if fp is None:
+            fp = fingerprint(sql)
+            if len(self._fingerprints) < 4 * MAX_FINGERPRINTS:
+                self._fingerprints[sql] = fp
+        return fp
+
+    def record(self, sql, seconds: float) -> bool:
+        """Fold one statement into the totals; True if it was slow."""
+        if isinstance(sql, (bytes, bytearray)):
+            sql = sql.decode("utf-8", "replace")
+        fp = self._fingerprint(sql)
+        with self._lock:
+            entry = self._stats.get(fp)
+            if entry is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    fp = OVERFLOW
+                    entry = self._stats.setdefault(fp, [0, 0.0, 0.0, ""])
+                else:
+                    entry = self._stats[fp] = [0, 0.0, 0.0, sql]
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+        return seconds * 1000 >= self.slow_ms
+
+    def flush(self, raw_connection, statements: List[_Statement]) -> None:
+        """Log slow statements (with EXPLAIN when possible) before the connection is reused."""
+        for stmt in statements:
+            sql = stmt.sql.decode("utf-8", "replace") if isinstance(stmt.sql, (bytes, bytearray)) else stmt.sql
+            plan = self._explain(raw_connection, sql, stmt.params) if self.explain else None
+            ms = round(stmt.seconds * 1000, 1)
+            self.logger.warning(f"slow query {ms} ms: {_SPACE.sub(' ', sql).strip()[:500]}"
+                                + (f" | plan: {plan}" if plan else ""))
+            with self._lock:
+                self._slow.append({
+                    "fingerprint": self._fingerprint(sql),
+                    "ms": ms,
+                    "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "plan": plan,
+                })
+
+    def _explain(self, raw_connection, sql: str, params) -> Optional[List[dict]]:
+        if not sql.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        try:
+            if getattr(raw_connection, "unread_result", False):
+                return None  # an unclosed cursor still has rows pending; EXPLAIN would fail
+            cur = raw_connection.cursor(buffered=True)
+            try:
+                cur.execute("EXPLAIN " + sql, params)
+                names = cur.column_names
+                return [dict(zip(names, row)) for row in cur.fetchall()]
+            finally:
+                cur.close()
+        except Exception as e:
+            self.logger.debug(f"EXPLAIN failed: {e}")
+            return None
+
+    # ---------------------- reporting ----------------------
+
+    def stats(self, top: int = 20, order: str = "total") -> dict:
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": fp,
+                    "count": count,
+                    "total_ms": round(total * 1000, 2),
+                    "avg_ms": round(total * 1000 / count, 3),
+                    "max_ms": round(peak * 1000, 2),
+                    "sample": sample[:500],
+                }
+                for fp, (count, total, peak, sample) in self._stats.items()
+            ]
+            slow = list(self._slow)
+        key = {"total": "total_ms", "max": "max_ms", "count": "count", "avg": "avg_ms"}[order]
+        rows.sort(key=lambda r: r[key], reverse=True)
+        return {
+            "enabled": self.enabled,
+            "slow_ms": self.slow_ms,
+            "fingerprints": len(rows),
+            "top": rows[:top],
+            "recent_slow": slow[::-1],
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+profiler = QueryProfiler()
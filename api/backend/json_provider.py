@@ -0,0 +1,56 @@
+"""
+orjson-backed JSON provider for the Flask app (set in create_app).
+
+jsonify() and returning dicts/lists from views go through app.json. Flask's
+default provider runs the stdlib encoder with a Python fallback for every
+Decimal/date value, and DictCursor rows are full of those (prices, order
+dates, endTimeOfCurrentOrder). orjson encodes straight to bytes in C.
+
+Wire format:
+    Decimal           -> JSON number (prices and totals are DECIMAL(10,2))
+    date / datetime   -> ISO 8601 ("2025-03-07", "2025-03-07T14:05:00")
+    timedelta (TIME)  -> "H:MM:SS"
+    numpy scalars/arrays, sets, bytes are handled as well
+
+If orjson isn't installed, create_app keeps Flask's default provider.
+"""
+from __future__ import annotations
+import datetime
+import decimal
+from typing import Any
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; see create_app
+    orjson = None
+
+_OPTIONS = 0 if orjson is None else (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime.timedelta):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", "replace")
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_OPTIONS)
+        return self._app.response_class(body, mimetype="application/json")
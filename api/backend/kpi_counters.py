@@ -0,0 +1,80 @@
+"""
+Readers for the trigger-maintained KpiCounters table
+(see database-files/03_kpi_counters.sql).
+
+The dashboards' metrics endpoints read their totals from here in one small
+primary-key lookup. Passing fresh=True first rebuilds the relevant counters
+from the base tables via the kpi_recount_* procedures.
+"""
+from __future__ import annotations
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable
+
+RECOUNT_PROCEDURES = {
+    "spots": "kpi_recount_spots",
+    "customers": "kpi_recount_customers",
+    "orders": "kpi_recount_orders",
+    "reviews": "kpi_recount_reviews",
+}
+
+
+def wants_fresh(args) -> bool:
+    """True for ?fresh=1 / true / yes."""
+    return (args.get("fresh") or "").strip().lower() in ("1", "true", "yes")
+
+
+def _num(v):
+    if isinstance(v, Decimal):
+        return int(v) if v == v.to_integral_value() else float(v)
+    return v
+
+
+def recount(connection, entities: Iterable[str]) -> None:
+    cursor = connection.cursor()
+    try:
+        for entity in entities:
+            cursor.callproc(RECOUNT_PROCEDURES[entity])
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def read_counters(connection, entities: Iterable[str], fresh: bool = False) -> Dict[str, object]:
+    """
+    Return {counter name: value} for the given entities
+    ("spots", "customers", "orders", "reviews"). Counters that were never
+    bumped are simply absent.
+    """
+    entities = list(entities)
+    if fresh:
+        recount(connection, entities)
+
+    prefixes = {"spots": ("spots_", "spot_status:"), "customers": ("customers_",),
+                "orders": ("orders_",), "reviews": ("reviews_",)}
+    likes = [p.replace("_", "\\_") + "%" for e in entities for p in prefixes[e]]
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT name, value FROM KpiCounters WHERE " + " OR ".join(["name LIKE %s"] * len(likes)),
+            tuple(likes),
+        )
+        return {name: _num(value) for name, value in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def spot_status_counts(counters: Dict[str, object]) -> Dict[str, int]:
+    """{status: count} from the spot_status:* counters ('' for NULL status)."""
+    prefix = "spot_status:"
+    return {k[len(prefix):]: v for k, v in counters.items() if k.startswith(prefix) and v}
+
+
+def avg_days_since_last_order(counters: Dict[str, object]) -> float:
+    """Average days since each ordering customer's most recent order."""
+    with_orders = counters.get("customers_with_orders", 0)
+    if not with_orders:
+        return 0
+    # MySQL TO_DAYS() counts from year 0, Python ordinals from year 1
+    today_days = date.today().toordinal() + 365
+    return today_days - counters.get("customers_last_order_days_sum", 0) / with_orders
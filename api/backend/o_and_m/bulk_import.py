@@ -0,0 +1,475 @@
+"""
+Streaming bulk import for /o_and_m/bulk_import.
+
+The request body is read incrementally (CSV, NDJSON, or a JSON array) and
+each record is validated against the entity's field spec. Valid rows are
+written in chunks with one executemany() per chunk and one transaction per
+chunk. If a chunk fails in the database it is rolled back and retried row
+by row, so a bad row only costs its own insert and shows up in the error
+report with its row number.
+"""
+from __future__ import annotations
+import codecs
+import csv
+import io
+import json
+import math
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from mysql.connector import Error
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+DEFAULT_MAX_ERRORS = 1000
+
+_READ_SIZE = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The body can't be parsed in the requested format."""
+
+
+class RowError(ValueError):
+    """A single record failed validation."""
+
+
+# ---------------------- field converters ----------------------
+
+def _text(max_len: int) -> Callable[[Any], str]:
+    def convert(v: Any) -> str:
+        s = str(v).strip()
+        if len(s) > max_len:
+            raise ValueError(f"longer than {max_len} characters")
+        return s
+    return convert
+
+
+def _decimal(v: Any) -> Decimal:
+    try:
+        d = Decimal(str(v).strip())
+    except InvalidOperation:
+        raise ValueError("not a number")
+    if not d.is_finite():
+        raise ValueError("not a number")
+    return d
+
+
+def _int(v: Any) -> int:
+    if isinstance(v, bool):
+        raise ValueError("not an integer")
+    if isinstance(v, float):
+        if not v.is_integer():
+            raise ValueError("not an integer")
+        return int(v)
+    try:
+        return int(str(v).strip())
+    except ValueError:
+        raise ValueError("not an integer")
+
+
+def _float_between(lo: float, hi: float) -> Callable[[Any], float]:
+    def convert(v: Any) -> float:
+        try:
+            f = float(v)
+        except (TypeError, ValueError):
+            raise ValueError("not a number")
+        if not lo <= f <= hi:
+            raise ValueError(f"must be between {lo} and {hi}")
+        return f
+    return convert
+
+
+def _date(v: Any) -> date:
+    try:
+        return date.fromisoformat(str(v).strip()[:10])
+    except ValueError:
+        raise ValueError("not a YYYY-MM-DD date")
+
+
+def _bool(v: Any) -> bool:
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().lower()
+    if s in ("1", "true", "yes", "y"):
+        return True
+    if s in ("0", "false", "no", "n"):
+        return False
+    raise ValueError("not a boolean")
+
+
+def _one_of(*choices: str) -> Callable[[Any], str]:
+    def convert(v: Any) -> str:
+        s = str(v).strip()
+        if s not in choices:
+            raise ValueError(f"must be one of {', '.join(choices)}")
+        return s
+    return convert
+
+
+# ---------------------- entity specs ----------------------
+
+@dataclass(frozen=True)
+class EntitySpec:
+    table: str
+    key: str                                  # primary key, required for updates
+    fields: Dict[str, Callable[[Any], Any]]   # column -> converter
+    required: Tuple[str, ...]                 # required for inserts
+    defaults: Dict[str, Any]                  # applied on insert when absent
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.fields)
+
+
+ENTITIES: Dict[str, EntitySpec] = {
+    "spots": EntitySpec(
+        table="Spot",
+        key="spotID",
+        fields={
+            "price": _decimal,
+            "contactTel": _text(20),
+            "imageURL": _text(100),
+            "estViewPerMonth": _int,
+            "monthlyRentCost": _decimal,
+            "endTimeOfCurrentOrder": _date,
+            "status": _one_of("free", "inuse", "w.issue", "planned"),
+            "address": _text(100),
+            "latitude": _float_between(-90.0, 90.0),
+            "longitude": _float_between(-180.0, 180.0),
+        },
+        required=("price", "address"),
+        defaults={"status": "free"},
+    ),
+    "customers": EntitySpec(
+        table="Customers",
+        key="cID",
+        fields={
+            "fName": _text(50),
+            "lName": _text(50),
+            "email": _text(50),
+            "position": _text(50),
+            "companyName": _text(50),
+            "totalOrderTimes": _int,
+            "VIP": _bool,
+            "avatarURL": _text(100),
+            "balance": _decimal,
+            "TEL": _text(20),
+        },
+        required=("fName", "lName", "email"),
+        defaults={"totalOrderTimes": 0, "VIP": False, "balance": 0},
+    ),
+    "orders": EntitySpec(
+        table="Orders",
+        key="orderID",
+        fields={"date": _date, "total": _decimal, "cID": _int},
+        required=("date", "total", "cID"),
+        defaults={},
+    ),
+}
+
+
+def _missing(v: Any) -> bool:
+    """Empty CSV cells, JSON null and pandas' NaN all count as 'not given'."""
+    if v is None:
+        return True
+    if isinstance(v, float) and math.isnan(v):
+        return True
+    return isinstance(v, str) and v.strip() == ""
+
+
+def validate(spec: EntitySpec, mode: str, record: Any) -> Dict[str, Any]:
+    """
+    Return {column: converted value} for one record, or raise RowError.
+    Inserts get every column (defaults / NULL for the absent ones); updates
+    only the columns present in the record, plus the key.
+    """
+    if not isinstance(record, dict):
+        raise RowError("record must be an object")
+
+    row: Dict[str, Any] = {}
+    problems: List[str] = []
+    for col, convert in spec.fields.items():
+        v = record.get(col)
+        if _missing(v):
+            if mode == "insert":
+                if col in spec.required:
+                    problems.append(f"{col}: required")
+                row[col] = spec.defaults.get(col)
+            continue
+        try:
+            row[col] = convert(v)
+        except ValueError as e:
+            problems.append(f"{col}: {e}")
+
+    if mode == "update":
+        key = record.get(spec.key)
+        if _missing(key):
+            problems.append(f"{spec.key}: required")
+        else:
+            try:
+                row[spec.key] = _int(key)
+            except ValueError as e:
+                problems.append(f"{spec.key}: {e}")
+        if not problems and len(row) == 1:
+            problems.append("no fields to update")
+
+    if problems:
+        raise RowError("; ".join(problems))
+    return row
+
+
+# ---------------------- body parsing ----------------------
+
+def detect_format(explicit: Optional[str], content_type: Optional[str]) -> str:
+    fmt = (explicit or "").strip().lower()
+    if not fmt:
+        ct = (content_type or "").lower()
+        if "csv" in ct:
+            fmt = "csv"
+        elif "ndjson" in ct or "jsonl" in ct or "json-seq" in ct:
+            fmt = "ndjson"
+        else:
+            fmt = "json"
+    if fmt not in ("csv", "json", "ndjson"):
+        raise ImportFormatError("format must be one of: csv, json, ndjson")
+    return fmt
+
+
+def _iter_csv(stream) -> Iterator[Any]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    except csv.Error as e:
+        raise ImportFormatError(f"CSV parse error: {e}")
+    finally:
+        text.detach()
+
+
+def _iter_ndjson(stream) -> Iterator[Any]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield RowError("invalid JSON line")
+
+
+def _iter_json_array(stream) -> Iterator[Any]:
+    """Decode the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    started = False
+    need_value = False   # just after a comma
+    have_value = False   # just after an element
+    eof = False
+
+    while True:
+        # skip whitespace and separators, refilling as needed
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = stream.read(_READ_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + reader.decode(chunk, final=eof)
+            pos = 0
+        if pos >= len(buf):
+            raise ImportFormatError("unexpected end of JSON body")
+
+        ch = buf[pos]
+        if not started:
+            if ch == "{":  # a single object is accepted as a one-row import
+                buf, pos = buf[pos:] + reader.decode(stream.read(), final=True), 0
+                try:
+                    yield json.loads(buf)
+                except ValueError as e:
+                    raise ImportFormatError(f"JSON parse error: {e}")
+                return
+            if ch != "[":
+                raise ImportFormatError("JSON body must be an array of objects")
+            started = True
+            pos += 1
+            continue
+        if ch == "]" and not need_value:
+            return
+        if ch == "," and have_value:
+            need_value, have_value = True, False
+            pos += 1
+            continue
+        if have_value or ch in ",]":
+            raise ImportFormatError("JSON parse error: expected ',' or ']' between elements")
+
+        # decode one element, reading more input until it is complete
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end == len(buf) and not eof:
+                    raise ValueError("maybe truncated number")
+                break
+            except ValueError as e:
+                if eof:
+                    raise ImportFormatError(f"JSON parse error: {e}")
+                chunk = stream.read(_READ_SIZE)
+                eof = not chunk
+                buf = buf[pos:] + reader.decode(chunk, final=eof)
+                pos = 0
+        yield value
+        pos = end
+        need_value, have_value = False, True
+        if pos > _READ_SIZE:
+            buf, pos = buf[pos:], 0
+
+
+def iter_records(stream, fmt: str) -> Iterator[Any]:
+    if fmt == "csv":
+        return _iter_csv(stream)
+    if fmt == "ndjson":
+        return _iter_ndjson(stream)
+    return _iter_json_array(stream)
+
+
+# ---------------------- writing ----------------------
+
+class ImportReport:
+    def __init__(self, max_errors: int = DEFAULT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.received = 0
+        self.written = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.aborted: Optional[str] = None   # body stopped parsing part-way
+
+    def error(self, row_no: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_no, "error": message})
+
+    def as_dict(self, entity: str, mode: str, dry_run: bool) -> Dict[str, Any]:
+        return {
+            "entity": entity,
+            "mode": mode,
+            "dry_run": dry_run,
+            "received": self.received,
+            "updated" if mode == "update" else "inserted": self.written,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "aborted": self.aborted,
+        }
+
+
+def _insert_sql(spec: EntitySpec) -> str:
+    cols = spec.columns
+    return (
+        f"INSERT INTO {spec.table} ({', '.join(cols)}) "
+        f"VALUES ({', '.join(['%s'] * len(cols))})"
+    )
+
+
+def _update_sql(spec: EntitySpec, cols: Tuple[str, ...]) -> str:
+    assignments = ", ".join(f"{c}=%s" for c in cols)
+    return f"UPDATE {spec.table} SET {assignments} WHERE {spec.key}=%s"
+
+
+def _statements(spec: EntitySpec, mode: str, rows: List[Tuple[int, Dict[str, Any]]]
+                ) -> List[Tuple[str, List[Tuple[int, tuple]]]]:
+    """Group a chunk into (sql, [(row_no, params), ...]) batches."""
+    if mode == "insert":
+        cols = spec.columns
+        return [(_insert_sql(spec), [(n, tuple(r[c] for c in cols)) for n, r in rows])]
+    groups: Dict[Tuple[str, ...], List[Tuple[int, tuple]]] = {}
+    for n, r in rows:
+        cols = tuple(c for c in spec.columns if c in r)
+        groups.setdefault(cols, []).append((n, tuple(r[c] for c in cols) + (r[spec.key],)))
+    return [(_update_sql(spec, cols), batch) for cols, batch in groups.items()]
+
+
+def _existing_keys(cursor, spec: EntitySpec, keys: List[int]) -> set:
+    cursor.execute(
+        f"SELECT {spec.key} FROM {spec.table} WHERE {spec.key} IN ({', '.join(['%s'] * len(keys))})",
+        tuple(keys),
+    )
+    return {int(r[0]) for r in cursor.fetchall()}
+
+
+def _write_chunk(connection, spec: EntitySpec, mode: str,
+                 rows: List[Tuple[int, Dict[str, Any]]], report: ImportReport) -> None:
+    cursor = connection.cursor()
+    try:
+        if mode == "update":
+            found = _existing_keys(cursor, spec, sorted({r[spec.key] for _, r in rows}))
+            for n, r in rows:
+                if r[spec.key] not in found:
+                    report.error(n, f"{spec.key} {r[spec.key]} not found")
+            rows = [(n, r) for n, r in rows if r[spec.key] in found]
+            if not rows:
+                connection.rollback()
+                return
+
+        statements = _statements(spec, mode, rows)
+        try:
+            for sql, batch in statements:
+                cursor.executemany(sql, [params for _, params in batch])
+            connection.commit()
+            report.written += len(rows)
+            return
+        except Error:
+            connection.rollback()
+
+        # the chunk failed as a whole: redo it row by row to find the culprits
+        for sql, batch in statements:
+            for n, params in batch:
+                try:
+                    cursor.execute(sql, params)
+                    connection.commit()
+                    report.written += 1
+                except Error as e:
+                    connection.rollback()
+                    report.error(n, getattr(e, "msg", None) or str(e))
+    finally:
+        cursor.close()
+
+
+def run_import(connection, entity: str, mode: str, records: Iterable[Any],
+               chunk_size: int = DEFAULT_CHUNK_SIZE, dry_run: bool = False,
+               max_errors: int = DEFAULT_MAX_ERRORS) -> ImportReport:
+    """Validate `records` and write them in chunks of `chunk_size` rows."""
+    spec = ENTITIES[entity]
+    report = ImportReport(max_errors)
+    pending: List[Tuple[int, Dict[str, Any]]] = []
+
+    def flush():
+        if pending and not dry_run:
+            _write_chunk(connection, spec, mode, pending, report)
+        elif pending:
+            report.written += len(pending)
+        report.chunks += 1 if pending else 0
+        pending.clear()
+
+    try:
+        for row_no, record in enumerate(records, start=1):
+            report.received += 1
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                pending.append((row_no, validate(spec, mode, record)))
+            except RowError as e:
+                report.error(row_no, str(e))
+                continue
+            if len(pending) >= chunk_size:
+                flush()
+    except (ImportFormatError, UnicodeDecodeError) as e:
+        # rows parsed before the bad spot are still written
+        report.aborted = str(e)
+    flush()
+    return report
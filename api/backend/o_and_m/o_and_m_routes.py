@@ -1,30 +1,31 @@
-import mysql.connector as mysql
 from flask import Blueprint, request, jsonify, current_app
 from mysql.connector import Error
+from backend.db_connection import db
+from backend.spots.geo_index import spot_index
+from backend.spots.address_index import address_index
+from backend.spots.autocomplete import prefix_index
+from backend.o_and_m.search import fan_out
+from backend.response_cache import cache
+from backend.request_metrics import request_metrics
+from backend.db_connection.profiler import profiler
+from backend.streaming import ndjson_response, wants_stream
+from backend.columnar import export_response, requested_format
+from backend.o_and_m import bulk_import as importer
+from backend.kpi_counters import (
+    avg_days_since_last_order, read_counters, spot_status_counts, wants_fresh,
+)
 from datetime import datetime, timedelta
 
 
 o_and_m = Blueprint("o_and_m", __name__)
 
 
-def _get_database_connection():
-    """Get a fresh database connection using Flask config"""
-    cfg = current_app.config
-    return mysql.connect(
-        host=cfg.get("MYSQL_DATABASE_HOST", "127.0.0.1"),
-        port=int(cfg.get("MYSQL_DATABASE_PORT", 3306)),
-        user=cfg.get("MYSQL_DATABASE_USER", "root"),
-        password=cfg.get("MYSQL_DATABASE_PASSWORD", "changeme"),
-        database=cfg.get("MYSQL_DATABASE_DB", "SpotLight"),
-    )
-
-
 def _execute_query(query, params=None, fetch_one=False, fetch_all=False, dictionary=False):
     """Execute a database query with consistent error handling and connection management"""
     connection = None
     cursor = None
     try:
-        connection = _get_database_connection()
+        connection = db.connect()
         cursor = connection.cursor(dictionary=dictionary)
         cursor.execute(query, params or ())
         
@@ -65,68 +66,28 @@ def _parse_period_days(period_param: str, default_days: int = 90) -> int:
 
 @o_and_m.route("/search", methods=["GET"])
 def full_db_search():
-    """Search across all entities (spots, customers, orders)"""
+    """
+    Search across all entities (spots, customers, orders). The three
+    sub-searches run in parallel; any that miss the deadline (?timeout_ms=,
+    default SEARCH_TIMEOUT_MS) come back empty and are listed in timed_out,
+    with partial=true.
+    """
     try:
         q = request.args.get("query", "").strip()
         if not q:
-            return jsonify({"spots": [], "customers": [], "orders": []}), 200
+            return jsonify({"spots": [], "customers": [], "orders": [], "partial": False, "timed_out": []}), 200
+        timeout_ms = request.args.get("timeout_ms", type=int)
+        if timeout_ms is not None:
+            timeout_ms = max(50, min(30000, timeout_ms))
+
+        results, timed_out, errors = fan_out.search(q, current_app.logger, timeout_ms)
+        body = {**results, "partial": bool(timed_out or errors), "timed_out": timed_out}
+        if errors:
+            if len(errors) == len(results):
+                return jsonify({"error": next(iter(errors.values()))}), 500
+            body["errors"] = errors
+        return jsonify(body), 200
 
-        connection = _get_database_connection()
-        cursor = connection.cursor()
-        
-        # Search spots: use FULLTEXT on address when possible, also fallback to LIKE
-        spots = []
-        try:
-            spots_query = (
-                "SELECT spotID, address, status, price, estViewPerMonth, monthlyRentCost "
-                "FROM Spot WHERE MATCH(address) AGAINST (%s IN NATURAL LANGUAGE MODE) "
-                "OR address LIKE %s LIMIT 20"
-            )
-            cursor.execute(spots_query, (q, f"%{q}%"))
-            spots = cursor.fetchall()
-        except Error:
-            # In case MATCH is unsupported in current mode
-            fallback_query = (
-                "SELECT spotID, address, status, price, estViewPerMonth, monthlyRentCost "
-                "FROM Spot WHERE address LIKE %s LIMIT 20"
-            )
-            cursor.execute(fallback_query, (f"%{q}%",))
-            spots = cursor.fetchall()
-
-        # Search customers: search by name/email/company
-        customers_query = (
-            "SELECT cID, fName, lName, email, companyName, VIP "
-            "FROM Customers "
-            "WHERE fName LIKE %s OR lName LIKE %s OR email LIKE %s OR companyName LIKE %s "
-            "LIMIT 20"
-        )
-        cursor.execute(customers_query, (f"%{q}%", f"%{q}%", f"%{q}%", f"%{q}%"))
-        customers = cursor.fetchall()
-
-        # Search orders: if numeric, try exact match on orderID or cID; else search by date string
-        orders = []
-        if q.isdigit():
-            orders_query = (
-                "SELECT orderID, date, total, cID "
-                "FROM Orders WHERE orderID = %s OR cID = %s LIMIT 20"
-            )
-            cursor.execute(orders_query, (int(q), int(q)))
-            orders = cursor.fetchall()
-        else:
-            orders_query = (
-                "SELECT orderID, date, total, cID "
-                "FROM Orders WHERE DATE_FORMAT(date, '%%Y-%%m-%%d') LIKE %s LIMIT 20"
-            )
-            cursor.execute(orders_query, (f"%{q}%",))
-            orders = cursor.fetchall()
-
-        cursor.close()
-        connection.close()
-        return jsonify({"spots": spots, "customers": customers, "orders": orders}), 200
-        
-    except Error as e:
-        current_app.logger.error(f"full_db_search error: {e}")
-        return jsonify({"error": str(e)}), 500
     except Exception as e:
         current_app.logger.error(f"full_db_search unexpected error: {e}")
         return jsonify({"error": "Internal server error"}), 500
@@ -150,6 +111,12 @@ def insert_data():
             status = payload.get("status", "free")
             if status not in ("free", "inuse", "w.issue", "planned"):
                 return jsonify({"error": "Invalid status"}), 400
+            # convert before the INSERT: the index needs floats, and a bad value must not create the row
+            try:
+                lat, lon = (None if payload.get(k) in (None, "") else float(payload[k])
+                            for k in ("latitude", "longitude"))
+            except (TypeError, ValueError):
+                return jsonify({"error": "latitude and longitude must be numbers"}), 400
             
             query = (
                 "INSERT INTO Spot (price, contactTel, imageURL, estViewPerMonth, monthlyRentCost, "
@@ -165,17 +132,21 @@ def insert_data():
                 payload.get("endTimeOfCurrentOrder"),
                 status,
                 payload["address"],
-                payload.get("latitude"),
-                payload.get("longitude"),
+                lat,
+                lon,
             )
             
-            connection = _get_database_connection()
+            connection = db.connect()
             cursor = connection.cursor()
             cursor.execute(query, data)
             connection.commit()
             new_id = cursor.lastrowid
             cursor.close()
             connection.close()
+            spot_index.upsert(new_id, lat, lon, status, payload["address"])
+            address_index.upsert(new_id, payload["address"])
+            prefix_index.upsert_spot(new_id, payload["address"])
+            cache.invalidate("spots")
             return jsonify({"message": "created", "spotID": new_id}), 201
 
         elif entity == "customer":
@@ -201,13 +172,15 @@ def insert_data():
                 payload.get("TEL"),
             )
             
-            connection = _get_database_connection()
+            connection = db.connect()
             cursor = connection.cursor()
             cursor.execute(query, data)
             connection.commit()
             new_id = cursor.lastrowid
             cursor.close()
             connection.close()
+            prefix_index.upsert_customer(new_id, payload["fName"], payload["lName"], payload.get("companyName"))
+            cache.invalidate("customers")
             return jsonify({"message": "created", "cID": new_id}), 201
 
         elif entity == "order":
@@ -219,13 +192,14 @@ def insert_data():
             query = "INSERT INTO Orders (date, total, cID) VALUES (%s, %s, %s)"
             data = (payload["date"], payload["total"], payload["cID"])
             
-            connection = _get_database_connection()
+            connection = db.connect()
             cursor = connection.cursor()
             cursor.execute(query, data)
             connection.commit()
             new_id = cursor.lastrowid
             cursor.close()
             connection.close()
+            cache.invalidate("orders")
             return jsonify({"message": "created", "orderID": new_id}), 201
 
         else:
@@ -239,123 +213,142 @@ def insert_data():
         return jsonify({"error": "Internal server error"}), 500
 
 
-@o_and_m.route("/spots/metrics", methods=["GET"])
-def get_spots_metrics():
-    """Get metrics for all spots"""
+@o_and_m.route("/bulk_import", methods=["POST"])
+def bulk_import():
+    """
+    Bulk insert/update spots, customers or orders from a CSV, NDJSON or JSON
+    array body: ?entity=spots&mode=insert|update[&format=csv][&chunk_size=1000][&dry_run=1]
+    """
+    entity = (request.args.get("entity") or "").strip().lower()
+    entity = {"spot": "spots", "customer": "customers", "order": "orders"}.get(entity, entity)
+    if entity not in importer.ENTITIES:
+        return jsonify({"error": "Unsupported entity. Use one of: spots, customers, orders"}), 400
+    mode = (request.args.get("mode") or "insert").strip().lower()
+    if mode not in ("insert", "update"):
+        return jsonify({"error": "mode must be insert or update"}), 400
     try:
-        connection = _get_database_connection()
-        cursor = connection.cursor(dictionary=True)
-
-        cursor.execute("SELECT COUNT(*) AS total FROM Spot")
-        total = cursor.fetchone()["total"]
+        fmt = importer.detect_format(request.args.get("format"), request.content_type)
+        chunk_size = max(1, min(importer.MAX_CHUNK_SIZE,
+                                int(request.args.get("chunk_size", importer.DEFAULT_CHUNK_SIZE))))
+        max_errors = max(0, int(request.args.get("max_errors", importer.DEFAULT_MAX_ERRORS)))
+    except importer.ImportFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "chunk_size and max_errors must be integers"}), 400
+    dry_run = (request.args.get("dry_run") or "").strip().lower() in ("1", "true", "yes")
 
-        cursor.execute("SELECT COUNT(*) AS cnt FROM Spot WHERE status = 'inuse'")
-        in_use = cursor.fetchone()["cnt"]
+    connection = None
+    try:
+        connection = db.connect()
+        report = importer.run_import(
+            connection, entity, mode,
+            importer.iter_records(request.stream, fmt),
+            chunk_size=chunk_size, dry_run=dry_run, max_errors=max_errors,
+        )
+        if report.written and not dry_run:
+            reload = {"spots": (spot_index, address_index, prefix_index), "customers": (prefix_index,)}
+            for index in reload.get(entity, ()):
+                if index.loaded:
+                    index.load(connection)
+            cache.invalidate(entity, f"{entity[:-1]}:*")
+    except Error as e:
+        current_app.logger.error(f"bulk_import error: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if connection:
+            connection.close()
 
-        cursor.execute("SELECT COUNT(*) AS cnt FROM Spot WHERE status = 'free'")
-        free = cursor.fetchone()["cnt"]
+    body = report.as_dict(entity, mode, dry_run)
+    if report.aborted and not report.received:
+        return jsonify({"error": report.aborted, **body}), 400
+    return jsonify(body), 200
 
-        cursor.execute("SELECT COUNT(*) AS cnt FROM Spot WHERE status = 'w.issue'")
-        with_issue = cursor.fetchone()["cnt"]
 
-        cursor.close()
+def _kpi_counters(*entities):
+    """Read KpiCounters for `entities`, recounting first when ?fresh=1"""
+    connection = db.connect()
+    try:
+        return read_counters(connection, entities, fresh=wants_fresh(request.args))
+    finally:
         connection.close()
-        
+
+
+@o_and_m.route("/spots/metrics", methods=["GET"])
+@cache.cached(ttl=15, tags=("spots",))
+def get_spots_metrics():
+    """Get metrics for all spots (from KpiCounters; ?fresh=1 forces a recount)"""
+    try:
+        counters = _kpi_counters("spots")
+        counts = spot_status_counts(counters)
+
         return jsonify({
-            "total": total,
-            "in_use": in_use,
-            "free": free,
-            "with_issue": with_issue,
+            "total": counters.get("spots_total", 0),
+            "in_use": counts.get("inuse", 0),
+            "free": counts.get("free", 0),
+            "with_issue": counts.get("w.issue", 0),
+            "planned": counts.get("planned", 0),
         }), 200
-        
+
     except Error as e:
         current_app.logger.error(f"get_spots_metrics error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
 @o_and_m.route("/customers/metrics", methods=["GET"])
+@cache.cached(ttl=15, tags=("customers", "orders"))
 def get_customers_metrics():
-    """Get metrics for all customers"""
+    """Get metrics for all customers (from KpiCounters; ?fresh=1 forces a recount)"""
     try:
-        connection = _get_database_connection()
-        cursor = connection.cursor(dictionary=True)
-
-        cursor.execute("SELECT COUNT(*) AS total FROM Customers")
-        total = cursor.fetchone()["total"]
-
-        cursor.execute("SELECT COUNT(*) AS vip FROM Customers WHERE VIP = 1")
-        vip = cursor.fetchone()["vip"]
-
-        cursor.execute(
-            "SELECT COUNT(*) AS never_ordered FROM Customers c "
-            "LEFT JOIN Orders o ON o.cID = c.cID WHERE o.orderID IS NULL"
-        )
-        never_ordered = cursor.fetchone()["never_ordered"]
-
-        # Average days since last order across customers having at least 1 order
-        cursor.execute(
-            "SELECT AVG(days_since) AS avg_days FROM ("
-            "  SELECT DATEDIFF(CURDATE(), MAX(o.date)) AS days_since"
-            "  FROM Orders o GROUP BY o.cID"
-            ") t"
-        )
-        row = cursor.fetchone()
-        avg_order_time = row["avg_days"] if row and row["avg_days"] is not None else 0
+        counters = _kpi_counters("customers")
+        total = counters.get("customers_total", 0)
 
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "total": total,
-            "vip": vip,
-            "never_ordered": never_ordered,
-            "avg_order_time": avg_order_time,
+            "vip": counters.get("customers_vip", 0),
+            "never_ordered": max(0, total - counters.get("customers_with_orders", 0)),
+            "avg_order_time": avg_days_since_last_order(counters),
         }), 200
-        
+
     except Error as e:
         current_app.logger.error(f"get_customers_metrics error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
 @o_and_m.route("/orders/metrics", methods=["GET"])
+@cache.cached(ttl=15, tags=("orders",))
 def get_orders_metrics():
     """Get metrics for all orders with optional time period"""
     try:
         period_param = request.args.get("period", "90d")
         days = _parse_period_days(period_param, 90)
 
-        connection = _get_database_connection()
-        cursor = connection.cursor(dictionary=True)
+        counters = _kpi_counters("orders")
+        total = counters.get("orders_total", 0)
+        avg_price = counters.get("orders_amount_sum", 0) / total if total else None
 
-        cursor.execute("SELECT COUNT(*) AS total FROM Orders")
-        total = cursor.fetchone()["total"]
-
-        cursor.execute("SELECT AVG(total) AS avg_price FROM Orders")
-        avg_price = cursor.fetchone()["avg_price"]
-
-        cursor.execute(
+        # period-dependent, so not a counter: a range scan on idx_orders_date_page
+        row, error = _execute_query(
             "SELECT COUNT(*) AS last_period FROM Orders WHERE date >= (CURDATE() - INTERVAL %s DAY)",
-            (days,),
+            (days,), fetch_one=True, dictionary=True,
         )
-        last_period = cursor.fetchone()["last_period"]
+        if error:
+            return jsonify({"error": error}), 500
 
-        cursor.close()
-        connection.close()
-        
         return jsonify({
             "total": total,
             "avg_price": avg_price,
-            "last_period": last_period,
+            "last_period": row["last_period"],
         }), 200
-        
+
     except Error as e:
         current_app.logger.error(f"get_orders_metrics error: {e}")
         return jsonify({"error": str(e)}), 500
 
 
 @o_and_m.route("/spots/summary", methods=["GET"])
+@cache.cached(ttl=30, tags=("spots",))
 def spots_summary():
-    """Get summary of recent spots"""
+    """Get summary of recent spots (?format=arrow|parquet for a columnar export)"""
     try:
         limit = int(request.args.get("limit", 10))
         
@@ -363,8 +356,11 @@ def spots_summary():
             "SELECT spotID, address, status, price, estViewPerMonth, monthlyRentCost "
             "FROM Spot ORDER BY spotID DESC LIMIT %s"
         )
-        
-        result, error = _execute_query(query, (limit,), fetch_all=True)
+        fmt = requested_format()
+        if fmt:
+            return export_response(fmt, query, (limit,), "spots_summary")
+
+        result, error = _execute_query(query, (limit,), fetch_all=True, dictionary=True)
         
         if error:
             return jsonify({"error": error}), 500
@@ -379,8 +375,9 @@ def spots_summary():
 
 
 @o_and_m.route("/customers/summary", methods=["GET"])
+@cache.cached(ttl=30, tags=("customers",))
 def customers_summary():
-    """Get summary of recent customers"""
+    """Get summary of recent customers (?format=arrow|parquet for a columnar export)"""
     try:
         limit = int(request.args.get("limit", 10))
         
@@ -388,8 +385,11 @@ def customers_summary():
             "SELECT cID, fName, lName, email, companyName, VIP, totalOrderTimes "
             "FROM Customers ORDER BY cID DESC LIMIT %s"
         )
-        
-        result, error = _execute_query(query, (limit,), fetch_all=True)
+        fmt = requested_format()
+        if fmt:
+            return export_response(fmt, query, (limit,), "customers_summary")
+
+        result, error = _execute_query(query, (limit,), fetch_all=True, dictionary=True)
         
         if error:
             return jsonify({"error": error}), 500
@@ -404,8 +404,13 @@ def customers_summary():
 
 
 @o_and_m.route("/orders/summary", methods=["GET"])
+@cache.cached(ttl=30, tags=("orders",))
 def orders_summary():
-    """Get summary of recent orders within a time period"""
+    """
+    Get summary of recent orders within a time period.
+    ?stream=1 (or Accept: application/x-ndjson) streams the rows as NDJSON;
+    ?format=arrow|parquet returns them as an Arrow stream / Parquet file.
+    """
     try:
         period_param = request.args.get("period", "90d")
         days = _parse_period_days(period_param, 90)
@@ -416,8 +421,13 @@ def orders_summary():
             "FROM Orders WHERE date >= (CURDATE() - INTERVAL %s DAY) "
             "ORDER BY date DESC, orderID DESC LIMIT %s"
         )
-        
-        result, error = _execute_query(query, (days, limit), fetch_all=True)
+        fmt = requested_format()
+        if fmt:
+            return export_response(fmt, query, (days, limit), "orders_summary")
+        if wants_stream():
+            return ndjson_response(query, (days, limit))
+
+        result, error = _execute_query(query, (days, limit), fetch_all=True, dictionary=True)
         
         if error:
             return jsonify({"error": error}), 500
@@ -466,4 +476,71 @@ def update_report_status(r_id: int):
         
     except Exception as e:
         current_app.logger.error(f"update_report_status error: {e}")
-        return jsonify({"error": "Internal server error"}), 500
\ No newline at end of file
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@o_and_m.route("/admin/db_pool", methods=["GET"])
+def db_pool_stats():
+    """Connection pool statistics (size, in use, idle, timeouts, ...)"""
+    return jsonify(db.stats()), 200
+
+
+@o_and_m.route("/admin/spot_index", methods=["GET"])
+def spot_index_stats():
+    """In-memory geo index statistics (spots, grid cells, age)"""
+    return jsonify(spot_index.stats()), 200
+
+
+@o_and_m.route("/admin/address_index", methods=["GET"])
+def address_index_stats():
+    """Size/age of the in-memory spot address search index"""
+    return jsonify(address_index.stats()), 200
+
+
+@o_and_m.route("/admin/autocomplete", methods=["GET"])
+def autocomplete_stats():
+    """Size/age of the in-memory autocomplete prefix index"""
+    return jsonify(prefix_index.stats()), 200
+
+
+@o_and_m.route("/admin/cache", methods=["GET"])
+def cache_stats():
+    """Response cache hit/miss counters, overall and per endpoint"""
+    return jsonify(cache.stats()), 200
+
+
+@o_and_m.route("/admin/cache", methods=["DELETE"])
+def cache_clear():
+    """Drop every cached response"""
+    cache.clear()
+    return jsonify({"message": "cleared"}), 200
+
+
+@o_and_m.route("/admin/requests", methods=["GET"])
+def request_stats():
+    """Per-route request counts, errors and p50/p95/p99 latency, slowest first"""
+    return jsonify(request_metrics.stats()), 200
+
+
+@o_and_m.route("/admin/requests", methods=["DELETE"])
+def request_stats_reset():
+    """Start the request metrics over"""
+    request_metrics.reset()
+    return jsonify({"message": "reset"}), 200
+
+
+@o_and_m.route("/admin/sql", methods=["GET"])
+def sql_stats():
+    """Top statement fingerprints by total/max/count/avg time, plus recent slow queries"""
+    order = request.args.get("order", "total")
+    if order not in ("total", "max", "count", "avg"):
+        return jsonify({"error": "order must be total, max, count or avg"}), 400
+    top = max(1, min(500, request.args.get("top", 20, type=int)))
+    return jsonify(profiler.stats(top=top, order=order)), 200
+
+
+@o_and_m.route("/admin/sql", methods=["DELETE"])
+def sql_stats_reset():
+    """Start the SQL profile over"""
+    profiler.reset()
+    return jsonify({"message": "reset"}), 200
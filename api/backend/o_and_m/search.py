@@ -0,0 +1,190 @@
+"""
+Parallel fan-out for /o_and_m/search.
+
+The spots, customers and orders sub-searches run concurrently on a shared
+thread pool, each on its own pooled connection. The request waits for all
+of them up to a single deadline. A sub-search still running at the
+deadline is reported in `timed_out` and the others' results are returned
+anyway.
+
+A timed-out sub-search keeps its pooled connection until it ends, so two
+things bound the damage:
+    - at most SEARCH_MAX_INFLIGHT sub-searches (default half the DB pool,
+      always below it) hold a connection at once; one that can't get a slot
+      before the deadline counts as timed out without touching the pool
+    - each SQL statement carries a MAX_EXECUTION_TIME hint set to the time
+      left until the deadline, so MySQL kills the stragglers; such a kill
+      (error 3024) is also reported in `timed_out`, not in the errors
+"""
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+
+from mysql.connector import Error
+
+from backend.customers import customer_search
+from backend.db_connection import db
+from backend.spots.address_index import address_index, fetch_ranked
+
+RESULT_LIMIT = 20
+ER_QUERY_TIMEOUT = 3024   # statement killed by its MAX_EXECUTION_TIME hint
+_SPOT_COLUMNS = "spotID, address, status, price, estViewPerMonth, monthlyRentCost"
+
+
+def _hint(timeout_ms: int) -> str:
+    return f"/*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */"
+
+
+def search_spots(connection, q: str, timeout_ms: int, logger) -> List[dict]:
+    cursor = connection.cursor(dictionary=True)
+    try:
+        try:
+            address_index.ensure_loaded(db)
+            return fetch_ranked(cursor, address_index.search(q, limit=RESULT_LIMIT), _SPOT_COLUMNS)
+        except Error:
+            raise  # the database itself is failing; SQL below wouldn't fare better
+        except Exception as e:
+            logger.warning(f"full_db_search: address index unavailable, using SQL: {e}")
+        try:
+            cursor.execute(
+                f"SELECT {_hint(timeout_ms)} {_SPOT_COLUMNS} "
+                "FROM Spot WHERE MATCH(address) AGAINST (%s IN NATURAL LANGUAGE MODE) "
+                "OR address LIKE %s LIMIT %s",
+                (q, f"%{q}%", RESULT_LIMIT),
+            )
+        except Error:
+            # In case MATCH is unsupported in current mode
+            cursor.execute(
+                f"SELECT {_hint(timeout_ms)} {_SPOT_COLUMNS} FROM Spot WHERE address LIKE %s LIMIT %s",
+                (f"%{q}%", RESULT_LIMIT),
+            )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def search_customers(connection, q: str, timeout_ms: int, logger) -> List[dict]:
+    """cID / email exact match, else FULLTEXT words over name/email/company"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        return customer_search.search_customers(
+            cursor, q, "cID, fName, lName, email, companyName, VIP", RESULT_LIMIT, hint=_hint(timeout_ms)
+        )
+    finally:
+        cursor.close()
+
+
+def search_orders(connection, q: str, timeout_ms: int, logger) -> List[dict]:
+    """Numeric queries match orderID or cID exactly; anything else the date string"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        if q.isdigit():
+            cursor.execute(
+                f"SELECT {_hint(timeout_ms)} orderID, date, total, cID "
+                "FROM Orders WHERE orderID = %s OR cID = %s LIMIT %s",
+                (int(q), int(q), RESULT_LIMIT),
+            )
+        else:
+            cursor.execute(
+                f"SELECT {_hint(timeout_ms)} orderID, date, total, cID "
+                "FROM Orders WHERE DATE_FORMAT(date, '%%Y-%%m-%%d') LIKE %s LIMIT %s",
+                (f"%{q}%", RESULT_LIMIT),
+            )
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+SUB_SEARCHES: Dict[str, Callable] = {
+    "spots": search_spots,
+    "customers": search_customers,
+    "orders": search_orders,
+}
+
+
+class _NoSlot(Exception):
+    """No in-flight slot freed up before the deadline."""
+
+
+class SearchFanOut:
+    def __init__(self, workers: int = 8, timeout_ms: int = 2000, max_inflight: int = 5):
+        self.workers = workers
+        self.timeout_ms = timeout_ms
+        self.max_inflight = max_inflight
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.workers = int(app.config.get("SEARCH_FANOUT_WORKERS", self.workers))
+        self.timeout_ms = int(app.config.get("SEARCH_TIMEOUT_MS", self.timeout_ms))
+        pool_size = int(app.config.get("MYSQL_POOL_SIZE", 10))
+        inflight = int(app.config.get("SEARCH_MAX_INFLIGHT") or max(1, pool_size // 2))
+        # never all of the pool: other routes must still get a connection
+        self.max_inflight = max(1, min(inflight, pool_size - 1, self.workers))
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="om-search")
+            return self._executor
+
+    def _run(self, fn, q: str, deadline: float, logger):
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            raise _NoSlot()
+        try:
+            connection = db.connect()
+            try:
+                remaining_ms = max(1, int((deadline - time.monotonic()) * 1000))
+                return fn(connection, q, remaining_ms, logger)
+            finally:
+                connection.close()
+        finally:
+            self._slots.release()
+
+    def search(self, q: str, logger, timeout_ms: int = None) -> Tuple[Dict[str, list], List[str], Dict[str, str]]:
+        """
+        Run every sub-search for `q` concurrently. Returns
+        (results per entity, entities that timed out, {entity: error}).
+        """
+        timeout_ms = timeout_ms or self.timeout_ms
+        deadline = time.monotonic() + timeout_ms / 1000.0
+        pool = self._pool()
+        futures = {
+            name: pool.submit(self._run, fn, q, deadline, logger)
+            for name, fn in SUB_SEARCHES.items()
+        }
+        done, _ = wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+        results: Dict[str, list] = {}
+        timed_out: List[str] = []
+        errors: Dict[str, str] = {}
+        for name, future in futures.items():
+            if future not in done:
+                future.cancel()  # no-op if it's already running; MAX_EXECUTION_TIME ends it soon
+                timed_out.append(name)
+                results[name] = []
+                continue
+            try:
+                results[name] = future.result()
+            except _NoSlot:
+                timed_out.append(name)
+                results[name] = []
+            except Error as e:
+                results[name] = []
+                if e.errno == ER_QUERY_TIMEOUT:
+                    timed_out.append(name)
+                else:
+                    logger.error(f"full_db_search {name} error: {e}")
+                    errors[name] = str(e)
+            except Exception as e:
+                logger.error(f"full_db_search {name} error: {e}")
+                errors[name] = str(e)
+                results[name] = []
+        return results, timed_out, errors
+
+
+fan_out = SearchFanOut()
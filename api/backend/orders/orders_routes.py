@@ -1,24 +1,65 @@
 from flask import Blueprint, request, jsonify, current_app
 from backend.db_connection import db
+from backend.response_cache import cache
 from mysql.connector import Error
+from backend.pagination import CursorError, decode_cursor, page_limit, split_page
+from backend.streaming import ndjson_response, wants_stream
+from backend.columnar import export_response, requested_format
 
 
 orders = Blueprint("orders", __name__)
 
 
+def _page_args(n_key_values):
+    """Read ?limit= and ?cursor=; returns (limit, decoded key values or None)."""
+    limit = page_limit(request.args.get("limit"))
+    token = (request.args.get("cursor") or "").strip()
+    return limit, (decode_cursor(token, n_key_values) if token else None)
+
+
 @orders.route("/processed_orders", methods=["GET"])
 def list_processed_orders():
+    """
+    GET /processed_orders?limit=100&cursor=<next_cursor>&cID=<optional>
+    Newest first; returns {"data": [...], "next_cursor": str|null}
+    With ?stream=1 (or Accept: application/x-ndjson) every matching row is
+    streamed as NDJSON instead, without paging; ?format=arrow|parquet
+    exports every matching row in that format.
+    """
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute(
-            (
-                "SELECT orderID, processTime, processorID "
-                "FROM ProcessedOrder ORDER BY processTime DESC, orderID DESC"
-            )
-        )
+        limit, after = _page_args(2)
+        c_id = request.args.get("cID")
+
+        query = "SELECT p.orderID, p.processTime, p.processorID FROM ProcessedOrder p"
+        where, params = [], []
+        if c_id:
+            query += " JOIN Orders o ON o.orderID = p.orderID"
+            where.append("o.cID = %s")
+            params.append(c_id)
+        if after:
+            where.append("p.processTime <= %s AND (p.processTime < %s OR p.orderID < %s)")
+            params += [after[0], after[0], after[1]]
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY p.processTime DESC, p.orderID DESC"
+        fmt = requested_format()
+        if fmt:
+            return export_response(fmt, query, params, "processed_orders")
+        if wants_stream():
+            return ndjson_response(query, params)
+        query += " LIMIT %s"
+        params.append(limit + 1)
+
+        cursor = db.get_db().cursor(dictionary=True)
+        cursor.execute(query, tuple(params))
         data = cursor.fetchall()
         cursor.close()
-        return jsonify(data), 200
+        data, next_cursor = split_page(data, limit, lambda r: (r["processTime"], r["orderID"]))
+        return jsonify({"data": data, "next_cursor": next_cursor}), 200
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
     except Error as e:
         current_app.logger.error(f"list_processed_orders error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -26,7 +67,15 @@ def list_processed_orders():
 
 @orders.route("/orders", methods=["GET"])
 def list_orders():
+    """
+    GET /orders?cID=&start_date=&end_date=&limit=100&cursor=<next_cursor>
+    Newest first; returns {"data": [...], "next_cursor": str|null}
+    With ?stream=1 (or Accept: application/x-ndjson) every matching row is
+    streamed as NDJSON instead, without paging; ?format=arrow|parquet
+    exports every matching row in that format.
+    """
     try:
+        limit, after = _page_args(2)
         c_id = request.args.get("cID")
         start_date = request.args.get("start_date")
         end_date = request.args.get("end_date")
@@ -42,13 +91,29 @@ def list_orders():
         if end_date:
             query += " AND date <= %s"
             params.append(end_date)
+        if after:
+            # keyset on (date, orderID), written so MySQL sees a range on date
+            query += " AND date <= %s AND (date < %s OR orderID < %s)"
+            params += [after[0], after[0], after[1]]
         query += " ORDER BY date DESC, orderID DESC"
+        fmt = requested_format()
+        if fmt:
+            return export_response(fmt, query, params, "orders")
+        if wants_stream():
+            return ndjson_response(query, params)
+        query += " LIMIT %s"
+        params.append(limit + 1)
 
-        cursor = db.get_db().cursor()
+        cursor = db.get_db().cursor(dictionary=True)
         cursor.execute(query, tuple(params))
         rows = cursor.fetchall()
         cursor.close()
-        return jsonify(rows), 200
+        rows, next_cursor = split_page(rows, limit, lambda r: (r["date"], r["orderID"]))
+        return jsonify({"data": rows, "next_cursor": next_cursor}), 200
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
     except Error as e:
         current_app.logger.error(f"list_orders error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -63,7 +128,7 @@ def create_order():
         if missing:
             return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
-        cursor = db.get_db().cursor()
+        cursor = db.get_db().cursor(dictionary=True)
         cursor.execute(
             "INSERT INTO Orders (date, total, cID) VALUES (%s, %s, %s)",
             (payload["date"], payload.get("total", 0), payload["cID"]),
@@ -76,6 +141,7 @@ def create_order():
         )
         db.get_db().commit()
         cursor.close()
+        cache.invalidate("orders")
         return jsonify({"message": "created", "orderID": new_id}), 201
     except Error as e:
         current_app.logger.error(f"create_order error: {e}")
@@ -91,7 +157,7 @@ def update_order_start_date():
         if missing:
             return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
 
-        cursor = db.get_db().cursor()
+        cursor = db.get_db().cursor(dictionary=True)
         # Only allow update if order is unprocessed
         cursor.execute(
             "SELECT 1 FROM ToBeProcessedOrder WHERE orderID = %s",
@@ -108,6 +174,7 @@ def update_order_start_date():
         )
         db.get_db().commit()
         cursor.close()
+        cache.invalidate("orders")
         return jsonify({"message": "updated", "orderID": payload["orderID"]}), 200
     except Error as e:
         current_app.logger.error(f"update_order_start_date error: {e}")
@@ -121,7 +188,7 @@ def delete_unprocessed_order():
         if not order_id:
             return jsonify({"error": "Missing orderID"}), 400
 
-        cursor = db.get_db().cursor()
+        cursor = db.get_db().cursor(dictionary=True)
         # Ensure unprocessed
         cursor.execute(
             "SELECT 1 FROM ToBeProcessedOrder WHERE orderID = %s",
@@ -135,6 +202,7 @@ def delete_unprocessed_order():
         cursor.execute("DELETE FROM Orders WHERE orderID = %s", (order_id,))
         db.get_db().commit()
         cursor.close()
+        cache.invalidate("orders")
         return jsonify({"message": "deleted", "orderID": int(order_id)}), 200
     except Error as e:
         current_app.logger.error(f"delete_unprocessed_order error: {e}")
@@ -144,7 +212,7 @@ def delete_unprocessed_order():
 @orders.route("/orders/<int:order_id>", methods=["GET"])
 def get_order(order_id: int):
     try:
-        cursor = db.get_db().cursor()
+        cursor = db.get_db().cursor(dictionary=True)
         cursor.execute(
             "SELECT orderID, date, total, cID FROM Orders WHERE orderID = %s",
             (order_id,),
@@ -161,15 +229,38 @@ def get_order(order_id: int):
 
 @orders.route("/to_be_processed_order", methods=["GET"])
 def list_to_be_processed_orders():
+    """
+    GET /to_be_processed_order?limit=100&cursor=<next_cursor>&cID=<optional>
+    Highest orderID first; returns {"data": [...], "next_cursor": str|null}
+    """
     try:
-        cursor = db.get_db().cursor()
-        cursor.execute(
-            "SELECT orderID, status FROM ToBeProcessedOrder ORDER BY orderID DESC"
-        )
+        limit, after = _page_args(1)
+        c_id = request.args.get("cID")
+
+        query = "SELECT t.orderID, t.status FROM ToBeProcessedOrder t"
+        where, params = [], []
+        if c_id:
+            query += " JOIN Orders o ON o.orderID = t.orderID"
+            where.append("o.cID = %s")
+            params.append(c_id)
+        if after:
+            where.append("t.orderID < %s")
+            params.append(after[0])
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY t.orderID DESC LIMIT %s"
+        params.append(limit + 1)
+
+        cursor = db.get_db().cursor(dictionary=True)
+        cursor.execute(query, tuple(params))
         data = cursor.fetchall()
         cursor.close()
-        return jsonify(data), 200
+        data, next_cursor = split_page(data, limit, lambda r: (r["orderID"],))
+        return jsonify({"data": data, "next_cursor": next_cursor}), 200
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
     except Error as e:
         current_app.logger.error(f"list_to_be_processed_orders error: {e}")
         return jsonify({"error": str(e)}), 500
-
@@ -0,0 +1,66 @@
+"""
+Customer scores behind /owner/customers/scores.
+
+MySQL aggregates spend and order count per customer over the period (one
+row per customer, not per order). Both columns are then ranked to 0..100
+percentiles in NumPy. Ties share their average rank, the same as pandas'
+rank(pct=True). The score is 70% spend rank + 30% frequency rank, bucketed
+into Low (<= 40), Med (<= 70), High (<= 90) and VIP.
+"""
+from __future__ import annotations
+from typing import List
+
+import numpy as np
+
+SPEND_WEIGHT = 0.7
+FREQ_WEIGHT = 0.3
+CATEGORY_EDGES = np.array([40.0, 70.0, 90.0])
+CATEGORIES = np.array(["Low", "Med", "High", "VIP"])
+
+AGGREGATE_SQL = (
+    "SELECT cID, SUM(total) AS spend, COUNT(*) AS orders "
+    "FROM Orders WHERE date >= CURDATE() - INTERVAL %s DAY GROUP BY cID"
+)
+
+
+def percentile_rank(values: np.ndarray) -> np.ndarray:
+    """0..100 rank of each value, ties averaged."""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0)
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    upper = np.cumsum(counts)                 # 1-based rank of the last member of each group
+    average = upper - (counts - 1) / 2.0
+    return 100.0 * average[inverse] / n
+
+
+def score(cids: np.ndarray, spend: np.ndarray, orders: np.ndarray) -> List[dict]:
+    """Score rows for the aggregated columns, highest score first."""
+    rank_spend = percentile_rank(spend)
+    rank_freq = percentile_rank(orders)
+    scores = np.round(SPEND_WEIGHT * rank_spend + FREQ_WEIGHT * rank_freq, 1)
+    category = CATEGORIES[np.searchsorted(CATEGORY_EDGES, scores, side="left")]
+    order = np.lexsort((cids, -scores))
+    return [
+        {
+            "cID": int(cids[i]),
+            "spend": round(float(spend[i]), 2),
+            "orders": int(orders[i]),
+            "rank_spend": round(float(rank_spend[i]), 1),
+            "rank_freq": round(float(rank_freq[i]), 1),
+            "score": float(scores[i]),
+            "category": str(category[i]),
+        }
+        for i in order
+    ]
+
+
+def compute(cursor, days: int) -> List[dict]:
+    cursor.execute(AGGREGATE_SQL, (days,))
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+    cids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    spend = np.fromiter((float(r[1] or 0) for r in rows), dtype=np.float64, count=len(rows))
+    orders = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+    return score(cids, spend, orders)
@@ -1,46 +1,102 @@
 #owner_route.py
 from flask import Blueprint, request, jsonify, current_app
-import mysql.connector as mysql
+from backend.db_connection import db
+from backend.spots.geo_index import spot_index
+from backend.kpi_counters import read_counters, spot_status_counts, wants_fresh
+from backend.response_cache import cache
+from backend.owner import customer_scores, pricing
 
 owner_bp = Blueprint("owner", __name__, url_prefix="/owner")
 owner_bp.strict_slashes = False
 
-def _get_conn():
-    cfg = current_app.config
-    return mysql.connect(
-        host=cfg.get("MYSQL_DATABASE_HOST", "127.0.0.1"),
-        port=int(cfg.get("MYSQL_DATABASE_PORT", 3306)),
-        user=cfg.get("MYSQL_DATABASE_USER", "root"),
-        password=cfg.get("MYSQL_DATABASE_PASSWORD", "changeme"),
-        database=cfg.get("MYSQL_DATABASE_DB", "SpotLight"),
-    )
-
 def _table_exists(cur, name):
     cur.execute("SHOW TABLES LIKE %s", (name,))
     return cur.fetchone() is not None
 
-def _column_exists(cur, table, column):
-    cur.execute(f"SHOW COLUMNS FROM `{table}` LIKE %s", (column,))
-    return cur.fetchone() is not None
+def _period_days(raw, default=90):
+    """'90d' or '90' -> 90; raises ValueError otherwise."""
+    raw = (raw or "").strip().lower()
+    if not raw:
+        return default
+    days = int(raw[:-1] if raw.endswith("d") else raw)
+    if days <= 0:
+        raise ValueError("period must be positive")
+    return days
 
 @owner_bp.get("/metrics")
+@cache.cached(ttl=30, tags=("spots", "customers", "orders", "reviews"))
 def metrics():
-    """High-level counts for the ads company owner."""
+    """
+    High-level counts for the ads company owner.
+    Spot/customer/order/review totals come from KpiCounters (?fresh=1 recounts).
+    """
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
-        out = {}
-        for t in ("Spot", "Customers", "Orders", "Reviews", "Employee", "SalesMan"):
+        conn = db.connect()
+        counters = read_counters(conn, ("spots", "customers", "orders", "reviews"),
+                                 fresh=wants_fresh(request.args))
+        out = {
+            "spot_count": counters.get("spots_total", 0),
+            "customers_count": counters.get("customers_total", 0),
+            "orders_count": counters.get("orders_total", 0),
+            "reviews_count": counters.get("reviews_total", 0),
+        }
+
+        # small staff tables are still counted live
+        cur = conn.cursor(dictionary=True)
+        for t in ("Employee", "SalesMan"):
             cur.execute("SELECT COUNT(*) AS n FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", (t,))
             if cur.fetchone()["n"]:
                 cur.execute(f"SELECT COUNT(*) AS cnt FROM `{t}`")
                 out[f"{t.lower()}_count"] = cur.fetchone()["cnt"]
 
-        # Spot status breakdown (only if column exists)
-        if _table_exists(cur, "Spot") and _column_exists(cur, "Spot", "status"):
-            cur.execute("SELECT status, COUNT(*) AS cnt FROM Spot GROUP BY status ORDER BY cnt DESC")
-            out["spot_status"] = cur.fetchall()
+        # Spot status breakdown
+        status_counts = sorted(spot_status_counts(counters).items(), key=lambda kv: kv[1], reverse=True)
+        out["spot_status"] = [{"status": s or None, "cnt": n} for s, n in status_counts]
+
+        cur.close(); conn.close()
+        return jsonify(out), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@owner_bp.get("/price/simulate")
+@cache.cached(ttl=30, tags=("spots",))
+def price_simulate():
+    """
+    What-if for a bulk price change; nothing is written.
+    /owner/price/simulate?regions=Boston&status=free&price_min=&price_max=&min_views=
+        &percent=10 | &set=500 | &percents=-10,0,10 | &sets=400,500 | &sweep=-20:50:5
+    Returns { matched, scenarios: [{percent|set, affected, current_total, projected_total, delta}] };
+    with a single scenario its fields are also copied to the top level.
+    """
+    args = request.args
+    try:
+        filters = pricing.parse_filters({**args.to_dict(), "regions": args.getlist("regions")})
+        changes = []
+        if args.get("percent"):
+            changes.append({"percent": float(args["percent"])})
+        if args.get("set"):
+            changes.append({"set": float(args["set"])})
+        changes += [{"percent": float(x)} for x in args.get("percents", "").split(",") if x.strip()]
+        changes += [{"set": float(x)} for x in args.get("sets", "").split(",") if x.strip()]
+        if args.get("sweep"):
+            changes += [{"percent": p} for p in pricing.parse_sweep(args["sweep"])]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not changes:
+        return jsonify({"error": "percent, set, percents, sets or sweep is required"}), 400
+    if len(changes) > pricing.MAX_SCENARIOS:
+        return jsonify({"error": f"at most {pricing.MAX_SCENARIOS} scenarios per call"}), 400
+    if any(c.get("set", 0) < 0 for c in changes):
+        return jsonify({"error": "set must be >= 0"}), 400
 
+    try:
+        conn = db.connect(); cur = conn.cursor()
+        _, prices = pricing.load_prices(cur, filters)
         cur.close(); conn.close()
+        scenarios = pricing.simulate(prices, changes)
+        out = {"filters": filters, "matched": int(len(prices)), "scenarios": scenarios}
+        if len(scenarios) == 1:
+            out.update({k: v for k, v in scenarios[0].items() if k not in ("percent", "set")})
         return jsonify(out), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -48,35 +104,253 @@ def metrics():
 @owner_bp.post("/spots/bulk-price")
 def bulk_price():
     """
-    Bulk price update by percentage.
+    Bulk price update, written in spotID chunks (one short transaction each).
     Body:
-      { "percent": 10, "status": "free" }  -> +10% for all Spot with status='free'
+      { "percent": 10, "filters": {"regions": ["Boston"], "status": "free",
+                                   "price_min": 100, "price_max": 900, "min_views": 1000} }
+      { "set": 500, "filters": {...} }
+      { "percent": 10, "status": "free" }   -> filters may also sit at the top level
+    Returns { matched, updated, chunks, before: {...}, after: {...} } over the matched spots only.
     """
     body = request.get_json(silent=True) or {}
     try:
-        pct = float(body.get("percent", 0))
-    except Exception:
-        return jsonify({"error": "percent must be a number"}), 400
-    status = body.get("status")
+        filters = pricing.parse_filters(body.get("filters") or body)
+        if body.get("set") is not None:
+            change = {"set": float(body["set"])}
+            if change["set"] < 0:
+                raise ValueError("set must be >= 0")
+        else:
+            change = {"percent": float(body.get("percent", 0))}
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if change.get("percent") == 0:
+        return jsonify({"error": "percent or set is required"}), 400
 
+    chunk = current_app.config.get("BULK_PRICE_CHUNK", pricing.CHUNK)
+    conn = None
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
-        if not _table_exists(cur, "Spot"):
-            return jsonify({"error": "table Spot not found"}), 400
-        if not _column_exists(cur, "Spot", "price"):
-            return jsonify({"error": "column 'price' not found on Spot"}), 400
+        conn = db.connect()
+        report = pricing.apply_change(conn, filters, change, chunk=chunk)
+        return jsonify({**change, "filters": filters, **report}), 200
+    except pricing.ChunkedUpdateError as e:
+        current_app.logger.error(f"bulk_price stopped after {e.report['chunks']} chunk(s): {e}")
+        return jsonify({"error": str(e), **change, "filters": filters, **e.report}), 500
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        if conn is not None:
+            conn.close()
+        cache.invalidate("spots", "spot:*")
+
+@owner_bp.get("/customers/top")
+@cache.cached(ttl=60, tags=("orders", "customers"))
+def top_customers():
+    """
+    Top clients over a trailing period, ranked in SQL.
+    /owner/customers/top?period=90d&metric=spend|orders&limit=10&min_orders=1
+    Each row: cID, fName, lName, companyName, orders, spend, last_order_date, last_total
+    """
+    metric = (request.args.get("metric") or "spend").strip().lower()
+    if metric not in ("spend", "orders"):
+        return jsonify({"error": "metric must be spend or orders"}), 400
+    try:
+        days = _period_days(request.args.get("period"), 90)
+        limit = max(1, min(1000, int(request.args.get("limit", 10))))
+        min_orders = max(1, int(request.args.get("min_orders", 1)))
+    except ValueError:
+        return jsonify({"error": "period must look like 90d; limit and min_orders must be integers"}), 400
+    order_by = "spend DESC, orders DESC" if metric == "spend" else "orders DESC, spend DESC"
 
-        if status:
-            cur.execute("UPDATE Spot SET price = ROUND(price * (1 + %s/100), 2) WHERE status=%s", (pct, status))
+    # The inner GROUP BY reads only idx_orders_date_page (date, orderID, cID, total);
+    # names are joined for the `limit` winners only.
+    sql = f"""
+        SELECT t.cID, c.fName, c.lName, c.companyName,
+               t.orders, t.spend, t.last_order_date, t.last_total
+        FROM (
+            SELECT cID,
+                   COUNT(*) AS orders,
+                   SUM(total) AS spend,
+                   MAX(date) AS last_order_date,
+                   CAST(SUBSTRING_INDEX(GROUP_CONCAT(total ORDER BY date DESC, orderID DESC), ',', 1)
+                        AS DECIMAL(10,2)) AS last_total
+            FROM Orders
+            WHERE date >= CURDATE() - INTERVAL %s DAY
+            GROUP BY cID
+            HAVING COUNT(*) >= %s
+            ORDER BY {order_by}, cID
+            LIMIT %s
+        ) t
+        LEFT JOIN Customers c ON c.cID = t.cID
+        ORDER BY {order_by}, t.cID
+    """
+    try:
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
+        cur.execute(sql, (days, min_orders, limit))
+        rows = cur.fetchall()
+        cur.close(); conn.close()
+        return jsonify({"period_days": days, "metric": metric, "data": rows}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@owner_bp.get("/customers/scores")
+@cache.cached(ttl=600, tags=("orders",))
+def customer_scores_route():
+    """
+    Spend/frequency percentile scores, one row per customer with orders in the period.
+    /owner/customers/scores?period=90d
+    Each row: cID, spend, orders, rank_spend, rank_freq, score, category
+    Cached per period until an order write invalidates "orders".
+    """
+    try:
+        days = _period_days(request.args.get("period"), 90)
+    except ValueError:
+        return jsonify({"error": "period must look like 90d"}), 400
+    try:
+        conn = db.connect(); cur = conn.cursor()
+        rows = customer_scores.compute(cur, days)
+        cur.close(); conn.close()
+        return jsonify(rows), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+VIP_MAX_IDS = 5000
+
+@owner_bp.post("/customers/vip")
+def bulk_vip():
+    """
+    Set Customers.VIP for many customers in one transaction.
+    Body, either:
+      { "ids": [1, 2, 3], "VIP": true }
+      { "min_score": 90, "period": "90d", "VIP": true }   -> everyone scoring >= 90 (see /customers/scores)
+    Returns { requested, matched, updated, unchanged, missing }
+    """
+    body = request.get_json(silent=True) or {}
+    vip = 1 if bool(body.get("VIP", True)) else 0
+
+    try:
+        conn = db.connect(); cur = conn.cursor()
+        if body.get("ids") is not None:
+            try:
+                ids = list(dict.fromkeys(int(x) for x in body["ids"]))
+            except (TypeError, ValueError):
+                return jsonify({"error": "ids must be a list of integers"}), 400
+        elif body.get("min_score") is not None:
+            try:
+                min_score = float(body["min_score"])
+                days = _period_days(body.get("period"), 90)
+            except (TypeError, ValueError):
+                return jsonify({"error": "min_score must be a number and period look like 90d"}), 400
+            ids = [r["cID"] for r in customer_scores.compute(cur, days) if r["score"] >= min_score]
         else:
-            cur.execute("UPDATE Spot SET price = ROUND(price * (1 + %s/100), 2)", (pct,))
+            return jsonify({"error": "ids or min_score is required"}), 400
+        if len(ids) > VIP_MAX_IDS:
+            return jsonify({"error": f"at most {VIP_MAX_IDS} customers per request"}), 400
+        if not ids:
+            return jsonify({"requested": 0, "matched": 0, "updated": 0, "unchanged": 0, "missing": []}), 200
+
+        marks = ", ".join(["%s"] * len(ids))
+        # autocommit is off: the lock, the UPDATE and the commit form one transaction
+        cur.execute(f"SELECT cID FROM Customers WHERE cID IN ({marks}) FOR UPDATE", tuple(ids))
+        found = {r[0] for r in cur.fetchall()}
+        cur.execute(f"UPDATE Customers SET VIP = %s WHERE cID IN ({marks}) AND NOT (VIP <=> %s)",
+                    (vip, *ids, vip))
+        updated = cur.rowcount
         conn.commit()
+        cur.close(); conn.close()
+        if updated:
+            cache.invalidate("customers", "customer:*")
+        return jsonify({
+            "requested": len(ids),
+            "matched": len(found),
+            "updated": updated,
+            "unchanged": len(found) - updated,
+            "missing": [i for i in ids if i not in found],
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+REGION_ROLLUP_SQL = """
+    SELECT sp.region, sp.spots_total, sp.in_use_pct,
+           COALESCE(od.revenue, 0) AS revenue, COALESCE(od.orders, 0) AS orders,
+           ROUND(sp.views_month * %s / 30) AS views
+    FROM (
+        SELECT COALESCE(region, '') AS region, COUNT(*) AS spots_total,
+               ROUND(100 * SUM(status = 'inuse') / COUNT(*), 1) AS in_use_pct,
+               COALESCE(SUM(estViewPerMonth), 0) AS views_month
+        FROM Spot GROUP BY COALESCE(region, '')
+    ) sp
+    LEFT JOIN (
+        SELECT region, SUM(orders) AS orders, SUM(revenue) AS revenue
+        FROM (
+            SELECT region, orders, revenue FROM RegionDaily
+            WHERE day >= CURDATE() - INTERVAL %s DAY AND day < CURDATE()
+            UNION ALL
+            SELECT COALESCE(s.region, ''), COUNT(DISTINCT o.orderID), COALESCE(SUM(so.spot_cost), 0)
+            FROM Orders o
+            JOIN SpotOrder so ON so.orderID = o.orderID
+            JOIN Spot s ON s.spotID = so.spotID
+            WHERE o.date >= CURDATE()
+            GROUP BY COALESCE(s.region, '')
+        ) d
+        GROUP BY region
+    ) od ON od.region = sp.region
+    ORDER BY revenue DESC, sp.spots_total DESC
+"""
+
+def _region_daily_fresh(cur):
+    cur.execute("SELECT value = TO_DAYS(CURDATE()) AS fresh FROM KpiCounters WHERE name = 'region_daily_day'")
+    row = cur.fetchone()
+    return bool(row and row["fresh"])
 
-        # return summary
-        cur.execute("SELECT COUNT(*) AS n, MIN(price) AS min_price, MAX(price) AS max_price, AVG(price) AS avg_price FROM Spot")
-        summary = cur.fetchone()
+@owner_bp.get("/regions/rollup")
+@cache.cached(ttl=300, tags=("spots", "orders"))
+def regions_rollup():
+    """
+    Per-region spots, in-use %, revenue, orders and estimated views over a trailing period.
+    /owner/regions/rollup?period=90d
+    Returns {period_days, stale, data}; data rows are
+    region, spots_total, in_use_pct, revenue_<N>d, orders_<N>d, views_<N>d.
+    Past days come from RegionDaily (rebuilt nightly, see 04_regions.sql); today's orders are added live.
+    This read never rebuilds: if the nightly rebuild hasn't run today, the existing rows are served
+    with stale=true (days since the last rebuild are missing) until POST /regions/rollup/refresh.
+    """
+    try:
+        days = _period_days(request.args.get("period"), 90)
+    except ValueError:
+        return jsonify({"error": "period must look like 90d"}), 400
+    try:
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
+        stale = not _region_daily_fresh(cur)
+        cur.execute(REGION_ROLLUP_SQL, (days, days))
+        rows = cur.fetchall()
+        cur.close(); conn.close()
+        suffix = f"_{days}d"
+        return jsonify({"period_days": days, "stale": stale, "data": [
+            {
+                "region": r["region"] or "Unassigned",
+                "spots_total": r["spots_total"],
+                "in_use_pct": float(r["in_use_pct"] or 0),
+                "revenue" + suffix: float(r["revenue"]),
+                "orders" + suffix: int(r["orders"]),
+                "views" + suffix: int(r["views"] or 0),
+            }
+            for r in rows
+        ]}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@owner_bp.post("/regions/rollup/refresh")
+def regions_rollup_refresh():
+    """Rebuild RegionDaily now instead of waiting for the nightly event."""
+    try:
+        conn = db.connect(); cur = conn.cursor()
+        cur.execute("CALL region_daily_rebuild()")
+        conn.commit()
+        cur.execute("SELECT COUNT(*) FROM RegionDaily")
+        (n,) = cur.fetchone()
         cur.close(); conn.close()
-        return jsonify({"updated_percent": pct, "status_filter": status, "summary": summary}), 200
+        cache.invalidate("orders")
+        return jsonify({"message": "region rollup rebuilt", "rows": n}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -84,7 +358,7 @@ def bulk_price():
 def recent_orders():
     """Recent orders (top 50)."""
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
         if not _table_exists(cur, "Orders"):
             return jsonify({"data": [], "note": "table Orders not found"}), 200
         # Avoid assuming column names: select * with limit
@@ -99,11 +373,12 @@ def recent_orders():
 def delete_review(rid: int):
     """Moderate a review (owner deletes)."""
     try:
-        conn = _get_conn(); cur = conn.cursor()
+        conn = db.connect(); cur = conn.cursor()
         if not _table_exists(cur, "Reviews"):
             return jsonify({"error": "table Reviews not found"}), 400
         cur.execute("DELETE FROM Reviews WHERE rID=%s", (rid,))
         conn.commit()
+        cache.invalidate("reviews")
         cur.close(); conn.close()
         return jsonify({"deleted": rid}), 200
     except Exception as e:
@@ -120,7 +395,7 @@ def update_spot_status(spot_id: int):
     if not new_status:
         return {"error": "Missing 'status' in JSON body"}, 400
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
         cur.execute("UPDATE Spot SET status=%s WHERE spotID=%s", (new_status, spot_id))
         conn.commit()
         cur.execute("SELECT spotID, address, status, latitude, longitude FROM Spot WHERE spotID=%s", (spot_id,))
@@ -128,6 +403,8 @@ def update_spot_status(spot_id: int):
         cur.close(); conn.close()
         if not row:
             return {"error": f"spotID {spot_id} not found"}, 404
+        spot_index.upsert(spot_id, row["latitude"], row["longitude"], row["status"], row["address"])
+        cache.invalidate("spots", f"spot:{spot_id}")
         return row, 200
     except Exception as e:
         return {"error": str(e)}, 500
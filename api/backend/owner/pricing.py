@@ -0,0 +1,223 @@
+"""
+Spot repricing shared by /owner/price/simulate and /owner/spots/bulk-price.
+
+Filters (all optional, combined with AND):
+    regions    list of names; a spot matches if its region (see 04_regions.sql)
+               is one of them or its address contains one of them
+    status     free | inuse | w.issue | planned
+    price_min  price >= price_min
+    price_max  price <= price_max (0 or missing = no upper bound)
+    min_views  estViewPerMonth >= min_views
+
+A change is either {"percent": p} (price * (1 + p/100), rounded to cents,
+exactly what the UPDATE writes) or {"set": amount}.
+
+The simulator loads the matching prices once and evaluates every scenario
+over that vector in NumPy, so a sweep of 50 scenarios costs one query.
+
+apply_change() writes in primary-key order, CHUNK spots per transaction:
+lock the next chunk of matching rows, UPDATE them by spotID, read back
+their new prices, commit. Readers only ever wait on one chunk's row locks.
+Rows are visited once (spotID > last seen), so a price raised past
+price_max or into price_min's range is not picked up again.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+STATUSES = ("free", "inuse", "w.issue", "planned")
+MAX_SCENARIOS = 200
+CHUNK = 500
+
+
+def _number(raw, name: str, cast=float) -> Optional[float]:
+    if raw is None or raw == "":
+        return None
+    try:
+        return cast(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+
+
+def parse_filters(src: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize filters from a JSON body or query args; raises ValueError."""
+    regions = src.get("regions") or []
+    if isinstance(regions, str):
+        regions = [regions]
+    regions = [r.strip() for raw in regions for r in str(raw).split(",") if r.strip()]
+    status = src.get("status") or None
+    if status is not None and status not in STATUSES:
+        raise ValueError(f"status must be one of {', '.join(STATUSES)}")
+    price_max = _number(src.get("price_max"), "price_max")
+    return {
+        "regions": regions,
+        "status": status,
+        "price_min": _number(src.get("price_min"), "price_min"),
+        "price_max": price_max if price_max else None,
+        "min_views": _number(src.get("min_views"), "min_views", int),
+    }
+
+
+def filter_clause(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """WHERE fragment (never empty) + params for normalized filters."""
+    clauses: List[str] = []
+    params: List[Any] = []
+    if filters["regions"]:
+        marks = ", ".join(["%s"] * len(filters["regions"]))
+        likes = " OR ".join(["address LIKE %s"] * len(filters["regions"]))
+        clauses.append(f"(region IN ({marks}) OR {likes})")
+        params += filters["regions"] + [f"%{r}%" for r in filters["regions"]]
+    if filters["status"]:
+        clauses.append("status = %s")
+        params.append(filters["status"])
+    if filters["price_min"] is not None:
+        clauses.append("price >= %s")
+        params.append(filters["price_min"])
+    if filters["price_max"] is not None:
+        clauses.append("price <= %s")
+        params.append(filters["price_max"])
+    if filters["min_views"] is not None:
+        clauses.append("estViewPerMonth >= %s")
+        params.append(filters["min_views"])
+    return (" AND ".join(clauses) or "1=1"), params
+
+
+def parse_sweep(raw: str) -> List[float]:
+    """'-20:50:5' -> [-20, -15, ..., 50] (stop included)."""
+    try:
+        start, stop, step = (float(x) for x in raw.split(":"))
+    except ValueError:
+        raise ValueError("sweep must look like start:stop:step")
+    if step <= 0 or stop < start:
+        raise ValueError("sweep needs step > 0 and stop >= start")
+    values = np.arange(start, stop + step / 2, step)
+    if len(values) > MAX_SCENARIOS:
+        raise ValueError(f"at most {MAX_SCENARIOS} scenarios per call")
+    return [round(float(v), 4) for v in values]
+
+
+def load_prices(cursor, filters: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """(spotIDs, prices) of the matching spots; NULL prices become NaN."""
+    where, params = filter_clause(filters)
+    cursor.execute(f"SELECT spotID, price FROM Spot WHERE {where}", tuple(params))
+    rows = cursor.fetchall()
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    prices = np.fromiter((np.nan if r[1] is None else float(r[1]) for r in rows),
+                         dtype=np.float64, count=len(rows))
+    return ids, prices
+
+
+def project(prices: np.ndarray, change: Dict[str, float]) -> np.ndarray:
+    if "set" in change:
+        return np.full_like(prices, float(change["set"]))
+    return np.round(prices * (1 + float(change["percent"]) / 100.0), 2)
+
+
+def simulate(prices: np.ndarray, changes: List[Dict[str, float]]) -> List[dict]:
+    """Per change: how many prices move and the current/projected totals."""
+    current_total = float(np.nansum(prices))
+    out = []
+    for change in changes:
+        projected = project(prices, change)
+        moved = ~np.isclose(projected, prices) & ~(np.isnan(projected) & np.isnan(prices))
+        projected_total = float(np.nansum(projected))
+        out.append({
+            **change,
+            "affected": int(moved.sum()),
+            "current_total": round(current_total, 2),
+            "projected_total": round(projected_total, 2),
+            "delta": round(projected_total - current_total, 2),
+        })
+    return out
+
+
+def set_clause(change: Dict[str, float]) -> Tuple[str, List[Any]]:
+    if "set" in change:
+        return "price = %s", [float(change["set"])]
+    return "price = ROUND(price * (1 + %s/100), 2)", [float(change["percent"])]
+
+
+class ChunkedUpdateError(Exception):
+    """A chunk failed after `report` chunks were committed."""
+
+    def __init__(self, message: str, report: dict):
+        super().__init__(message)
+        self.report = report
+
+
+def apply_change(conn, filters: Dict[str, Any], change: Dict[str, float], chunk: int = CHUNK) -> dict:
+    """
+    Apply `change` to every spot matching `filters`, `chunk` rows per
+    transaction. Returns counts plus min/max/avg/total price before and
+    after, over the matched rows only.
+    """
+    where, where_params = filter_clause(filters)
+    set_sql, set_params = set_clause(change)
+    report = {"matched": 0, "updated": 0, "chunks": 0}
+    before = _Totals()
+    after = _Totals()
+    last_id = 0
+    cur = conn.cursor()
+    try:
+        while True:
+            cur.execute(
+                f"SELECT spotID, price FROM Spot WHERE spotID > %s AND {where} "
+                "ORDER BY spotID LIMIT %s FOR UPDATE",
+                (last_id, *where_params, chunk),
+            )
+            rows = cur.fetchall()
+            if not rows:
+                conn.commit()
+                break
+            ids = [r[0] for r in rows]
+            marks = ", ".join(["%s"] * len(ids))
+            cur.execute(f"UPDATE Spot SET {set_sql} WHERE spotID IN ({marks})", (*set_params, *ids))
+            updated = cur.rowcount
+            cur.execute(f"SELECT price FROM Spot WHERE spotID IN ({marks})", tuple(ids))
+            new_prices = cur.fetchall()
+            conn.commit()
+
+            before.add(r[1] for r in rows)
+            after.add(r[0] for r in new_prices)
+            report["matched"] += len(ids)
+            report["updated"] += max(updated, 0)
+            report["chunks"] += 1
+            last_id = ids[-1]
+            if len(rows) < chunk:
+                break
+    except Exception as e:
+        conn.rollback()
+        report.update(before=before.summary(), after=after.summary())
+        raise ChunkedUpdateError(str(e), report) from e
+    finally:
+        cur.close()
+    report.update(before=before.summary(), after=after.summary())
+    return report
+
+
+class _Totals:
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, prices) -> None:
+        for p in prices:
+            if p is None:
+                continue
+            p = float(p)
+            self.n += 1
+            self.total += p
+            self.min = p if self.min is None else min(self.min, p)
+            self.max = p if self.max is None else max(self.max, p)
+
+    def summary(self) -> dict:
+        return {
+            "priced": self.n,
+            "min_price": self.min,
+            "max_price": self.max,
+            "avg_price": round(self.total / self.n, 2) if self.n else None,
+            "total": round(self.total, 2),
+        }
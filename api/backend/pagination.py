@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination helpers.
+
+List endpoints fetch `limit + 1` rows ordered by their sort key, return the
+first `limit`, and hand back an opaque `next_cursor` holding the sort key of
+the last row. The next request turns that key into a WHERE predicate, so
+every page is an index range scan no matter how deep the client pages.
+"""
+from __future__ import annotations
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class CursorError(ValueError):
+    """The cursor token is malformed or doesn't belong to this endpoint."""
+
+
+def _plain(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.isoformat(sep=" ")
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_plain(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, n_values: int) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise CursorError("invalid cursor")
+    if not isinstance(values, list) or len(values) != n_values:
+        raise CursorError("invalid cursor")
+    return values
+
+
+def page_limit(raw: Optional[str], default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Parse ?limit=, clamped to 1..MAX_PAGE_SIZE. Raises ValueError if not an int."""
+    if raw is None or str(raw).strip() == "":
+        return default
+    return max(1, min(MAX_PAGE_SIZE, int(raw)))
+
+
+def split_page(rows: List[Any], limit: int, key: Callable[[Any], Sequence[Any]]
+               ) -> Tuple[List[Any], Optional[str]]:
+    """Trim a `limit + 1` fetch to one page and build the cursor for the next."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
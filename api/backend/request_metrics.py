@@ -0,0 +1,206 @@
+"""
+Per-route request metrics, exposed in Prometheus text format at /metrics.
+
+For every request the app records, keyed by (route rule, method):
+
+    latency    fixed-bucket histogram (seconds) + sum; p50/p95/p99 are
+               estimated from the buckets the way histogram_quantile() does
+    requests   count per status code
+    errors     5xx responses (unhandled exceptions end up here as 500s)
+    size       response body bytes, sum + count (streamed responses have
+               no length up front and are skipped)
+
+Routes are labelled by their URL rule ("/spots/<int:spot_id>"), not the raw
+path, so the number of series stays bounded. The hot path is a
+perf_counter() pair, one bisect into the bucket bounds and a few integer
+increments under a lock.
+
+    /metrics                      Prometheus scrape target
+    /o_and_m/admin/requests       the same numbers as JSON, slowest p95 first
+"""
+from __future__ import annotations
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flask import Response, g, request
+
+# seconds; +Inf is implicit
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+UNMATCHED = "<unmatched>"
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "latency_sum", "count", "statuses", "errors", "size_sum", "size_count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)   # per bucket, not cumulative; last is +Inf
+        self.latency_sum = 0.0
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.size_sum = 0
+        self.size_count = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if seen + n >= rank and n:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]   # in +Inf: the best we can say is "above the top bound"
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class RequestMetrics:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str], _RouteStats] = {}
+        self._started = time.time()
+
+    def init_app(self, app) -> None:
+        self.enabled = bool(app.config.get("REQUEST_METRICS_ENABLED", self.enabled))
+        app.add_url_rule("/metrics", "metrics", self.prometheus_view, methods=["GET"])
+        if self.enabled:
+            app.before_request(self._start)
+            app.after_request(self._finish)
+
+    # ---------------------- hooks ----------------------
+
+    @staticmethod
+    def _start() -> None:
+        g._metrics_t0 = time.perf_counter()
+
+    def _finish(self, response):
+        t0 = g.pop("_metrics_t0", None)
+        if t0 is None:
+            return response
+        elapsed = time.perf_counter() - t0
+        rule = request.url_rule.rule if request.url_rule is not None else UNMATCHED
+        if rule == "/metrics":
+            return response
+        size = None if response.is_streamed else response.content_length
+        self.observe(rule, request.method, response.status_code, elapsed, size)
+        return response
+
+    def observe(self, route: str, method: str, status: int, seconds: float, size: Optional[int]) -> None:
+        slot = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = _RouteStats()
+            stats.buckets[slot] += 1
+            stats.latency_sum += seconds
+            stats.count += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            if status >= 500:
+                stats.errors += 1
+            if size is not None:
+                stats.size_sum += size
+                stats.size_count += 1
+
+    # ---------------------- reporting ----------------------
+
+    def _snapshot(self) -> List[Tuple[Tuple[str, str], _RouteStats]]:
+        with self._lock:
+            out = []
+            for key, s in self._routes.items():
+                copy = _RouteStats()
+                copy.buckets = list(s.buckets)
+                copy.latency_sum, copy.count, copy.errors = s.latency_sum, s.count, s.errors
+                copy.statuses = dict(s.statuses)
+                copy.size_sum, copy.size_count = s.size_sum, s.size_count
+                out.append((key, copy))
+            return sorted(out)
+
+    def prometheus(self) -> str:
+        routes = self._snapshot()
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (route, method), s in routes:
+            labels = f'route="{_escape(route)}",method="{method}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (None,), s.buckets):
+                cumulative += n
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {s.latency_sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {s.count}")
+
+        lines += [
+            "# HELP http_request_duration_quantile_seconds Latency quantiles estimated from the histogram.",
+            "# TYPE http_request_duration_quantile_seconds gauge",
+        ]
+        for (route, method), s in routes:
+            labels = f'route="{_escape(route)}",method="{method}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'http_request_duration_quantile_seconds{{{labels},quantile="{q}"}} {s.quantile(q):.6f}'
+                )
+
+        lines += ["# HELP http_requests_total Requests by route and status.", "# TYPE http_requests_total counter"]
+        for (route, method), s in routes:
+            for status, n in sorted(s.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {n}'
+                )
+
+        lines += ["# HELP http_request_errors_total 5xx responses by route.", "# TYPE http_request_errors_total counter"]
+        for (route, method), s in routes:
+            lines.append(f'http_request_errors_total{{route="{_escape(route)}",method="{method}"}} {s.errors}')
+
+        lines += [
+            "# HELP http_response_size_bytes Response body size by route (non-streamed responses).",
+            "# TYPE http_response_size_bytes summary",
+        ]
+        for (route, method), s in routes:
+            labels = f'route="{_escape(route)}",method="{method}"'
+            lines.append(f"http_response_size_bytes_sum{{{labels}}} {s.size_sum}")
+            lines.append(f"http_response_size_bytes_count{{{labels}}} {s.size_count}")
+
+        lines += [
+            "# HELP process_start_time_seconds Start time of the process since unix epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self._started:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def prometheus_view(self):
+        return Response(self.prometheus(), mimetype="text/plain; version=0.0.4")
+
+    def stats(self) -> dict:
+        routes = []
+        for (route, method), s in self._snapshot():
+            p = {f"p{int(q * 100)}_ms": round(s.quantile(q) * 1000, 2) for q in QUANTILES}
+            routes.append({
+                "route": route,
+                "method": method,
+                "requests": s.count,
+                "errors": s.errors,
+                **p,
+                "avg_ms": round(1000 * s.latency_sum / s.count, 2),
+                "avg_bytes": round(s.size_sum / s.size_count) if s.size_count else None,
+            })
+        routes.sort(key=lambda r: r["p95_ms"], reverse=True)
+        return {"enabled": self.enabled, "uptime_seconds": round(time.time() - self._started), "routes": routes}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,179 @@
+"""
+In-process TTL + LRU cache for read-heavy GET endpoints.
+
+    @spots.route("/<int:spot_id>", methods=["GET"])
+    @cache.cached(ttl=60, tags=("spot:{spot_id}",))
+    def get_spot(spot_id): ...
+
+Entries are keyed on the endpoint, its view args and the sorted query string,
+and only successful (200) responses are stored. Every entry carries tags
+(formatted with the view args); mutating routes call cache.invalidate() with
+the tags they affect:
+
+    "spots", "customers", "orders", "reviews"   lists, summaries, metrics
+    "spot:<id>", "customer:<id>"                single records
+    "spot:*"                                    every single-record entry
+
+Requests with ?fresh=1 or "Cache-Control: no-cache", NDJSON streaming
+requests (see streaming.py) and Arrow/Parquet exports (see columnar.py)
+bypass the cache.
+"""
+from __future__ import annotations
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Set
+
+from flask import Response, make_response, request
+
+from backend.kpi_counters import wants_fresh
+from backend.streaming import wants_stream
+from backend.columnar import requested_format
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 2048, enabled: bool = True):
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires, body, mimetype, tags)
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._generation = 0  # bumped by invalidate(); stale misses aren't stored
+
+    def init_app(self, app) -> None:
+        self.max_entries = int(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", self.max_entries))
+        self.enabled = bool(app.config.get("RESPONSE_CACHE_ENABLED", self.enabled))
+
+    # ---------------------- decorator ----------------------
+
+    def cached(self, ttl: float, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or _bypass():
+                    return view(*args, **kwargs)
+
+                key = _cache_key(kwargs)
+                hit = self._get(key)
+                if hit is not None:
+                    self._count(request.endpoint, "hits")
+                    body, mimetype = hit
+                    return Response(body, status=200, mimetype=mimetype)
+
+                self._count(request.endpoint, "misses")
+                generation = self._generation
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code == 200 and not resp.is_streamed:
+                    entry_tags = {t.format(**kwargs) for t in tags}
+                    self._put(key, resp.get_data(), resp.mimetype, entry_tags, ttl, generation)
+                return resp
+            return wrapper
+        return decorator
+
+    # ---------------------- storage ----------------------
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, body, mimetype, _ = entry
+            if expires < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return body, mimetype
+
+    def _put(self, key: str, body: bytes, mimetype: str, tags: Set[str], ttl: float,
+             generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return  # something was invalidated while the view ran
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, body, mimetype, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)), evicted=True)
+
+    def _drop(self, key: str, evicted: bool = False) -> None:
+        _, _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+        if evicted:
+            self._stats.setdefault("_all", {"evictions": 0})["evictions"] += 1
+
+    # ---------------------- invalidation ----------------------
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of `tags` ("spot:*" matches all "spot:<id>")."""
+        with self._lock:
+            self._generation += 1
+            keys: Set[str] = set()
+            for tag in tags:
+                if tag.endswith("*"):
+                    prefix = tag[:-1]
+                    for t, ks in self._by_tag.items():
+                        if t.startswith(prefix):
+                            keys |= ks
+                else:
+                    keys |= self._by_tag.get(tag, set())
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    # ---------------------- stats ----------------------
+
+    def _count(self, endpoint: str, field: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters[field] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            per_endpoint = {k: dict(v) for k, v in self._stats.items() if k != "_all"}
+            hits = sum(v["hits"] for v in per_endpoint.values())
+            misses = sum(v["misses"] for v in per_endpoint.values())
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+                "evictions": self._stats.get("_all", {}).get("evictions", 0),
+                "endpoints": per_endpoint,
+            }
+
+
+def _bypass() -> bool:
+    return (
+        wants_fresh(request.args)
+        or "no-cache" in (request.headers.get("Cache-Control") or "")
+        or wants_stream()
+        or requested_format() is not None
+    )
+
+
+def _cache_key(view_args: dict) -> str:
+    args = sorted((k, v.strip()) for k, v in request.args.items(multi=True))
+    return f"{request.endpoint}|{sorted(view_args.items())}|{args}"
+
+
+cache = ResponseCache()
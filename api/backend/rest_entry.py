@@ -5,6 +5,15 @@ import logging
 from logging.handlers import RotatingFileHandler
 
 from backend.db_connection import db
+from backend.db_connection.profiler import profiler
+from backend.spots.geo_index import spot_index
+from backend.spots.address_index import address_index
+from backend.spots.autocomplete import prefix_index
+from backend.o_and_m.search import fan_out
+from backend.response_cache import cache
+from backend.request_metrics import request_metrics
+from backend.compression import compressor
+from backend.json_provider import OrjsonProvider, orjson
 from backend.o_and_m.o_and_m_routes import o_and_m
 from backend.customers.customer_routes import customer
 from backend.spots.spots_route import spots
@@ -65,18 +74,94 @@ def create_app():
         default="SpotLight"
     )
 
+    # Connection pool sizing (shared by every blueprint via backend.db_connection)
+    app.config["MYSQL_POOL_SIZE"] = get_env("DB_POOL_SIZE", "MYSQL_POOL_SIZE", default=10, cast=int)
+    app.config["MYSQL_POOL_TIMEOUT"] = get_env("DB_POOL_TIMEOUT", "MYSQL_POOL_TIMEOUT", default=5, cast=float)
+    app.config["MYSQL_POOL_PING_INTERVAL"] = get_env(
+        "DB_POOL_PING_INTERVAL", "MYSQL_POOL_PING_INTERVAL", default=5, cast=float
+    )
+
+    # In-memory geo index for radius / nearest-spot queries
+    app.config["SPOT_INDEX_CELL_DEG"] = get_env("SPOT_INDEX_CELL_DEG", default=0.1, cast=float)
+    app.config["SPOT_INDEX_MAX_AGE"] = get_env("SPOT_INDEX_MAX_AGE", default=600, cast=float)
+
+    # /o_and_m/search fan-out: worker threads and per-request deadline
+    app.config["SEARCH_FANOUT_WORKERS"] = get_env("SEARCH_FANOUT_WORKERS", default=8, cast=int)
+    app.config["SEARCH_TIMEOUT_MS"] = get_env("SEARCH_TIMEOUT_MS", default=2000, cast=int)
+    # sub-searches holding a DB connection at once; 0 = half the pool (always below it)
+    app.config["SEARCH_MAX_INFLIGHT"] = get_env("SEARCH_MAX_INFLIGHT", default=0, cast=int)
+
+    # /owner/spots/bulk-price: spots updated per transaction
+    app.config["BULK_PRICE_CHUNK"] = get_env("BULK_PRICE_CHUNK", default=500, cast=int)
+
+    # Response cache for read-heavy GETs
+    app.config["RESPONSE_CACHE_ENABLED"] = get_env("RESPONSE_CACHE_ENABLED", default="1") not in ("0", "false", "no")
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = get_env("RESPONSE_CACHE_MAX_ENTRIES", default=2048, cast=int)
+
+    # JSON encoder for responses: "orjson" (when installed) or Flask's "default"
+    app.config["JSON_PROVIDER"] = get_env("JSON_PROVIDER", default="orjson")
+    if app.config["JSON_PROVIDER"] == "orjson":
+        if orjson is not None:
+            app.json = OrjsonProvider(app)
+        else:
+            app.logger.warning("create_app(): orjson not installed, using Flask's default JSON provider")
+
+    # SQL profiler: per-statement timings, slow-query log with EXPLAIN
+    app.config["SQL_PROFILER_ENABLED"] = get_env("SQL_PROFILER_ENABLED", default="1") not in ("0", "false", "no")
+    app.config["SQL_SLOW_MS"] = get_env("SQL_SLOW_MS", default=200, cast=float)
+    app.config["SQL_EXPLAIN_SLOW"] = get_env("SQL_EXPLAIN_SLOW", default="1") not in ("0", "false", "no")
+
+    # Per-route latency/size/error metrics, served at /metrics
+    app.config["REQUEST_METRICS_ENABLED"] = get_env("REQUEST_METRICS_ENABLED", default="1") not in ("0", "false", "no")
+
+    # gzip/brotli for text-like responses of at least COMPRESS_MIN_BYTES (never for streams)
+    app.config["COMPRESS_ENABLED"] = get_env("COMPRESS_ENABLED", default="1") not in ("0", "false", "no")
+    app.config["COMPRESS_MIN_BYTES"] = get_env("COMPRESS_MIN_BYTES", default=1024, cast=int)
+    app.config["COMPRESS_GZIP_LEVEL"] = get_env("COMPRESS_GZIP_LEVEL", default=6, cast=int)
+    app.config["COMPRESS_BROTLI_QUALITY"] = get_env("COMPRESS_BROTLI_QUALITY", default=4, cast=int)
+
     # Log the resolved (non-sensitive) connection info for debugging
     app.logger.info(
-        "DB config -> host=%s port=%s user=%s db=%s",
+        "DB config -> host=%s port=%s user=%s db=%s pool=%s",
         app.config['MYSQL_DATABASE_HOST'],
         app.config['MYSQL_DATABASE_PORT'],
         app.config['MYSQL_DATABASE_USER'],
         app.config['MYSQL_DATABASE_DB'],
+        app.config['MYSQL_POOL_SIZE'],
     )
 
     # 4) Initialize DB and register blueprints
-    app.logger.info("current_app(): starting the database connection")
+    app.logger.info("current_app(): starting the database connection pool")
     db.init_app(app)
+    profiler.init_app(app)
+
+    cache.init_app(app)
+    fan_out.init_app(app)
+    request_metrics.init_app(app)
+    # after_request hooks run in reverse: compression goes first, so metrics see wire bytes
+    compressor.init_app(app)
+
+    # Warm the geo index; if the DB isn't reachable yet it loads on first query
+    spot_index.init_app(app)
+    try:
+        spot_index.ensure_loaded(db)
+        app.logger.info("create_app(): loaded %s spots into the geo index", len(spot_index))
+    except Exception as e:
+        app.logger.warning(f"create_app(): geo index will load lazily ({e})")
+
+    address_index.init_app(app)
+    try:
+        address_index.ensure_loaded(db)
+        app.logger.info("create_app(): loaded %s addresses into the search index", len(address_index))
+    except Exception as e:
+        app.logger.warning(f"create_app(): address index will load lazily ({e})")
+
+    prefix_index.init_app(app)
+    try:
+        prefix_index.ensure_loaded(db)
+        app.logger.info("create_app(): loaded %s autocomplete labels", len(prefix_index))
+    except Exception as e:
+        app.logger.warning(f"create_app(): autocomplete index will load lazily ({e})")
 
     app.logger.info("create_app(): registering blueprints with Flask app object.")
     app.register_blueprint(o_and_m, url_prefix="/o_and_m")
@@ -1,20 +1,13 @@
 # salesman_route.py
 from flask import Blueprint, request, jsonify, current_app
-import mysql.connector as mysql
+from backend.db_connection import db
+from backend.spots.geo import bbox_clause
+from backend.spots.geo_index import spot_index
+from backend.response_cache import cache
 
 salesman_bp = Blueprint("salesman", __name__, url_prefix="/salesman")
 salesman_bp.strict_slashes = False
 
-def _get_conn():
-    cfg = current_app.config
-    return mysql.connect(
-        host=cfg.get("MYSQL_DATABASE_HOST", "127.0.0.1"),
-        port=int(cfg.get("MYSQL_DATABASE_PORT", 3306)),
-        user=cfg.get("MYSQL_DATABASE_USER", "root"),
-        password=cfg.get("MYSQL_DATABASE_PASSWORD", "changeme"),
-        database=cfg.get("MYSQL_DATABASE_DB", "SpotLight"),
-    )
-
 def _table_exists(cur, name):
     cur.execute("SHOW TABLES LIKE %s", (name,))
     return cur.fetchone() is not None
@@ -27,7 +20,7 @@ def _column_exists(cur, table, column):
 def pending_orders():
     """List 'to-be-processed' orders for a salesman."""
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
         if not _table_exists(cur, "ToBeProcessedOrder"):
             return jsonify({"data": [], "note": "table ToBeProcessedOrder not found"}), 200
         cur.execute("SELECT * FROM ToBeProcessedOrder ORDER BY orderID DESC LIMIT 100")
@@ -45,7 +38,7 @@ def update_spot_status(spot_id: int):
     if not new_status:
         return jsonify({"error": "Missing 'status' in JSON body"}), 400
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
         if not _table_exists(cur, "Spot"):
             return jsonify({"error": "table Spot not found"}), 400
         if not _column_exists(cur, "Spot", "status"):
@@ -57,6 +50,8 @@ def update_spot_status(spot_id: int):
         cur.close(); conn.close()
         if not row:
             return jsonify({"error": f"spotID {spot_id} not found"}), 404
+        spot_index.upsert(spot_id, row["latitude"], row["longitude"], row["status"], row["address"])
+        cache.invalidate("spots", f"spot:{spot_id}")
         return jsonify(row), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -73,8 +68,16 @@ def salesman_spots():
     lng = request.args.get("lng", type=float)
     radius_km = request.args.get("radius_km", type=float)
 
+    if lat is not None and lng is not None and radius_km is not None:
+        # served from the in-memory geo index; the SQL below is only a fallback
+        try:
+            spot_index.ensure_loaded(db)
+            return jsonify(spot_index.radius(lat, lng, radius_km, status=status or None)), 200
+        except Exception as e:
+            current_app.logger.warning(f"salesman_spots: geo index unavailable, using SQL: {e}")
+
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
         if not _table_exists(cur, "Spot"):
             return jsonify({"data": [], "note": "table Spot not found"}), 200
 
@@ -95,10 +98,12 @@ def salesman_spots():
                 ORDER BY distance_km
                 LIMIT 200
             """
-            where = ""
-            params = [lat, lat, lng]
+            # bounding box prefilter (idx_spot_lat_lon) before the haversine
+            box_sql, box_params = bbox_clause(lat, lng, radius_km)
+            where = f"WHERE {box_sql}"
+            params = [lat, lat, lng] + box_params
             if status:
-                where = "WHERE status = %s"
+                where += " AND status = %s"
                 params.append(status)
             q = q.format(where=where)
             params.append(radius_km)
@@ -129,7 +134,7 @@ def add_spot_to_order(spot_id: int, order_id: int):
     Returns: {"added": {"orderID": ..., "spotID": ...}}
     """
     try:
-        conn = _get_conn(); cur = conn.cursor()
+        conn = db.connect(); cur = conn.cursor()
         cur.execute(
             "INSERT INTO SpotOrder (orderID, spotID) VALUES (%s, %s)",
             (order_id, spot_id)
@@ -147,7 +152,7 @@ def remove_spot_from_order(spot_id: int, order_id: int):
     Returns: {"deleted": {"orderID": ..., "spotID": ...}, "rows_affected": N}
     """
     try:
-        conn = _get_conn(); cur = conn.cursor()
+        conn = db.connect(); cur = conn.cursor()
         cur.execute(
             "DELETE FROM SpotOrder WHERE orderID=%s AND spotID=%s",
             (order_id, spot_id)
@@ -166,7 +171,7 @@ def orders_history():
     Falls back to Orders if ProcessedOrder table doesn't exist.
     """
     try:
-        conn = _get_conn(); cur = conn.cursor(dictionary=True)
+        conn = db.connect(); cur = conn.cursor(dictionary=True)
 
         # Use ProcessedOrder if available
         try:
@@ -0,0 +1,331 @@
+"""
+In-memory inverted index over Spot.address for substring and typo-tolerant
+search, so /spots/search, /spots/?q= and /o_and_m/search don't need
+leading-wildcard LIKE scans.
+
+Addresses are split into lowercase alphanumeric tokens. Two maps are kept:
+
+    token   -> set of spotIDs          (postings)
+    trigram -> set of tokens           (over "$token$", so boundaries count)
+
+A query token is matched against the token vocabulary, not against every
+address. Substring matches come from intersecting the trigram sets of the
+query token. Fuzzy matches come from Jaccard similarity of padded
+trigrams. Tokens shorter than three characters are prefix-matched on a
+sorted vocabulary list. Each spot's score is the average of its best match
+per query token, plus a bonus when the whole query appears in the address
+as a phrase.
+
+Like the geo index, this is filled from the database on first use (or at
+startup) and kept current by the spot write routes calling
+upsert()/remove(), with a full reload every `max_age` seconds (serialized,
+with writes made during the reload re-applied afterwards).
+"""
+from __future__ import annotations
+import bisect
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+EXACT, PREFIX, SUBSTRING = 1.0, 0.9, 0.75
+FUZZY_WEIGHT = 0.6       # a fuzzy token match scores FUZZY_WEIGHT * similarity
+FUZZY_MIN_SIMILARITY = 0.4
+PHRASE_BONUS = 0.25
+MAX_PREFIX_TOKENS = 500  # cap on vocabulary entries a 1-2 char token expands to
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+def _grams(s: str) -> Set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _padded_grams(token: str) -> Set[str]:
+    return _grams(f"${token}$")
+
+
+class AddressIndex:
+    def __init__(self, max_age: float = 600.0):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reload_lock = threading.RLock()
+        self._pending: Optional[list] = None   # writes seen while a reload is in flight
+        self._loaded_at: Optional[float] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._address: Dict[int, str] = {}          # spotID -> normalized address
+        self._postings: Dict[str, Set[int]] = {}    # token -> spotIDs
+        self._trigrams: Dict[str, Set[str]] = {}    # trigram -> tokens
+        self._gram_count: Dict[str, int] = {}       # token -> number of padded trigrams
+        self._vocab: List[str] = []                 # sorted tokens, for short prefixes
+
+    # ---------------------- loading ----------------------
+
+    def init_app(self, app) -> None:
+        self.max_age = float(app.config.get("SPOT_INDEX_MAX_AGE", self.max_age))
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, conn) -> int:
+        """(Re)build the whole index from the Spot table using `conn`."""
+        with self._reload_lock:
+            return self._load(conn)
+
+    def _load(self, conn) -> int:
+        self._begin_reload()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT spotID, address FROM Spot WHERE address IS NOT NULL")
+            rows = cur.fetchall()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        finally:
+            cur.close()
+        with self._lock:
+            self._reset()
+            for spot_id, address in rows:
+                self._put(int(spot_id), address)
+            self._end_reload()
+            self._loaded_at = time.monotonic()
+        return len(rows)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or (
+            self.max_age > 0 and time.monotonic() - self._loaded_at > self.max_age
+        )
+
+    def ensure_loaded(self, db) -> None:
+        """Load on first use and whenever the index is older than max_age."""
+        if not self._stale():
+            return
+        with self._reload_lock:   # one reload at a time; the rest wait and find it fresh
+            if not self._stale():
+                return
+            conn = db.connect()
+            try:
+                self.load(conn)
+            finally:
+                conn.close()
+
+    def _begin_reload(self) -> None:
+        with self._lock:
+            self._pending = []
+
+    def _end_reload(self) -> None:
+        """Re-apply writes recorded while the reload's SELECT was running (call under _lock)."""
+        pending, self._pending = self._pending, None
+        for fn, args in pending or ():
+            fn(*args)
+
+    def _record(self, fn, *args) -> None:
+        """Called under _lock by every incremental write."""
+        if self._pending is not None:
+            self._pending.append((fn, args))
+
+    # ---------------------- incremental updates ----------------------
+
+    def upsert(self, spot_id: int, address: Optional[str]) -> None:
+        with self._lock:
+            self._record(self.upsert, spot_id, address)
+            self._drop(int(spot_id))
+            if address:
+                self._put(int(spot_id), address)
+
+    def remove(self, spot_id: int) -> None:
+        with self._lock:
+            self._record(self.remove, spot_id)
+            self._drop(int(spot_id))
+
+    def _put(self, spot_id: int, address: str) -> None:
+        tokens = tokenize(address)
+        self._address[spot_id] = " ".join(tokens)
+        for token in set(tokens):
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                grams = _padded_grams(token)
+                self._gram_count[token] = len(grams)
+                for g in grams:
+                    self._trigrams.setdefault(g, set()).add(token)
+                bisect.insort(self._vocab, token)
+            ids.add(spot_id)
+
+    def _drop(self, spot_id: int) -> None:
+        address = self._address.pop(spot_id, None)
+        if address is None:
+            return
+        for token in set(address.split()):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(spot_id)
+            if ids:
+                continue
+            del self._postings[token]
+            del self._gram_count[token]
+            for g in _padded_grams(token):
+                tokens = self._trigrams.get(g)
+                if tokens is not None:
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._trigrams[g]
+            i = bisect.bisect_left(self._vocab, token)
+            if i < len(self._vocab) and self._vocab[i] == token:
+                del self._vocab[i]
+
+    # ---------------------- queries ----------------------
+
+    def __len__(self) -> int:
+        return len(self._address)
+
+    def _token_matches(self, q: str, fuzzy: bool) -> Dict[str, float]:
+        """Vocabulary tokens matching query token `q` -> match score."""
+        out: Dict[str, float] = {}
+        if len(q) < 3:
+            i = bisect.bisect_left(self._vocab, q)
+            while i < len(self._vocab) and len(out) < MAX_PREFIX_TOKENS and self._vocab[i].startswith(q):
+                v = self._vocab[i]
+                out[v] = EXACT if v == q else PREFIX
+                i += 1
+            return out
+
+        # substring: tokens holding every trigram of q, then verified
+        sets = sorted((self._trigrams.get(g, set()) for g in _grams(q)), key=len)
+        candidates = set(sets[0])
+        for s in sets[1:]:
+            if not candidates:
+                break
+            candidates &= s
+        for v in candidates:
+            if q in v:
+                out[v] = EXACT if v == q else PREFIX if v.startswith(q) else SUBSTRING
+
+        if fuzzy:
+            q_grams = _padded_grams(q)
+            shared = Counter()
+            for g in q_grams:
+                shared.update(self._trigrams.get(g, ()))
+            for v, n in shared.items():
+                if v in out:
+                    continue
+                similarity = n / (len(q_grams) + self._gram_count[v] - n)
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    out[v] = FUZZY_WEIGHT * similarity
+        return out
+
+    def _best_per_spot(self, matches: Dict[str, float]) -> Dict[int, float]:
+        if len(matches) == 1:
+            (v, score), = matches.items()
+            return dict.fromkeys(self._postings[v], score)
+        best: Dict[int, float] = {}
+        for v, score in matches.items():
+            for sid in self._postings[v]:
+                if score > best.get(sid, 0.0):
+                    best[sid] = score
+        return best
+
+    def _scores(self, query: str, fuzzy: bool, min_results: Optional[int]) -> Dict[int, float]:
+        """
+        {spotID: score}. Spots matching every query token come first; only if
+        there are fewer than `min_results` of them are partial matches scored
+        too (min_results=None means every token is required).
+        """
+        q_tokens = list(dict.fromkeys(tokenize(query)))
+        if not q_tokens:
+            return {}
+        matches = [self._token_matches(q, fuzzy) for q in q_tokens]
+        matches.sort(key=lambda m: sum(len(self._postings[v]) for v in m))
+
+        # AND pass: walk the rarest token's postings, then check each candidate's
+        # own tokens against the other query tokens instead of scanning postings
+        totals = self._best_per_spot(matches[0])
+        for m in matches[1:]:
+            if not totals:
+                break
+            for sid in list(totals):
+                s = max((m.get(t, 0.0) for t in self._address[sid].split()), default=0.0)
+                if s:
+                    totals[sid] += s
+                else:
+                    del totals[sid]
+
+        if min_results is not None and len(totals) < min_results and len(matches) > 1:
+            # OR pass for the remaining slots; partial matches score lower
+            partial: Dict[int, float] = {}
+            for m in matches:
+                for sid, s in self._best_per_spot(m).items():
+                    if sid not in totals:
+                        partial[sid] = partial.get(sid, 0.0) + s
+            totals.update(partial)
+
+        n = len(q_tokens)
+        phrase = " ".join(tokenize(query))
+        out: Dict[int, float] = {}
+        for sid, total in totals.items():
+            score = total / n
+            if n > 1 and phrase in self._address[sid]:
+                score += PHRASE_BONUS
+            out[sid] = score
+        return out
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple[int, float]]:
+        """Best-matching (spotID, score) pairs for `query`, best first."""
+        with self._lock:
+            scores = self._scores(query, fuzzy, min_results=limit)
+            top = heapq.nsmallest(
+                limit, scores.items(),
+                key=lambda kv: (-kv[1], len(self._address[kv[0]]), kv[0]),
+            )
+        return [(sid, round(score, 4)) for sid, score in top]
+
+    def matching_ids(self, query: str) -> Set[int]:
+        """spotIDs whose address contains every query token (substring match, no typos)."""
+        with self._lock:
+            return set(self._scores(query, fuzzy=False, min_results=None))
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+            return {
+                "spots": len(self._address),
+                "tokens": len(self._postings),
+                "trigrams": len(self._trigrams),
+                "age_seconds": age,
+            }
+
+
+def fetch_ranked(cursor, hits: Iterable[Tuple[int, float]], columns: str) -> List[dict]:
+    """
+    Load Spot rows for ranked (spotID, score) hits through a dictionary
+    cursor, keeping the ranking and adding each row's score.
+    """
+    hits = list(hits)
+    if not hits:
+        return []
+    cursor.execute(
+        f"SELECT {columns} FROM Spot WHERE spotID IN ({', '.join(['%s'] * len(hits))})",
+        tuple(sid for sid, _ in hits),
+    )
+    by_id = {row["spotID"]: row for row in cursor.fetchall()}
+    out = []
+    for sid, score in hits:
+        row = by_id.get(sid)
+        if row is not None:
+            row["score"] = score
+            out.append(row)
+    return out
+
+
+address_index = AddressIndex()
@@ -0,0 +1,253 @@
+"""
+In-memory prefix index behind /spots/autocomplete.
+
+Suggestions come from three sources: spot addresses, customer names and
+company names. Every suggestion is stored in one sorted list under a key
+for each word it contains, with the key running from that word to the end
+("12 main st" is stored under "12 main st", "main st" and "st"). A prefix
+lookup is then a bisect plus a short forward scan, so "mai" finds
+"12 Main St" as well as "Mainline Media".
+
+Entries are (key, word position, kind, id). Company names are shared by
+many customers, so they are stored once per distinct name (the id is the
+normalized name) and reference-counted by cID. Results are ranked by word
+position (a match at the start beats a mid-label match), then by label
+length, and de-duplicated by label. Like the spot indexes, the list is
+loaded from the database on first use (or at startup), patched by the
+spot/customer write routes and fully reloaded every `max_age` seconds
+(one reload at a time; writes made during it are re-applied afterwards).
+"""
+from __future__ import annotations
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from backend.spots.address_index import tokenize
+
+KINDS = ("address", "customer", "company")
+MAX_WORDS = 8         # a label is reachable from its first MAX_WORDS words
+SCAN_FACTOR = 20      # examine up to k * SCAN_FACTOR entries before ranking
+
+_Entry = Tuple[str, int, str, Union[int, str]]   # (key, word position, kind, id)
+
+
+class PrefixIndex:
+    def __init__(self, max_age: float = 600.0):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reload_lock = threading.RLock()
+        self._pending: Optional[list] = None   # writes seen while a reload is in flight
+        self._loaded_at: Optional[float] = None
+        self._entries: List[_Entry] = []
+        self._labels: Dict[Tuple[str, Union[int, str]], str] = {}   # (kind, id) -> label
+        self._company_of: Dict[int, str] = {}           # cID -> company key
+        self._company_members: Dict[str, Set[int]] = {} # company key -> cIDs
+
+    # ---------------------- loading ----------------------
+
+    def init_app(self, app) -> None:
+        self.max_age = float(app.config.get("SPOT_INDEX_MAX_AGE", self.max_age))
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, conn) -> int:
+        """(Re)build from Spot and Customers using `conn`."""
+        with self._reload_lock:
+            return self._load(conn)
+
+    def _load(self, conn) -> int:
+        self._begin_reload()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT spotID, address FROM Spot WHERE address IS NOT NULL")
+            spots = cur.fetchall()
+            cur.execute("SELECT cID, fName, lName, companyName FROM Customers")
+            customers = cur.fetchall()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        finally:
+            cur.close()
+
+        labels: Dict[Tuple[str, Union[int, str]], str] = {}
+        company_of: Dict[int, str] = {}
+        members: Dict[str, Set[int]] = {}
+        for spot_id, address in spots:
+            labels[("address", int(spot_id))] = address
+        for c_id, first, last, company in customers:
+            name = " ".join(p for p in (first, last) if p)
+            if name:
+                labels[("customer", int(c_id))] = name
+            company_key = _company_key(company)
+            if company_key:
+                labels.setdefault(("company", company_key), company.strip())
+                company_of[int(c_id)] = company_key
+                members.setdefault(company_key, set()).add(int(c_id))
+
+        entries = [e for (kind, id_), label in labels.items() for e in _entries_for(kind, id_, label)]
+        entries.sort()
+        with self._lock:
+            self._labels = labels
+            self._entries = entries
+            self._company_of = company_of
+            self._company_members = members
+            self._end_reload()
+            self._loaded_at = time.monotonic()
+        return len(labels)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or (
+            self.max_age > 0 and time.monotonic() - self._loaded_at > self.max_age
+        )
+
+    def ensure_loaded(self, db) -> None:
+        """Load on first use and whenever the index is older than max_age."""
+        if not self._stale():
+            return
+        with self._reload_lock:   # one reload at a time; the rest wait and find it fresh
+            if not self._stale():
+                return
+            conn = db.connect()
+            try:
+                self.load(conn)
+            finally:
+                conn.close()
+
+    def _begin_reload(self) -> None:
+        with self._lock:
+            self._pending = []
+
+    def _end_reload(self) -> None:
+        """Re-apply writes recorded while the reload's SELECT was running (call under _lock)."""
+        pending, self._pending = self._pending, None
+        for fn, args in pending or ():
+            fn(*args)
+
+    def _record(self, fn, *args) -> None:
+        """Called under _lock by every incremental write."""
+        if self._pending is not None:
+            self._pending.append((fn, args))
+
+    # ---------------------- incremental updates ----------------------
+
+    def upsert_spot(self, spot_id: int, address: Optional[str]) -> None:
+        with self._lock:
+            self._record(self.upsert_spot, spot_id, address)
+            self._drop("address", int(spot_id))
+            self._add("address", int(spot_id), address)
+
+    def remove_spot(self, spot_id: int) -> None:
+        with self._lock:
+            self._record(self.remove_spot, spot_id)
+            self._drop("address", int(spot_id))
+
+    def upsert_customer(self, c_id: int, first: Optional[str], last: Optional[str],
+                        company: Optional[str]) -> None:
+        c_id = int(c_id)
+        with self._lock:
+            self._record(self.upsert_customer, c_id, first, last, company)
+            self._drop("customer", c_id)
+            self._add("customer", c_id, " ".join(p for p in (first, last) if p))
+            self._leave_company(c_id)
+            company_key = _company_key(company)
+            if company_key:
+                members = self._company_members.setdefault(company_key, set())
+                if not members:
+                    self._add("company", company_key, company.strip())
+                members.add(c_id)
+                self._company_of[c_id] = company_key
+
+    def remove_customer(self, c_id: int) -> None:
+        with self._lock:
+            self._record(self.remove_customer, c_id)
+            self._drop("customer", int(c_id))
+            self._leave_company(int(c_id))
+
+    def _leave_company(self, c_id: int) -> None:
+        company_key = self._company_of.pop(c_id, None)
+        if company_key is None:
+            return
+        members = self._company_members.get(company_key, set())
+        members.discard(c_id)
+        if not members:
+            self._company_members.pop(company_key, None)
+            self._drop("company", company_key)
+
+    def _add(self, kind: str, id_: Union[int, str], label: Optional[str]) -> None:
+        if label:
+            self._labels[(kind, id_)] = label
+            for entry in _entries_for(kind, id_, label):
+                bisect.insort(self._entries, entry)
+
+    def _drop(self, kind: str, id_: Union[int, str]) -> None:
+        label = self._labels.pop((kind, id_), None)
+        if label is None:
+            return
+        for entry in _entries_for(kind, id_, label):
+            i = bisect.bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    # ---------------------- queries ----------------------
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def suggest(self, prefix: str, k: int = 10, kinds: Iterable[str] = KINDS) -> List[dict]:
+        """Up to k suggestions whose words start with `prefix`, best first."""
+        key = " ".join(tokenize(prefix))
+        if not key:
+            return []
+        kinds = set(kinds)
+        with self._lock:
+            i = bisect.bisect_left(self._entries, (key,))
+            candidates = []
+            budget = k * SCAN_FACTOR
+            while i < len(self._entries) and budget:
+                entry_key, pos, kind, id_ = self._entries[i]
+                if not entry_key.startswith(key):
+                    break
+                i += 1
+                if kind in kinds:
+                    label = self._labels[(kind, id_)]
+                    candidates.append((pos, len(label), label.lower(), kind, id_, label))
+                    budget -= 1
+
+        out, seen = [], set()
+        for pos, _, folded, kind, id_, label in sorted(candidates):
+            if (kind, folded) in seen:
+                continue
+            seen.add((kind, folded))
+            out.append({"text": label, "kind": kind, "id": None if kind == "company" else id_})
+            if len(out) == k:
+                break
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+            per_kind: Dict[str, int] = {kind: 0 for kind in KINDS}
+            for kind, _ in self._labels:
+                per_kind[kind] += 1
+            return {
+                "labels": per_kind,
+                "company_customers": len(self._company_of),
+                "entries": len(self._entries),
+                "age_seconds": age,
+            }
+
+
+def _company_key(company: Optional[str]) -> str:
+    return " ".join(tokenize(company))
+
+
+def _entries_for(kind: str, id_: Union[int, str], label: str) -> List[_Entry]:
+    words = tokenize(label)
+    return [(" ".join(words[i:]), i, kind, id_) for i in range(min(len(words), MAX_WORDS))]
+
+
+prefix_index = PrefixIndex()
@@ -0,0 +1,49 @@
+"""
+Geo helpers shared by the radius-search routes (/spots/near, /salesman/spots).
+
+The distance expressions in those queries can't use an index on their own, so
+every query is prefixed with a lat/lon bounding box that MySQL can satisfy from
+idx_spot_lat_lon; the exact distance is then only evaluated for candidates.
+"""
+from __future__ import annotations
+import math
+from typing import Any, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def bounding_box(lat: float, lon: float, radius_km: float
+                 ) -> Tuple[float, float, Optional[float], Optional[float]]:
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing the circle of
+    `radius_km` around (lat, lon). The longitude bounds are None when the
+    circle reaches a pole or crosses the antimeridian; callers then filter
+    on latitude only.
+    """
+    radius_km = max(0.0, radius_km)
+    ang = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(ang)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+
+    ratio = math.sin(ang) / math.cos(math.radians(lat))
+    if ratio >= 1.0:
+        return min_lat, max_lat, None, None
+    dlon = math.degrees(math.asin(ratio))
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180.0 or max_lon > 180.0:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def bbox_clause(lat: float, lon: float, radius_km: float) -> Tuple[str, List[Any]]:
+    """SQL fragment + params restricting Spot rows to the radius' bounding box."""
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    sql = "latitude BETWEEN %s AND %s"
+    params: List[Any] = [min_lat, max_lat]
+    if min_lon is not None:
+        sql += " AND longitude BETWEEN %s AND %s"
+        params += [min_lon, max_lon]
+    return sql, params
+
@@ -0,0 +1,277 @@
+"""
+In-memory geo index over Spot, so the map pages' radius and nearest-spot
+lookups are answered from NumPy arrays instead of MySQL.
+
+Spots live in parallel arrays (id / lat / lon / status code) plus a uniform
+lat/lon grid of cells -> row positions. A radius query only looks at the
+cells overlapping the circle's bounding box and evaluates the haversine
+distance for those rows in one vectorized pass; k-nearest grows the radius
+until it has k hits.
+
+The index is filled from the database on first use (or at startup, see
+create_app) and kept current by the spot write routes calling
+upsert()/remove()/refresh(). A full reload happens every `max_age` seconds
+as a safety net for writes made by other processes. Only one reload runs
+at a time, and writes that land while its SELECT is running are recorded
+and re-applied on top of the freshly loaded rows.
+"""
+from __future__ import annotations
+import itertools
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backend.spots.geo import EARTH_RADIUS_KM, bounding_box
+
+STATUSES = ("free", "inuse", "w.issue", "planned")
+_STATUS_CODE = {s: i for i, s in enumerate(STATUSES)}
+_NO_STATUS = -1
+
+_SELECT = "SELECT spotID, address, latitude, longitude, status FROM Spot"
+
+
+def _haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    p1 = math.radians(lat)
+    p2 = np.radians(lats)
+    dl = np.radians(lons - lon)
+    a = np.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpotGeoIndex:
+    def __init__(self, cell_deg: float = 0.1, max_age: float = 600.0):
+        self.cell_deg = cell_deg
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._reload_lock = threading.RLock()
+        self._pending: Optional[list] = None   # writes seen while a reload is in flight
+        self._loaded_at: Optional[float] = None
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        capacity = max(capacity, 1024)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._lat = np.zeros(capacity, dtype=np.float64)
+        self._lon = np.zeros(capacity, dtype=np.float64)
+        self._status = np.full(capacity, _NO_STATUS, dtype=np.int8)
+        self._address: List[Optional[str]] = [None] * capacity
+        self._row: Dict[int, int] = {}  # spotID -> row position
+        self._free: List[int] = []      # reusable row positions
+        self._size = 0                  # high-water mark of used rows
+        self._cells: Dict[tuple, set] = {}
+
+    # ---------------------- loading ----------------------
+
+    def init_app(self, app) -> None:
+        self.cell_deg = float(app.config.get("SPOT_INDEX_CELL_DEG", self.cell_deg))
+        self.max_age = float(app.config.get("SPOT_INDEX_MAX_AGE", self.max_age))
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, conn) -> int:
+        """(Re)build the whole index from the Spot table using `conn`."""
+        with self._reload_lock:
+            return self._load(conn)
+
+    def _load(self, conn) -> int:
+        self._begin_reload()
+        cur = conn.cursor()
+        try:
+            cur.execute(_SELECT + " WHERE latitude IS NOT NULL AND longitude IS NOT NULL")
+            rows = cur.fetchall()
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        finally:
+            cur.close()
+        with self._lock:
+            self._reset(int(len(rows) * 1.25))
+            for spot_id, address, lat, lon, status in rows:
+                self._put(int(spot_id), float(lat), float(lon), status, address)
+            self._end_reload()
+            self._loaded_at = time.monotonic()
+        return len(rows)
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or (
+            self.max_age > 0 and time.monotonic() - self._loaded_at > self.max_age
+        )
+
+    def ensure_loaded(self, db) -> None:
+        """Load on first use and whenever the index is older than max_age."""
+        if not self._stale():
+            return
+        with self._reload_lock:   # one reload at a time; the rest wait and find it fresh
+            if not self._stale():
+                return
+            conn = db.connect()
+            try:
+                self.load(conn)
+            finally:
+                conn.close()
+
+    def _begin_reload(self) -> None:
+        with self._lock:
+            self._pending = []
+
+    def _end_reload(self) -> None:
+        """Re-apply writes recorded while the reload's SELECT was running (call under _lock)."""
+        pending, self._pending = self._pending, None
+        for fn, args in pending or ():
+            fn(*args)
+
+    def _record(self, fn, *args) -> None:
+        """Called under _lock by every incremental write."""
+        if self._pending is not None:
+            self._pending.append((fn, args))
+
+    # ---------------------- incremental updates ----------------------
+
+    def upsert(self, spot_id: int, lat: Any, lon: Any, status: Optional[str], address: Optional[str]) -> None:
+        with self._lock:
+            self._record(self.upsert, spot_id, lat, lon, status, address)
+            self._drop(spot_id)
+            if lat is not None and lon is not None:
+                self._put(int(spot_id), float(lat), float(lon), status, address)
+
+    def remove(self, spot_id: int) -> None:
+        with self._lock:
+            self._record(self.remove, spot_id)
+            self._drop(spot_id)
+
+    def refresh(self, cursor, spot_id: int) -> None:
+        """Re-read one spot through `cursor` (any cursor type) and update the index."""
+        if not self.loaded:
+            return
+        cursor.execute(_SELECT + " WHERE spotID=%s", (spot_id,))
+        row = cursor.fetchone()
+        if row is None:
+            self.remove(spot_id)
+            return
+        if isinstance(row, dict):
+            row = (row["spotID"], row["address"], row["latitude"], row["longitude"], row["status"])
+        _, address, lat, lon, status = row
+        self.upsert(spot_id, lat, lon, status, address)
+
+    def _cell(self, lat: float, lon: float) -> tuple:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _put(self, spot_id: int, lat: float, lon: float, status: Optional[str], address: Optional[str]) -> None:
+        if self._free:
+            pos = self._free.pop()
+        else:
+            if self._size == len(self._ids):
+                self._grow()
+            pos = self._size
+            self._size += 1
+        self._ids[pos] = spot_id
+        self._lat[pos] = lat
+        self._lon[pos] = lon
+        self._status[pos] = _STATUS_CODE.get(status, _NO_STATUS)
+        self._address[pos] = address
+        self._row[spot_id] = pos
+        self._cells.setdefault(self._cell(lat, lon), set()).add(pos)
+
+    def _drop(self, spot_id: int) -> None:
+        pos = self._row.pop(int(spot_id), None)
+        if pos is None:
+            return
+        key = self._cell(self._lat[pos], self._lon[pos])
+        cell = self._cells.get(key)
+        if cell is not None:
+            cell.discard(pos)
+            if not cell:
+                del self._cells[key]
+        self._address[pos] = None
+        self._free.append(pos)
+
+    def _grow(self) -> None:
+        cap = len(self._ids) * 2
+        self._ids = np.resize(self._ids, cap)
+        self._lat = np.resize(self._lat, cap)
+        self._lon = np.resize(self._lon, cap)
+        self._status = np.resize(self._status, cap)
+        self._address.extend([None] * (cap - len(self._address)))
+
+    # ---------------------- queries ----------------------
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        if min_lon is None:
+            min_lon, max_lon = -180.0, 180.0
+        i0, j0 = self._cell(min_lat, min_lon)
+        i1, j1 = self._cell(max_lat, max_lon)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._cells):
+            cells = (v for (i, j), v in self._cells.items() if i0 <= i <= i1 and j0 <= j <= j1)
+        else:
+            cells = (self._cells.get((i, j)) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+        return np.fromiter(itertools.chain.from_iterable(c for c in cells if c), dtype=np.int64)
+
+    def _search(self, lat: float, lon: float, radius_km: float, status: Optional[str]):
+        pos = self._candidates(lat, lon, radius_km)
+        if status is not None and pos.size:
+            pos = pos[self._status[pos] == _STATUS_CODE.get(status, -2)]
+        if not pos.size:
+            return pos, np.empty(0)
+        dist = _haversine_km(lat, lon, self._lat[pos], self._lon[pos])
+        keep = dist <= radius_km
+        return pos[keep], dist[keep]
+
+    def _rows(self, pos: np.ndarray, dist: np.ndarray, limit: Optional[int]) -> List[dict]:
+        if limit is not None and pos.size > limit:
+            top = np.argpartition(dist, limit - 1)[:limit]
+            pos, dist = pos[top], dist[top]
+        order = np.argsort(dist, kind="stable")
+        out = []
+        for p, d in zip(pos[order].tolist(), dist[order].tolist()):
+            code = int(self._status[p])
+            out.append({
+                "spotID": int(self._ids[p]),
+                "address": self._address[p],
+                "latitude": float(self._lat[p]),
+                "longitude": float(self._lon[p]),
+                "status": STATUSES[code] if code != _NO_STATUS else "",
+                "distance_km": d,
+            })
+        return out
+
+    def radius(self, lat: float, lon: float, radius_km: float,
+               status: Optional[str] = None, limit: Optional[int] = 200) -> List[dict]:
+        """Spots within radius_km of (lat, lon), nearest first."""
+        with self._lock:
+            pos, dist = self._search(lat, lon, radius_km, status)
+            return self._rows(pos, dist, limit)
+
+    def nearest(self, lat: float, lon: float, k: int = 10, status: Optional[str] = None) -> List[dict]:
+        """The k spots closest to (lat, lon), nearest first."""
+        half_circumference = math.pi * EARTH_RADIUS_KM
+        radius_km = max(1.0, self.cell_deg * 111.0)
+        with self._lock:
+            while True:
+                pos, dist = self._search(lat, lon, radius_km, status)
+                if pos.size >= k or radius_km >= half_circumference:
+                    return self._rows(pos, dist, k)
+                radius_km = min(radius_km * 4, half_circumference)
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+            return {
+                "spots": len(self._row),
+                "cells": len(self._cells),
+                "cell_deg": self.cell_deg,
+                "capacity": len(self._ids),
+                "age_seconds": age,
+            }
+
+
+spot_index = SpotGeoIndex()
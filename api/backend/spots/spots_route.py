@@ -1,6 +1,11 @@
 from __future__ import annotations
 from flask import Blueprint, request, jsonify, current_app
 from backend.db_connection import db  
+from backend.spots.geo import bbox_clause
+from backend.spots.geo_index import spot_index
+from backend.spots.address_index import address_index, fetch_ranked
+from backend.spots.autocomplete import KINDS as SUGGEST_KINDS, prefix_index
+from backend.response_cache import cache
 from typing import Any, List
 
 
@@ -8,6 +13,15 @@ spots = Blueprint("spots", __name__)
 
 VALID_STATUSES = {"free", "inuse", "planned", "w.issue"}
 
+# Above this many address-index hits, ?q= on the list falls back to LIKE
+# rather than sending a huge IN (...) list
+MAX_ID_FILTER = 5000
+
+_SEARCH_COLUMNS = (
+    "spotID, price, contactTel, estViewPerMonth, monthlyRentCost, endTimeOfCurrentOrder, "
+    "status, address, longitude, latitude"
+)
+
 # ------------------------- helpers -------------------------
 
 def _valid_status(s: str | None) -> bool:
@@ -31,6 +45,7 @@ def _close(cursor, conn):
 # ------------------------- routes --------------------------
 
 @spots.route("/", methods=["GET"])
+@cache.cached(ttl=30, tags=("spots",))
 def list_spots():
     """
     GET /spots/
@@ -68,11 +83,23 @@ def list_spots():
             where.append("latitude BETWEEN %s AND %s")
             params += [min_lon, max_lon, min_lat, max_lat]
 
-        # q / key_word
+        # q / key_word: address contains every word, via the address index
         q = (request.args.get("q") or request.args.get("key_word") or "").strip()
         if q:
-            where.append("address LIKE %s")
-            params.append(f"%{q}%")
+            ids = None
+            try:
+                address_index.ensure_loaded(db)
+                ids = address_index.matching_ids(q)
+            except Exception as e:
+                current_app.logger.warning(f"list_spots: address index unavailable, using LIKE: {e}")
+            if ids is not None and not ids:
+                return jsonify([]), 200
+            if ids is not None and len(ids) <= MAX_ID_FILTER:
+                where.append("spotID IN (" + ",".join(["%s"] * len(ids)) + ")")
+                params.extend(sorted(ids))
+            else:
+                where.append("address LIKE %s")
+                params.append(f"%{q}%")
 
         # sort / page
         sort_map = {"spotID": "spotID", "price": "price", "views": "estViewPerMonth", "status": "status"}
@@ -92,7 +119,7 @@ def list_spots():
         params += [limit, offset]
 
         conn = db.connect()
-        cursor = conn.cursor()  # DictCursor set in db_connection
+        cursor = conn.cursor(dictionary=True)
         cursor.execute(sql, tuple(params))
         rows = cursor.fetchall()
         return jsonify(rows), 200
@@ -119,19 +146,27 @@ def create_spot():
             return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
         if not _valid_status(payload.get("status")):
             return jsonify({"error": "Invalid status"}), 400
+        coords = _numbers(payload["latitude"], payload["longitude"])
+        if coords is None:
+            return jsonify({"error": "latitude and longitude must be numbers"}), 400
+        lat, lon = coords
 
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute(
             "INSERT INTO Spot (price,contactTel,estViewPerMonth,monthlyRentCost,endTimeOfCurrentOrder,"
             "status,address,longitude,latitude,imageURL) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
             (
                 payload["price"], payload["contactTel"], payload["estViewPerMonth"], payload["monthlyRentCost"],
                 payload["endTimeOfCurrentOrder"], payload["status"], payload["address"],
-                payload["longitude"], payload["latitude"], payload.get("imageURL")
+                lon, lat, payload.get("imageURL")
             ),
         )
         conn.commit()
+        spot_index.upsert(cursor.lastrowid, lat, lon, payload["status"], payload["address"])
+        address_index.upsert(cursor.lastrowid, payload["address"])
+        prefix_index.upsert_spot(cursor.lastrowid, payload["address"])
+        cache.invalidate("spots")
         return jsonify({"message": "created", "spotID": cursor.lastrowid}), 201
     except Exception as e:
         current_app.logger.error(f"create_spot error: {e}")
@@ -141,11 +176,12 @@ def create_spot():
 
 
 @spots.route("/<int:spot_id>", methods=["GET"])
+@cache.cached(ttl=60, tags=("spot:{spot_id}",))
 def get_spot(spot_id: int):
     conn = cursor = None
     try:
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute(
             "SELECT spotID, price, contactTel, estViewPerMonth, monthlyRentCost, endTimeOfCurrentOrder, "
             "status, address, longitude, latitude, imageURL FROM Spot WHERE spotID=%s",
@@ -189,9 +225,19 @@ def update_spot(spot_id: int):
         values = [payload[k] for k in keys] + [spot_id]
 
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute(f"UPDATE Spot SET {sets} WHERE spotID=%s", tuple(values))
         conn.commit()
+        if {"latitude", "longitude", "status", "address"} & set(keys):
+            spot_index.refresh(cursor, spot_id)
+        if "address" in keys:
+            # re-read like spot_index.refresh: a PUT to a missing spotID must not index a phantom spot
+            cursor.execute("SELECT address FROM Spot WHERE spotID=%s", (spot_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                address_index.upsert(spot_id, row["address"])
+                prefix_index.upsert_spot(spot_id, row["address"])
+        cache.invalidate("spots", f"spot:{spot_id}")
         return jsonify({"message": "updated", "spotID": spot_id}), 200
 
     except Exception as e:
@@ -206,9 +252,13 @@ def delete_spot(spot_id: int):
     conn = cursor = None
     try:
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute("DELETE FROM Spot WHERE spotID=%s", (spot_id,))
         conn.commit()
+        spot_index.remove(spot_id)
+        address_index.remove(spot_id)
+        prefix_index.remove_spot(spot_id)
+        cache.invalidate("spots", f"spot:{spot_id}")
         return jsonify({"message": "deleted", "spotID": spot_id}), 200
     except Exception as e:
         current_app.logger.error(f"delete_spot error: {e}")
@@ -240,13 +290,15 @@ def find_spots_near():
         if status and not _valid_status(status):
             return jsonify({"error": "Invalid status"}), 400
 
-        params: List[Any] = [lat, lon, lat]
+        # bounding box first so only index-range candidates get the trig expression
+        box_sql, box_params = bbox_clause(lat, lon, radius_km)
+        params: List[Any] = [lat, lon, lat] + box_params
         sql = (
             "SELECT spotID, price, contactTel, estViewPerMonth, monthlyRentCost, endTimeOfCurrentOrder, "
             "status, address, longitude, latitude, "
-            "(6371 * acos( cos(radians(%s)) * cos(radians(latitude)) * "
-            "cos(radians(longitude) - radians(%s)) + sin(radians(%s)) * sin(radians(latitude)) )) AS distance_km "
-            "FROM Spot WHERE latitude IS NOT NULL AND longitude IS NOT NULL "
+            "(6371 * acos(LEAST(1, cos(radians(%s)) * cos(radians(latitude)) * "
+            "cos(radians(longitude) - radians(%s)) + sin(radians(%s)) * sin(radians(latitude))))) AS distance_km "
+            f"FROM Spot WHERE {box_sql} "
         )
         if status:
             sql += "AND status=%s "
@@ -255,7 +307,7 @@ def find_spots_near():
         params.append(radius_km)
 
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
         cursor.execute(sql, tuple(params))
         rows = cursor.fetchall()
         return jsonify(rows), 200
@@ -267,11 +319,69 @@ def find_spots_near():
         _close(cursor, conn)
 
 
+@spots.route("/nearest", methods=["GET"])
+def find_nearest_spots():
+    """
+    GET /spots/nearest?lat=29.6516&lon=-82.3248&k=10&status=free
+    k closest spots, answered from the in-memory geo index (also accepts lng=)
+    """
+    try:
+        lat_s = request.args.get("lat")
+        lon_s = request.args.get("lon") or request.args.get("lng")
+        status = request.args.get("status")
+        if not lat_s or not lon_s:
+            return jsonify({"error": "Missing required query params: lat, lon"}), 400
+        nums = _numbers(lat_s, lon_s)
+        if not nums:
+            return jsonify({"error": "lat, lon must be numeric"}), 400
+        lat, lon = nums
+        try:
+            k = max(1, min(500, int(request.args.get("k", "10"))))
+        except ValueError:
+            return jsonify({"error": "k must be an integer"}), 400
+        if status and not _valid_status(status):
+            return jsonify({"error": "Invalid status"}), 400
+
+        spot_index.ensure_loaded(db)
+        return jsonify(spot_index.nearest(lat, lon, k, status=status or None)), 200
+
+    except Exception as e:
+        current_app.logger.error(f"find_nearest_spots error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@spots.route("/autocomplete", methods=["GET"])
+def autocomplete():
+    """
+    GET /spots/autocomplete?prefix=mai&k=10&kinds=address,customer,company
+    Suggestions whose words start with `prefix`, from the in-memory prefix index.
+    """
+    prefix = (request.args.get("prefix") or request.args.get("q") or "").strip()
+    if not prefix:
+        return jsonify([]), 200
+    try:
+        k = max(1, min(50, int(request.args.get("k", "10"))))
+    except ValueError:
+        return jsonify({"error": "k must be an integer"}), 400
+    kinds_raw = (request.args.get("kinds") or "").strip()
+    kinds = [x.strip() for x in kinds_raw.split(",") if x.strip()] or list(SUGGEST_KINDS)
+    if not set(kinds) <= set(SUGGEST_KINDS):
+        return jsonify({"error": f"kinds must be among: {', '.join(SUGGEST_KINDS)}"}), 400
+
+    try:
+        prefix_index.ensure_loaded(db)
+        return jsonify(prefix_index.suggest(prefix, k=k, kinds=kinds)), 200
+    except Exception as e:
+        current_app.logger.error(f"autocomplete error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @spots.route("/search", methods=["GET"])
 def search_spots():
     """
     GET /spots/search?q=Main&top_n=20
-    Also supports key_word=. Falls back to LIKE if FULLTEXT is unavailable.
+    Also supports key_word=. Ranked substring/typo-tolerant matches from the
+    address index, each row with its score; falls back to FULLTEXT, then LIKE.
     """
     conn = cursor = None
     try:
@@ -284,22 +394,28 @@ def search_spots():
         except Exception:
             return jsonify({"error": "top_n must be an integer"}), 400
 
+        hits = None
+        try:
+            address_index.ensure_loaded(db)
+            hits = address_index.search(q, limit=top_n)
+        except Exception as e:
+            current_app.logger.warning(f"search_spots: address index unavailable, using SQL: {e}")
+
         conn = db.connect()
-        cursor = conn.cursor()
+        cursor = conn.cursor(dictionary=True)
+        if hits is not None:
+            return jsonify(fetch_ranked(cursor, hits, _SEARCH_COLUMNS)), 200
         try:
             cursor.execute(
-                "SELECT spotID, price, contactTel, estViewPerMonth, monthlyRentCost, endTimeOfCurrentOrder, "
-                "status, address, longitude, latitude "
+                f"SELECT {_SEARCH_COLUMNS} "
                 "FROM Spot WHERE MATCH(address) AGAINST (%s IN NATURAL LANGUAGE MODE) LIMIT %s",
                 (q, top_n),
             )
         except Exception:
             cursor.execute(
-                "SELECT spotID, price, contactTel, estViewPerMonth, monthlyRentCost, endTimeOfCurrentOrder, "
-                "status, address, longitude, latitude "
-                "FROM Spot WHERE address LIKE %s LIMIT %s",
-                "(f\"%{q}%\", top_n)",
-                 )
+                f"SELECT {_SEARCH_COLUMNS} FROM Spot WHERE address LIKE %s LIMIT %s",
+                (f"%{q}%", top_n),
+            )
         rows = cursor.fetchall()
         return jsonify(rows), 200
 
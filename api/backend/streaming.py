@@ -0,0 +1,63 @@
+"""
+NDJSON streaming for large exports.
+
+    GET /orders?stream=1
+    GET /orders                  with  Accept: application/x-ndjson
+
+A streaming request gets one JSON object per line instead of a JSON array.
+Rows are read from an unbuffered cursor with fetchmany(CHUNK_ROWS) and
+written out in chunks as they arrive, so the API's memory use stays flat
+however many rows match. The borrowed connection is held until the client
+has read the last row and is then handed back to the pool. If the query
+fails mid-stream the status line has already gone out, so the error is sent
+as a final {"error": ...} line.
+
+Streamed responses are never stored in the response cache.
+"""
+from __future__ import annotations
+from typing import Iterator, Sequence
+
+from flask import Response, current_app, request, stream_with_context
+
+from backend.db_connection import db
+
+NDJSON = "application/x-ndjson"
+CHUNK_ROWS = 1000
+
+
+def wants_stream() -> bool:
+    """?stream=1, or an Accept header that prefers NDJSON over JSON."""
+    if (request.args.get("stream") or "").strip().lower() in ("1", "true", "yes"):
+        return True
+    accept = request.accept_mimetypes
+    return accept[NDJSON] > 0 and accept.best_match([NDJSON, "application/json"]) == NDJSON
+
+
+def ndjson_response(query: str, params: Sequence = (), chunk_rows: int = CHUNK_ROWS) -> Response:
+    """Stream the rows of `query` as NDJSON."""
+    return Response(stream_with_context(_rows_as_ndjson(query, tuple(params), chunk_rows)), mimetype=NDJSON)
+
+
+def _rows_as_ndjson(query: str, params: tuple, chunk_rows: int) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    logger = current_app.logger
+    conn = db.connect()
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=True)   # unbuffered: rows stay on the server until fetched
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield "".join(dumps(row) + "\n" for row in rows)
+    except Exception as e:
+        logger.error(f"ndjson stream error: {e}")
+        yield dumps({"error": str(e)}) + "\n"
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except Exception:
+                pass  # unread rows after a client disconnect; the pool rolls back / replaces it
+        conn.close()
@@ -0,0 +1,136 @@
+"""
+Latency of customer search vs table size.
+
+Compares the old four-column '%q%' LIKE scan against what /customer/?q=
+runs now (backend.customers.customer_search): FULLTEXT word-prefix search
+over ft_customer_search, and the exact email lookup on idx_customers_email.
+
+Runs against the MySQL configured via the usual DB_* env vars, in a scratch
+table `CustomerBench` that is dropped afterwards:
+
+    python -m benchmarks.bench_customer_search --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+import mysql.connector as mysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.customers.customer_search import exact_clause, word_clause  # noqa: E402
+
+CHUNK = 10_000
+COLUMNS = "cID, fName, lName, email, TEL"
+
+
+def connect():
+    return mysql.connect(
+        host=os.getenv("DB_HOST", "127.0.0.1"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", "changeme"),
+        database=os.getenv("DB_NAME", "SpotLight"),
+    )
+
+
+def _word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))).title()
+
+
+def load(conn, n, rng):
+    """Fill CustomerBench with n rows; returns a sample of (last name, company, email) to query."""
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS CustomerBench")
+    cur.execute(
+        "CREATE TABLE CustomerBench ("
+        " cID INT AUTO_INCREMENT PRIMARY KEY,"
+        " fName VARCHAR(50), lName VARCHAR(50), email VARCHAR(50),"
+        " companyName VARCHAR(50), TEL VARCHAR(20),"
+        " FULLTEXT KEY ft_customer_search (fName, lName, email, companyName),"
+        " INDEX idx_customers_email (email))"
+    )
+    first_names = [_word(rng) for _ in range(2_000)]
+    last_names = [_word(rng) for _ in range(20_000)]
+    companies = [_word(rng) + " " + rng.choice(["Media", "Group", "Labs", "Retail"]) for _ in range(5_000)]
+    sample = []
+    for start in range(0, n, CHUNK):
+        rows = []
+        for i in range(min(CHUNK, n - start)):
+            first, last, company = rng.choice(first_names), rng.choice(last_names), rng.choice(companies)
+            email = f"{first}.{last}{start + i}@example.com".lower()
+            rows.append((first, last, email, company, "555-0100"))
+            if i == 0 or rng.random() < 0.001:
+                sample.append((last, company, email))
+        cur.executemany(
+            "INSERT INTO CustomerBench (fName, lName, email, companyName, TEL) VALUES (%s,%s,%s,%s,%s)", rows
+        )
+        conn.commit()
+    cur.execute("ANALYZE TABLE CustomerBench")
+    cur.fetchall()
+    cur.close()
+    return sample
+
+
+def time_queries(conn, queries):
+    cur = conn.cursor()
+    samples = []
+    for sql, params in queries:
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        samples.append((time.perf_counter() - t0) * 1000)
+    cur.close()
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = random.Random(42)
+    conn = connect()
+    print(f"{args.repeat} queries per size, page of 200")
+    print(f"{'rows':>10} | {'LIKE p50/p95 ms':>18} | {'FULLTEXT p50/p95 ms':>20} | {'email p50/p95 ms':>17}")
+    try:
+        for n in args.sizes:
+            sample = load(conn, n, rng)
+            terms = [rng.choice(sample) for _ in range(args.repeat)]
+
+            like_sql = (
+                f"SELECT {COLUMNS} FROM CustomerBench "
+                "WHERE fName LIKE %s OR lName LIKE %s OR email LIKE %s OR companyName LIKE %s "
+                "ORDER BY cID DESC LIMIT 200"
+            )
+            like = [(like_sql, (f"%{last}%",) * 4) for last, _, _ in terms]
+
+            fulltext = []
+            for last, company, _ in terms:
+                where, params = word_clause(f"{last} {company.split()[0]}")
+                fulltext.append((f"SELECT {COLUMNS} FROM CustomerBench WHERE {where} ORDER BY cID DESC LIMIT 200",
+                                 tuple(params)))
+
+            exact = []
+            for _, _, email in terms:
+                where, params = exact_clause(email)
+                exact.append((f"SELECT {COLUMNS} FROM CustomerBench WHERE {where} LIMIT 200", tuple(params)))
+
+            l50, l95 = time_queries(conn, like)
+            f50, f95 = time_queries(conn, fulltext)
+            e50, e95 = time_queries(conn, exact)
+            print(f"{n:>10} | {l50:>8.2f} / {l95:>7.2f} | {f50:>9.2f} / {f95:>8.2f} | {e50:>7.2f} / {e95:>7.2f}")
+    finally:
+        cur = conn.cursor()
+        cur.execute("DROP TABLE IF EXISTS CustomerBench")
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Encode time and size of large JSON responses: Flask's default provider vs
+backend.json_provider.OrjsonProvider (what create_app installs).
+
+Rows mimic DictCursor output for /spots/ and /orders: Decimal prices and
+totals, DATE and DATETIME columns. Each provider renders the full response
+(provider.response(rows), i.e. what jsonify does). No database needed:
+
+    python -m benchmarks.bench_json --rows 10000 --repeat 20
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.json_provider import OrjsonProvider, orjson  # noqa: E402
+
+
+def spot_rows(n, rng):
+    base = datetime.date(2025, 1, 1)
+    return [
+        {
+            "spotID": i,
+            "price": Decimal(f"{rng.uniform(50, 5000):.2f}"),
+            "contactTel": "555-0100",
+            "estViewPerMonth": rng.randint(1_000, 500_000),
+            "monthlyRentCost": Decimal(f"{rng.uniform(20, 2000):.2f}"),
+            "endTimeOfCurrentOrder": base + datetime.timedelta(days=rng.randint(0, 700)) if i % 3 else None,
+            "status": rng.choice(["free", "inuse", "w.issue", "planned"]),
+            "address": f"{rng.randint(1, 9999)} NW {rng.randint(1, 60)}TH ST",
+            "longitude": rng.uniform(-82.5, -82.2),
+            "latitude": rng.uniform(29.5, 29.8),
+            "imageURL": "https://source.unsplash.com/random/200x200/?billboard",
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def order_rows(n, rng):
+    base = datetime.datetime(2025, 1, 1, 9, 0, 0)
+    return [
+        {
+            "orderID": i,
+            "date": (base + datetime.timedelta(days=rng.randint(0, 700))).date(),
+            "total": Decimal(f"{rng.uniform(100, 20000):.2f}"),
+            "cID": rng.randint(1, 5000),
+            "processTime": base + datetime.timedelta(minutes=rng.randint(0, 10**6)),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def time_provider(app, provider, rows, repeat):
+    samples, size = [], 0
+    with app.app_context():
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            resp = provider.response(rows)
+            size = len(resp.get_data())
+            samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), size
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+    if orjson is None:
+        sys.exit("orjson is not installed")
+
+    rng = random.Random(42)
+    app = Flask(__name__)
+    providers = [("default", DefaultJSONProvider(app)), ("orjson", OrjsonProvider(app))]
+    print(f"{args.rows} rows, median of {args.repeat}")
+    print(f"{'payload':>8} | {'provider':>8} | {'encode ms':>9} | {'bytes':>10}")
+    for name, rows in (("spots", spot_rows(args.rows, rng)), ("orders", order_rows(args.rows, rng))):
+        for label, provider in providers:
+            ms, size = time_provider(app, provider, rows, args.repeat)
+            print(f"{name:>8} | {label:>8} | {ms:>9.2f} | {size:>10,}")
+
+
+if __name__ == "__main__":
+    main()
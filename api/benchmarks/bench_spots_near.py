@@ -0,0 +1,126 @@
+"""
+Latency of the /spots/near radius query vs table size.
+
+Compares the old full-scan form (distance evaluated for every row, filtered
+with HAVING) against the bounding-box form used by the routes now
+(idx_spot_lat_lon range scan, distance only for candidates).
+
+Runs against the MySQL configured via the usual DB_* env vars, in a scratch
+table `SpotBench` that is dropped afterwards:
+
+    python -m benchmarks.bench_spots_near --sizes 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import mysql.connector as mysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from backend.spots.geo import bbox_clause  # noqa: E402
+
+# roughly the continental US, like the seed data
+LAT_RANGE = (25.0, 49.0)
+LON_RANGE = (-124.0, -67.0)
+CHUNK = 10_000
+
+DISTANCE = (
+    "(6371 * acos(LEAST(1, cos(radians(%s)) * cos(radians(latitude)) * "
+    "cos(radians(longitude) - radians(%s)) + sin(radians(%s)) * sin(radians(latitude)))))"
+)
+
+
+def connect():
+    return mysql.connect(
+        host=os.getenv("DB_HOST", "127.0.0.1"),
+        port=int(os.getenv("DB_PORT", "3306")),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", "changeme"),
+        database=os.getenv("DB_NAME", "SpotLight"),
+    )
+
+
+def load(conn, n):
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS SpotBench")
+    cur.execute(
+        "CREATE TABLE SpotBench ("
+        " spotID INT AUTO_INCREMENT PRIMARY KEY,"
+        " status ENUM('free','inuse','w.issue','planned'),"
+        " address VARCHAR(100), latitude DOUBLE, longitude DOUBLE,"
+        " INDEX idx_spot_lat_lon (latitude, longitude))"
+    )
+    statuses = ("free", "inuse", "w.issue", "planned")
+    for start in range(0, n, CHUNK):
+        rows = [
+            (random.choice(statuses), f"{start + i} Bench St",
+             random.uniform(*LAT_RANGE), random.uniform(*LON_RANGE))
+            for i in range(min(CHUNK, n - start))
+        ]
+        cur.executemany(
+            "INSERT INTO SpotBench (status, address, latitude, longitude) VALUES (%s,%s,%s,%s)", rows
+        )
+        conn.commit()
+    cur.execute("ANALYZE TABLE SpotBench")
+    cur.fetchall()
+    cur.close()
+
+
+def time_queries(conn, queries):
+    cur = conn.cursor()
+    samples = []
+    for sql, params in queries:
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        samples.append((time.perf_counter() - t0) * 1000)
+    cur.close()
+    samples.sort()
+    return statistics.median(samples), samples[max(0, int(len(samples) * 0.95) - 1)]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    ap.add_argument("--radius-km", type=float, default=5.0)
+    ap.add_argument("--repeat", type=int, default=50)
+    args = ap.parse_args()
+
+    random.seed(42)
+    centers = [(random.uniform(*LAT_RANGE), random.uniform(*LON_RANGE)) for _ in range(args.repeat)]
+    full_sql = (
+        f"SELECT spotID, {DISTANCE} AS distance_km FROM SpotBench "
+        "WHERE latitude IS NOT NULL AND longitude IS NOT NULL "
+        "HAVING distance_km <= %s ORDER BY distance_km LIMIT 100"
+    )
+    full_queries = [(full_sql, (lat, lon, lat, args.radius_km)) for lat, lon in centers]
+    bbox_queries = []
+    for lat, lon in centers:
+        box_sql, box = bbox_clause(lat, lon, args.radius_km)
+        bbox_sql = (
+            f"SELECT spotID, {DISTANCE} AS distance_km FROM SpotBench WHERE {box_sql} "
+            "HAVING distance_km <= %s ORDER BY distance_km LIMIT 100"
+        )
+        bbox_queries.append((bbox_sql, (lat, lon, lat, *box, args.radius_km)))
+
+    conn = connect()
+    print(f"radius={args.radius_km} km, {args.repeat} queries per size")
+    print(f"{'rows':>10} | {'full scan p50/p95 ms':>22} | {'bbox p50/p95 ms':>18} | speedup")
+    try:
+        for n in args.sizes:
+            load(conn, n)
+            f50, f95 = time_queries(conn, full_queries)
+            b50, b95 = time_queries(conn, bbox_queries)
+            print(f"{n:>10} | {f50:>10.2f} / {f95:>9.2f} | {b50:>7.2f} / {b95:>8.2f} | {f50 / max(b50, 1e-6):6.1f}x")
+    finally:
+        cur = conn.cursor()
+        cur.execute("DROP TABLE IF EXISTS SpotBench")
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -29,12 +29,12 @@ with col_b:
     if st.button("Refresh"):
         pass
 
-code, data = api("GET", f"/customer/?q={q}") if q else api("GET", "/customer/")
+code, data = api("GET", "/customer/", params={"q": q}) if q else api("GET", "/customer/")
 if code != 200 or isinstance(data, dict) and data.get("error"):
     st.error(f"Failed to load customers: {data}")
     st.stop()
 
-rows = data if isinstance(data, list) else []
+rows = data.get("data", []) if isinstance(data, dict) else []
 if not rows:
     st.info("No customers found.")
     st.stop()
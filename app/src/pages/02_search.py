@@ -5,6 +5,7 @@ import pandas as pd
 from modules.nav import SideBarLinks
 
 API_URL = "http://web-api:4000/o_and_m"
+SPOTS_URL = "http://web-api:4000/spots"
 
 st.title("Search Spots")
 
@@ -20,8 +21,24 @@ def search_spots(query: str):
         st.error(f"Search error: {e}")
     return pd.DataFrame()
 
+def autocomplete(prefix: str):
+    try:
+        r = requests.get(f"{SPOTS_URL}/autocomplete", params={"prefix": prefix, "k": 8, "kinds": "address"}, timeout=2)
+        if r.status_code == 200:
+            return [s["text"] for s in r.json()]
+    except Exception:
+        pass
+    return []
+
 query = st.text_input("Search", placeholder="Enter address, street, or city...")
 
+if query:
+    suggestions = autocomplete(query)
+    if suggestions:
+        picked = st.pills("Suggestions", suggestions, selection_mode="single")
+        if picked:
+            query = picked
+
 if query:
     results_df = search_spots(query)
     if not results_df.empty:
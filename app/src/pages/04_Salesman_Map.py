@@ -39,11 +39,12 @@ with col3:
     search_query = st.text_input("Search customers", placeholder="Name, email, or company...")
 
 # Fetch customers data
-params = f"limit={limit}"
+params = {"limit": limit}
 if search_query:
-    params = f"q={search_query}"
+    params["q"] = search_query
 
-data = api_get(f"/customer/?{params}")
+resp = api_get("/customer/", params=params)
+data = resp.get("data", []) if isinstance(resp, dict) else []
 
 if not isinstance(data, list) or len(data) == 0:
     st.info("No customers found. Try adjusting your search or filters.")
@@ -34,8 +34,16 @@ if "cart" not in st.session_state:
 
 # --- pick a customer ---
 st.subheader("1) Who is ordering?")
-code, customers = api("GET", "/customer/")
-if code != 200 or not isinstance(customers, list) or len(customers)==0:
+customers, params = [], {"limit": 1000}
+for _ in range(20):  # /customer/ pages by keyset; follow next_cursor (up to 20k customers)
+    code, page = api("GET", "/customer/", params=params)
+    if code != 200 or not isinstance(page, dict):
+        break
+    customers += page.get("data", [])
+    if not page.get("next_cursor"):
+        break
+    params["cursor"] = page["next_cursor"]
+if not customers:
     st.error("Could not load customers from /customer/.")
     st.stop()
 
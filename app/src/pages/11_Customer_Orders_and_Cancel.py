@@ -22,8 +22,9 @@ SideBarLinks()
 
 
 # Pick a customer
-code, customers = api("GET", "/customer/")
-if code != 200 or not isinstance(customers, list) or len(customers)==0:
+code, customers = api("GET", "/customer/", params={"limit": 1000})
+customers = customers.get("data", []) if code == 200 and isinstance(customers, dict) else []
+if not customers:
     st.error("Could not load customers from /customer/.")
     st.stop()
 
@@ -47,11 +48,12 @@ if oc != 200 or not isinstance(odata, list): ...
 df = pd.DataFrame(odata)
 
 # NEW: pull paid/unpaid info
-tcode, tdata = api("GET", "/to_be_processed_order")  # unpaid/open
-pcode, pdata = api("GET", "/processed_orders")       # paid
+# (paged endpoints: {"data": [...], "next_cursor": ...}; the customer filter keeps this to one page)
+tcode, tdata = api("GET", "/to_be_processed_order", params={"cID": cID, "limit": 1000})  # unpaid/open
+pcode, pdata = api("GET", "/processed_orders", params={"cID": cID, "limit": 1000})       # paid
 
-open_ids = set([row["orderID"] for row in tdata]) if tcode == 200 and isinstance(tdata, list) else set()
-paid_ids = set([row["orderID"] for row in pdata]) if pcode == 200 and isinstance(pdata, list) else set()
+open_ids = set([row["orderID"] for row in tdata["data"]]) if tcode == 200 and isinstance(tdata, dict) else set()
+paid_ids = set([row["orderID"] for row in pdata["data"]]) if pcode == 200 and isinstance(pdata, dict) else set()
 
 def label_status(oid: int) -> str:
     if oid in open_ids: return "UNPAID"
@@ -18,6 +18,19 @@ def api(method: str, path: str, **kw):
     except Exception as e:
         return 0, {"error": str(e)}
 
+def api_frame(path: str):
+    """GET a list endpoint as a DataFrame via ?format=arrow, falling back to JSON."""
+    sep = "&" if "?" in path else "?"
+    try:
+        import pyarrow as pa  # ships with streamlit
+        r = requests.get(f"{API}/{path.lstrip('/')}{sep}format=arrow", timeout=20)
+        if r.status_code == 200 and r.headers.get("content-type", "").startswith("application/vnd.apache.arrow"):
+            return 200, pa.ipc.open_stream(r.content).read_pandas()
+    except Exception:
+        pass
+    code, data = api("GET", path)
+    return code, pd.DataFrame(data) if code == 200 and isinstance(data, list) else data
+
 period = st.segmented_control("Period", ["90d", "180d", "365d", "730d"], default="365d")
 st.caption("Metrics use the selected period where applicable (orders).")
 
@@ -75,27 +88,24 @@ st.divider()
 t1, t2, t3 = st.tabs(["Recent spots", "Recent customers", "Recent orders"])
 
 with t1:
-    code, data = api("GET", "/o_and_m/spots/summary?limit=25")
-    if code == 200 and isinstance(data, list) and data:
-        df = pd.DataFrame(data)
+    code, df = api_frame("/o_and_m/spots/summary?limit=25")
+    if code == 200 and isinstance(df, pd.DataFrame) and not df.empty:
         show = [c for c in ["spotID","address","status","price","estViewPerMonth","monthlyRentCost"] if c in df.columns]
         st.dataframe(df[show], use_container_width=True, hide_index=True)
     else:
         st.info("No data.")
 
 with t2:
-    code, data = api("GET", "/o_and_m/customers/summary?limit=25")
-    if code == 200 and isinstance(data, list) and data:
-        df = pd.DataFrame(data)
+    code, df = api_frame("/o_and_m/customers/summary?limit=25")
+    if code == 200 and isinstance(df, pd.DataFrame) and not df.empty:
         show = [c for c in ["cID","fName","lName","email","companyName","VIP","last_order_date","days_since_last_order"] if c in df.columns]
         st.dataframe(df[show], use_container_width=True, hide_index=True)
     else:
         st.info("No data.")
 
 with t3:
-    code, data = api("GET", f"/o_and_m/orders/summary?period={period}&limit=25")
-    if code == 200 and isinstance(data, list) and data:
-        df = pd.DataFrame(data)
+    code, df = api_frame(f"/o_and_m/orders/summary?period={period}&limit=25")
+    if code == 200 and isinstance(df, pd.DataFrame) and not df.empty:
         show = [c for c in ["orderID","date","total","cID"] if c in df.columns]
         st.dataframe(df[show], use_container_width=True, hide_index=True)
     else:
@@ -152,10 +152,19 @@ Optional (Spots): `imageURL`, `estViewPerMonth`, `monthlyRentCost`, `contactTel`
                 payload_list = df.to_dict(orient="records")
                 target = "regions" if entity=="Regions" else ("buildings" if entity=="Buildings" else "spots")
 
-                # Try bulk first
-                code, data = api("POST", f"/o_and_m/bulk_import?entity={target}&mode={mode.lower()}", json=payload_list)
+                # Try bulk first; CSV goes up as-is so the API can stream it
+                bulk_path = f"/o_and_m/bulk_import?entity={target}&mode={mode.lower()}"
+                if uploaded.type.endswith("json"):
+                    code, data = api("POST", bulk_path, json=payload_list)
+                else:
+                    code, data = api("POST", bulk_path, data=uploaded.getvalue(), headers={"Content-Type": "text/csv"})
                 if code in (200,201):
-                    st.success(f"Bulk {mode.lower()} OK: {data}")
+                    done = data.get("inserted", data.get("updated", 0))
+                    st.success(f"Bulk {mode.lower()}: {done} of {data.get('received', 0)} rows written, {data.get('failed', 0)} failed")
+                    if data.get("errors"):
+                        st.dataframe(pd.DataFrame(data["errors"]), use_container_width=True, hide_index=True)
+                    if data.get("aborted"):
+                        st.warning(f"Import stopped early: {data['aborted']}")
                 else:
                     # fallback: per-row insert/update
                     successes = failures = 0
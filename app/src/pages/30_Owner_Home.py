@@ -64,10 +64,13 @@ st.divider()
 # ---- Region heat (preferred Owner API; graceful fallback text) ----
 st.subheader("Regions — spots, in-use %, revenue (90d)")
 rc, rdata = api("GET", "/owner/regions/rollup?period=90d")
-if rc == 200 and isinstance(rdata, list) and rdata:
-    df_regions = pd.DataFrame(rdata)
+rrows = rdata.get("data", []) if rc == 200 and isinstance(rdata, dict) else []
+if rrows:
+    df_regions = pd.DataFrame(rrows)
     want = [c for c in ["region","spots_total","in_use_pct","revenue_90d","orders_90d","views_90d"] if c in df_regions.columns]
     st.dataframe(df_regions[want], use_container_width=True, hide_index=True)
+    if rdata.get("stale"):
+        st.caption("Region history hasn't been rebuilt today; recent days may be missing until the nightly refresh.")
 else:
     st.info("Region rollup not available yet. Add /owner/regions/rollup or extend O&M summaries.")
 
@@ -78,29 +81,18 @@ cA, cB = st.columns(2)
 
 with cA:
     st.subheader("Top 10 Clients by Spend (90d)")
-    oc, odata = api("GET", "/o_and_m/orders/summary?period=90d&limit=10000")
-    if oc == 200 and isinstance(odata, list) and odata:
-        df = pd.DataFrame(odata)
-        if {"cID","total"}.issubset(df.columns):
-            top = (df.groupby("cID")["total"]
-                     .sum()
-                     .reset_index()
-                     .sort_values("total", ascending=False)
-                     .head(10))
-            # best-effort names
-            names = {}
-            for cid in top["cID"].tolist():
-                nc, ndata = api("GET", f"/customer/{int(cid)}")
-                if nc == 200 and isinstance(ndata, dict):
-                    nm = f"{ndata.get('fName','')} {ndata.get('lName','')}".strip()
-                    if ndata.get("companyName"):
-                        nm = f"{nm} ({ndata.get('companyName')})" if nm else ndata.get("companyName")
-                else:
-                    nm = f"Customer {cid}"
-                names[cid] = nm
-            top["customer"] = top["cID"].map(names)
-            top["total"] = top["total"].map(lambda x: f"${fnum(x):,.0f}")
-            st.dataframe(top[["customer","cID","total"]], use_container_width=True, hide_index=True)
+    oc, odata = api("GET", "/owner/customers/top", params={"period": "90d", "metric": "spend", "limit": 10})
+    rows = odata.get("data", []) if oc == 200 and isinstance(odata, dict) else []
+    if rows:
+        top = pd.DataFrame(rows)
+        def _name(r):
+            nm = f"{r.get('fName') or ''} {r.get('lName') or ''}".strip()
+            if r.get("companyName"):
+                nm = f"{nm} ({r.get('companyName')})" if nm else r.get("companyName")
+            return nm or f"Customer {r.get('cID')}"
+        top["customer"] = [_name(r) for r in rows]
+        top["total"] = top["spend"].map(lambda x: f"${fnum(x):,.0f}")
+        st.dataframe(top[["customer","cID","total"]], use_container_width=True, hide_index=True)
     else:
         st.info("No order data for last 90 days.")
 
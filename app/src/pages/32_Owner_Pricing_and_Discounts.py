@@ -27,9 +27,7 @@ with f1: regions = st.text_input("Regions (comma-sep)", "Gainesville")
 with f2: status = st.selectbox("Status / Type", ["any","free","inuse","planned","w.issue"], index=0)
 with f3: pmin = st.number_input("Min price", 0, 10_000, 0)
 with f4: pmax = st.number_input("Max price", 0, 10_000, 0)
-m1, m2 = st.columns(2)
-with m1: min_views = st.number_input("Min estView/Month", 0, 10_000_000, 0)
-with m2: limit_preview = st.slider("Preview limit", 10, 2000, 200, 10)
+min_views = st.number_input("Min estView/Month", 0, 10_000_000, 0)
 
 filters = {
     "regions": [x.strip() for x in regions.split(",") if x.strip()],
@@ -50,52 +48,26 @@ else:
     new_price = st.number_input("Set new price ($)", 0, 10_000, 500)
     action = {"set": int(new_price)}
 
-# Owner simulate endpoint first
-sc, sim = api("GET",
-    "/owner/price/simulate?" +
-    "&".join([
-        f"regions={requests.utils.quote(x)}" for x in filters["regions"]
-    ]) +
-    (f"&status={filters['status']}" if filters["status"] else "") +
-    (f"&price_min={filters['price_min']}" if filters["price_min"] is not None else "") +
-    (f"&price_max={filters['price_max']}" if filters["price_max"] is not None else "") +
-    (f"&min_views={filters['min_views']}" if filters["min_views"] is not None else "") +
-    (f"&percent={action['percent']}" if 'percent' in action else f"&set={action['set']}")
-)
+params = [("regions", r) for r in filters["regions"]]
+params += [(k, filters[k]) for k in ("status", "price_min", "price_max", "min_views") if filters[k] is not None]
+sc, sim = api("GET", "/owner/price/simulate", params=params + list(action.items()))
 
 if sc == 200 and isinstance(sim, dict):
     s1, s2, s3 = st.columns(3)
-    s1.metric("Affected spots", sim.get("affected", 0))
+    s1.metric("Affected spots", sim.get("affected", 0), help=f"{sim.get('matched', 0)} spot(s) match the filters")
     s2.metric("Current total $", f"{sim.get('current_total', 0):,.0f}")
     s3.metric("Projected total $", f"{sim.get('projected_total', 0):,.0f}")
 else:
-    # fallback: approximate preview using O&M spots summary
-    st.caption("Using O&M summary for preview (Owner simulate not available).")
-    qc, qd = api("GET", f"/o_and_m/spots/summary?limit={limit_preview}")
-    if qc == 200 and isinstance(qd, list) and qd:
-        df = pd.DataFrame(qd)
-        # apply filters locally when columns exist
-        if "address" in df.columns and filters["regions"]:
-            df = df[df["address"].fillna("").str.contains("|".join(filters["regions"]), case=False)]
-        if filters["status"] and "status" in df.columns:
-            df = df[df["status"] == filters["status"]]
-        if "price" in df.columns and filters["price_min"] is not None:
-            df = df[df["price"] >= filters["price_min"]]
-        if "price" in df.columns and filters["price_max"] is not None and filters["price_max"] > 0:
-            df = df[df["price"] <= filters["price_max"]]
-        affected = len(df)
-        current_total = int(df["price"].sum()) if "price" in df.columns else 0
-        if 'percent' in action:
-            projected_total = int((df["price"] * (1 + action['percent']/100.0)).sum()) if "price" in df.columns else current_total
-        else:
-            projected_total = int(len(df) * action['set'])
-        s1, s2, s3 = st.columns(3)
-        s1.metric("Affected spots (approx)", affected)
-        s2.metric("Current total $ (approx)", f"{current_total:,.0f}")
-        s3.metric("Projected total $ (approx)", f"{projected_total:,.0f}")
-        st.dataframe(df.head(50), use_container_width=True, hide_index=True)
+    st.error(f"Simulation unavailable: {sc} {sim}")
+
+with st.expander("Sweep -20% .. +50%"):
+    wc, wd = api("GET", "/owner/price/simulate", params=params + [("sweep", "-20:50:5")])
+    if wc == 200 and isinstance(wd, dict) and wd.get("scenarios"):
+        dfW = pd.DataFrame(wd["scenarios"]).set_index("percent")
+        st.line_chart(dfW[["projected_total"]])
+        st.dataframe(dfW[["affected","projected_total","delta"]], use_container_width=True)
     else:
-        st.info("No preview available.")
+        st.info("No sweep available.")
 
 # ---- Commit panel ----
 st.divider()
@@ -59,26 +59,7 @@ with tab1:
 with tab2:
     st.subheader("Scores (90d)")
     sc, sd = api("GET", "/owner/customers/scores?period=90d")
-    if sc == 200 and isinstance(sd, list) and sd:
-        df = pd.DataFrame(sd)
-    else:
-        # fallback: compute from orders summary
-        oc, od = api("GET", "/o_and_m/orders/summary?period=90d&limit=10000")
-        if oc == 200 and isinstance(od, list) and od:
-            dfO = pd.DataFrame(od)
-            if {"cID","total"}.issubset(dfO.columns):
-                spend = dfO.groupby("cID")["total"].sum().rename("spend_90d")
-                freq = dfO.groupby("cID")["total"].size().rename("orders_90d")
-                df = pd.concat([spend, freq], axis=1).reset_index()
-                # simple score: 70% spend rank + 30% freq rank (0..100)
-                df["rank_spend"] = 100 * (df["spend_90d"].rank(pct=True))
-                df["rank_freq"]  = 100 * (df["orders_90d"].rank(pct=True))
-                df["score"] = (0.7*df["rank_spend"] + 0.3*df["rank_freq"]).round(1)
-                df["category"] = pd.cut(df["score"], bins=[-1,40,70,90,100], labels=["Low","Med","High","VIP"])
-            else:
-                df = pd.DataFrame()
-        else:
-            df = pd.DataFrame()
+    df = pd.DataFrame(sd) if (sc == 200 and isinstance(sd, list)) else pd.DataFrame()
 
     if not df.empty:
         st.dataframe(df.sort_values("score", ascending=False).head(50), use_container_width=True, hide_index=True)
@@ -86,22 +67,12 @@ with tab2:
         promote_ids = df.loc[df["score"] >= thresh, "cID"].astype(int).tolist()
         st.caption(f"{len(promote_ids)} candidate(s) at/above threshold.")
         if st.button("Promote selected to VIP", type="primary") and promote_ids:
-            ok, fail = 0, 0
-            for cid in promote_ids:
-                pc, pd = api("PUT", f"/owner/customers/{cid}/vip", json={"VIP": True})
-                if pc == 404:  # fallback: use customer update endpoint
-                    # pull current customer, then post with VIP=true plus required fields
-                    gc, gd = api("GET", f"/customer/{cid}")
-                    if gc == 200 and isinstance(gd, dict):
-                        body = gd.copy(); body["VIP"] = True
-                        uc, ud = api("POST", f"/customer/{cid}", json=body)
-                        ok += 1 if uc == 200 else 0; fail += 1 if uc != 200 else 0
-                    else:
-                        fail += 1
-                else:
-                    ok += 1 if pc in (200,201) else 0
-                    fail += 1 if pc not in (200,201) else 0
-            st.success(f"VIP updated. Success: {ok}, Fail: {fail}")
+            vc, vd = api("POST", "/owner/customers/vip", json={"ids": promote_ids, "VIP": True})
+            if vc == 200 and isinstance(vd, dict):
+                st.success(f"VIP updated: {vd.get('updated', 0)}, already VIP: {vd.get('unchanged', 0)}, "
+                           f"not found: {len(vd.get('missing', []))}")
+            else:
+                st.error(f"{vc} {vd}")
     else:
         st.info("No score data available.")
 
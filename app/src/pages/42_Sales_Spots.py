@@ -20,12 +20,25 @@ def api(method, path, **kw):
     except Exception as e:
         return 0, {"error": str(e)}
 
+def api_frame(path: str):
+    """GET a list endpoint as a DataFrame via ?format=arrow, falling back to JSON."""
+    sep = "&" if "?" in path else "?"
+    try:
+        import pyarrow as pa  # ships with streamlit
+        r = requests.get(f"{API}/{path.lstrip('/')}{sep}format=arrow", timeout=25)
+        if r.status_code == 200 and r.headers.get("content-type", "").startswith("application/vnd.apache.arrow"):
+            return 200, pa.ipc.open_stream(r.content).read_pandas()
+    except Exception:
+        pass
+    code, data = api("GET", path)
+    return code, pd.DataFrame(data) if code == 200 and isinstance(data, list) else data
+
 # Load spots (O&M summary gives all)
-code, data = api("GET", "/o_and_m/spots/summary?limit=10000")
-if code != 200 or not isinstance(data, list):
-    st.error(f"Failed to load spots: {code} {data}")
+code, df = api_frame("/o_and_m/spots/summary?limit=10000")
+if code != 200 or not isinstance(df, pd.DataFrame):
+    st.error(f"Failed to load spots: {code} {df}")
     st.stop()
-df = pd.DataFrame(data).rename(columns={"latitude":"lat","longitude":"lng"})
+df = df.rename(columns={"latitude":"lat","longitude":"lng"})
 if df.empty:
     st.info("No spots found.")
     st.stop()
@@ -25,6 +25,7 @@ CREATE TABLE IF NOT EXISTS Customers (
   avatarURL VARCHAR(100),
   balance DECIMAL(10,2),
   TEL VARCHAR(20),
+  FULLTEXT KEY ft_customer_search (fName, lName, email, companyName),
   updated_by_eID INT NULL,
   updated_at TIMESTAMP NULL,
   FOREIGN KEY (updated_by_eID) REFERENCES Employee(eID)
@@ -43,6 +44,7 @@ CREATE TABLE IF NOT EXISTS Spot (
   address VARCHAR(100),
   latitude DOUBLE,
   longitude DOUBLE,
+  region VARCHAR(40) NULL,
   FULLTEXT KEY ft_address (address),
   updated_by_eID INT NULL,
   updated_at TIMESTAMP NULL,
@@ -69,6 +71,7 @@ CREATE TABLE IF NOT EXISTS Reviews (
 
 CREATE TABLE IF NOT EXISTS Orders (
   orderID INT AUTO_INCREMENT PRIMARY KEY,
+  date DATE NOT NULL,
   total DECIMAL(10,2) NOT NULL DEFAULT 0.00,
   cID INT NOT NULL,
   status ENUM('pending','active','scheduled','fulfilled','canceled') NOT NULL DEFAULT 'pending',
@@ -99,6 +102,19 @@ CREATE TABLE IF NOT EXISTS SpotOrder (
     ON UPDATE CASCADE ON DELETE SET NULL
 );
 
+CREATE TABLE IF NOT EXISTS ProcessedOrder (
+  orderID INT NOT NULL PRIMARY KEY,
+  processorID INT NULL,
+  processTime DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (orderID) REFERENCES Orders(orderID) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS ToBeProcessedOrder (
+  orderID INT NOT NULL PRIMARY KEY,
+  status VARCHAR(20) NULL,
+  FOREIGN KEY (orderID) REFERENCES Orders(orderID) ON UPDATE CASCADE ON DELETE CASCADE
+);
+
 CREATE INDEX idx_orders_cid       ON Orders(cID);
 CREATE INDEX idx_orders_processed ON Orders(processed_at);
 CREATE INDEX idx_spotorder_order  ON SpotOrder(orderID);
@@ -106,3 +122,16 @@ CREATE INDEX idx_spotorder_spot   ON SpotOrder(spotID);
 CREATE INDEX idx_spot_dates       ON SpotOrder(spotID, lease_start_date, lease_end_date);
 CREATE INDEX idx_reviews_spot     ON Reviews(spotID);
 CREATE INDEX idx_reviews_cid      ON Reviews(cID);
+CREATE INDEX idx_spot_lat_lon     ON Spot(latitude, longitude);
+CREATE INDEX idx_spot_status      ON Spot(status);
+
+-- keyset pagination: each page of /orders, /processed_orders is an index range scan
+CREATE INDEX idx_orders_date_page ON Orders(date, orderID, cID, total);
+CREATE INDEX idx_orders_cid_date  ON Orders(cID, date, orderID);
+CREATE INDEX idx_processed_time   ON ProcessedOrder(processTime, orderID, processorID);
+
+-- customer search: exact email lookups; word search goes through ft_customer_search
+CREATE INDEX idx_customers_email  ON Customers(email);
+
+-- region rollup / region filters: one range per region, status for in-use share
+CREATE INDEX idx_spot_region      ON Spot(region, status);
@@ -0,0 +1,206 @@
+-- Materialized dashboard counters.
+--
+-- KpiCounters holds one row per KPI (name -> value). Triggers on Spot,
+-- Customers, Orders and Reviews keep the rows current on every
+-- insert/update/delete, so the metrics endpoints read a handful of rows
+-- instead of scanning whole tables. kpi_recount*() rebuild the counters
+-- from the base tables (used once below after seeding, and by ?fresh=1).
+--
+-- Counter names:
+--   spots_total, spot_status:<status>          ('spot_status:' = NULL status)
+--   customers_total, customers_vip, customers_with_orders,
+--   customers_last_order_days_sum              (SUM of TO_DAYS(last order date))
+--   orders_total, orders_amount_sum
+--   reviews_total
+USE `SpotLight`;
+
+CREATE TABLE IF NOT EXISTS KpiCounters (
+  name VARCHAR(64) NOT NULL PRIMARY KEY,
+  value DECIMAL(20,2) NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+DELIMITER //
+
+DROP PROCEDURE IF EXISTS kpi_bump //
+CREATE PROCEDURE kpi_bump(IN p_name VARCHAR(64), IN p_delta DECIMAL(20,2))
+BEGIN
+  IF p_delta <> 0 THEN
+    INSERT INTO KpiCounters (name, value) VALUES (p_name, p_delta)
+      ON DUPLICATE KEY UPDATE value = value + p_delta;
+  END IF;
+END //
+
+-- A customer's most recent order date moved from p_before to p_after (either may be NULL)
+DROP PROCEDURE IF EXISTS kpi_last_order_moved //
+CREATE PROCEDURE kpi_last_order_moved(IN p_before DATE, IN p_after DATE)
+BEGIN
+  IF p_before IS NULL AND p_after IS NOT NULL THEN
+    CALL kpi_bump('customers_with_orders', 1);
+    CALL kpi_bump('customers_last_order_days_sum', TO_DAYS(p_after));
+  ELSEIF p_before IS NOT NULL AND p_after IS NULL THEN
+    CALL kpi_bump('customers_with_orders', -1);
+    CALL kpi_bump('customers_last_order_days_sum', -TO_DAYS(p_before));
+  ELSEIF p_before IS NOT NULL AND p_after IS NOT NULL THEN
+    CALL kpi_bump('customers_last_order_days_sum', TO_DAYS(p_after) - TO_DAYS(p_before));
+  END IF;
+END //
+
+-- ---------------------------- recounts ----------------------------
+
+DROP PROCEDURE IF EXISTS kpi_recount_spots //
+CREATE PROCEDURE kpi_recount_spots()
+BEGIN
+  DELETE FROM KpiCounters WHERE name = 'spots_total' OR name LIKE 'spot\_status:%';
+  INSERT INTO KpiCounters (name, value)
+    SELECT 'spots_total', COUNT(*) FROM Spot;
+  INSERT INTO KpiCounters (name, value)
+    SELECT CONCAT('spot_status:', COALESCE(status, '')), COUNT(*) FROM Spot GROUP BY status;
+END //
+
+DROP PROCEDURE IF EXISTS kpi_recount_customers //
+CREATE PROCEDURE kpi_recount_customers()
+BEGIN
+  DELETE FROM KpiCounters WHERE name LIKE 'customers\_%';
+  INSERT INTO KpiCounters (name, value)
+    SELECT 'customers_total', COUNT(*) FROM Customers
+    UNION ALL SELECT 'customers_vip', COUNT(*) FROM Customers WHERE VIP = 1;
+  INSERT INTO KpiCounters (name, value)
+    SELECT 'customers_with_orders', COUNT(*) FROM (SELECT cID FROM Orders GROUP BY cID) t
+    UNION ALL
+    SELECT 'customers_last_order_days_sum', COALESCE(SUM(TO_DAYS(last_date)), 0)
+      FROM (SELECT MAX(date) AS last_date FROM Orders GROUP BY cID) t;
+END //
+
+DROP PROCEDURE IF EXISTS kpi_recount_orders //
+CREATE PROCEDURE kpi_recount_orders()
+BEGIN
+  DELETE FROM KpiCounters WHERE name LIKE 'orders\_%';
+  INSERT INTO KpiCounters (name, value)
+    SELECT 'orders_total', COUNT(*) FROM Orders
+    UNION ALL SELECT 'orders_amount_sum', COALESCE(SUM(total), 0) FROM Orders;
+END //
+
+DROP PROCEDURE IF EXISTS kpi_recount_reviews //
+CREATE PROCEDURE kpi_recount_reviews()
+BEGIN
+  DELETE FROM KpiCounters WHERE name = 'reviews_total';
+  INSERT INTO KpiCounters (name, value) SELECT 'reviews_total', COUNT(*) FROM Reviews;
+END //
+
+DROP PROCEDURE IF EXISTS kpi_recount //
+CREATE PROCEDURE kpi_recount()
+BEGIN
+  CALL kpi_recount_spots();
+  CALL kpi_recount_customers();
+  CALL kpi_recount_orders();
+  CALL kpi_recount_reviews();
+END //
+
+-- ---------------------------- Spot ----------------------------
+
+DROP TRIGGER IF EXISTS trg_kpi_spot_ins //
+CREATE TRIGGER trg_kpi_spot_ins AFTER INSERT ON Spot FOR EACH ROW
+BEGIN
+  CALL kpi_bump('spots_total', 1);
+  CALL kpi_bump(CONCAT('spot_status:', COALESCE(NEW.status, '')), 1);
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_spot_del //
+CREATE TRIGGER trg_kpi_spot_del AFTER DELETE ON Spot FOR EACH ROW
+BEGIN
+  CALL kpi_bump('spots_total', -1);
+  CALL kpi_bump(CONCAT('spot_status:', COALESCE(OLD.status, '')), -1);
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_spot_upd //
+CREATE TRIGGER trg_kpi_spot_upd AFTER UPDATE ON Spot FOR EACH ROW
+BEGIN
+  IF NOT (NEW.status <=> OLD.status) THEN
+    CALL kpi_bump(CONCAT('spot_status:', COALESCE(OLD.status, '')), -1);
+    CALL kpi_bump(CONCAT('spot_status:', COALESCE(NEW.status, '')), 1);
+  END IF;
+END //
+
+-- ---------------------------- Customers ----------------------------
+
+DROP TRIGGER IF EXISTS trg_kpi_customers_ins //
+CREATE TRIGGER trg_kpi_customers_ins AFTER INSERT ON Customers FOR EACH ROW
+BEGIN
+  CALL kpi_bump('customers_total', 1);
+  CALL kpi_bump('customers_vip', IF(NEW.VIP = 1, 1, 0));
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_customers_del //
+CREATE TRIGGER trg_kpi_customers_del AFTER DELETE ON Customers FOR EACH ROW
+BEGIN
+  CALL kpi_bump('customers_total', -1);
+  CALL kpi_bump('customers_vip', IF(OLD.VIP = 1, -1, 0));
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_customers_upd //
+CREATE TRIGGER trg_kpi_customers_upd AFTER UPDATE ON Customers FOR EACH ROW
+BEGIN
+  CALL kpi_bump('customers_vip', IF(NEW.VIP = 1, 1, 0) - IF(OLD.VIP = 1, 1, 0));
+END //
+
+-- ---------------------------- Orders ----------------------------
+-- Besides count/sum, track each customer's last order date so that
+-- "never ordered" and "avg days since last order" need no scan.
+
+DROP TRIGGER IF EXISTS trg_kpi_orders_ins //
+CREATE TRIGGER trg_kpi_orders_ins AFTER INSERT ON Orders FOR EACH ROW
+BEGIN
+  DECLARE prev_last DATE;
+  SELECT MAX(date) INTO prev_last FROM Orders WHERE cID = NEW.cID AND orderID <> NEW.orderID;
+  CALL kpi_last_order_moved(prev_last, GREATEST(COALESCE(prev_last, NEW.date), NEW.date));
+  CALL kpi_bump('orders_total', 1);
+  CALL kpi_bump('orders_amount_sum', NEW.total);
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_orders_del //
+CREATE TRIGGER trg_kpi_orders_del AFTER DELETE ON Orders FOR EACH ROW
+BEGIN
+  DECLARE now_last DATE;
+  SELECT MAX(date) INTO now_last FROM Orders WHERE cID = OLD.cID;
+  CALL kpi_last_order_moved(GREATEST(COALESCE(now_last, OLD.date), OLD.date), now_last);
+  CALL kpi_bump('orders_total', -1);
+  CALL kpi_bump('orders_amount_sum', -OLD.total);
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_orders_upd //
+CREATE TRIGGER trg_kpi_orders_upd AFTER UPDATE ON Orders FOR EACH ROW
+BEGIN
+  DECLARE others_last DATE;
+  CALL kpi_bump('orders_amount_sum', NEW.total - OLD.total);
+  IF NEW.cID <> OLD.cID OR NEW.date <> OLD.date THEN
+    -- the old customer's last date, before and after this row changed
+    SELECT MAX(date) INTO others_last FROM Orders WHERE cID = OLD.cID AND orderID <> NEW.orderID;
+    CALL kpi_last_order_moved(
+      GREATEST(COALESCE(others_last, OLD.date), OLD.date),
+      IF(NEW.cID = OLD.cID, GREATEST(COALESCE(others_last, NEW.date), NEW.date), others_last)
+    );
+    IF NEW.cID <> OLD.cID THEN
+      SELECT MAX(date) INTO others_last FROM Orders WHERE cID = NEW.cID AND orderID <> NEW.orderID;
+      CALL kpi_last_order_moved(others_last, GREATEST(COALESCE(others_last, NEW.date), NEW.date));
+    END IF;
+  END IF;
+END //
+
+-- ---------------------------- Reviews ----------------------------
+
+DROP TRIGGER IF EXISTS trg_kpi_reviews_ins //
+CREATE TRIGGER trg_kpi_reviews_ins AFTER INSERT ON Reviews FOR EACH ROW
+BEGIN
+  CALL kpi_bump('reviews_total', 1);
+END //
+
+DROP TRIGGER IF EXISTS trg_kpi_reviews_del //
+CREATE TRIGGER trg_kpi_reviews_del AFTER DELETE ON Reviews FOR EACH ROW
+BEGIN
+  CALL kpi_bump('reviews_total', -1);
+END //
+
+DELIMITER ;
+
+CALL kpi_recount();
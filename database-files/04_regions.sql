@@ -0,0 +1,88 @@
+-- Spot regions and the daily region rollup.
+--
+-- Spot.region is assigned by spot_region(): the address's city quadrant
+-- (NW/NE/SW/SE) when it names one, otherwise the 0.05-degree lat/lon grid
+-- cell the spot sits in ("grid 29.65,-82.35"), otherwise NULL. BEFORE
+-- triggers keep it current on every insert/update, so no write path has
+-- to remember to set it.
+--
+-- RegionDaily holds orders and spot revenue (SpotOrder.spot_cost) per
+-- region and order day, for every day before today. region_daily_rebuild()
+-- recomputes it in one grouped Orders x SpotOrder x Spot pass and records
+-- the day it ran in KpiCounters ('region_daily_day' = TO_DAYS(CURDATE())).
+-- The ev_region_daily event runs it after midnight, and POST
+-- /owner/regions/rollup/refresh runs it on demand. /owner/regions/rollup
+-- only reads: it adds today's orders live and reports stale=true when the
+-- marker is older than today (e.g. the event scheduler is off).
+USE `SpotLight`;
+
+CREATE TABLE IF NOT EXISTS RegionDaily (
+  region VARCHAR(40) NOT NULL DEFAULT '',
+  day DATE NOT NULL,
+  orders INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, region)
+);
+
+DELIMITER //
+
+DROP FUNCTION IF EXISTS spot_region //
+CREATE FUNCTION spot_region(p_address VARCHAR(100), p_lat DOUBLE, p_lon DOUBLE)
+RETURNS VARCHAR(40) DETERMINISTIC NO SQL
+BEGIN
+  DECLARE quadrant VARCHAR(2);
+  SET quadrant = REGEXP_SUBSTR(UPPER(COALESCE(p_address, '')), '\\b(NW|NE|SW|SE)\\b');
+  IF quadrant IS NOT NULL THEN
+    RETURN quadrant;
+  END IF;
+  IF p_lat IS NULL OR p_lon IS NULL THEN
+    RETURN NULL;
+  END IF;
+  RETURN CONCAT('grid ',
+                CAST(FLOOR(p_lat / 0.05) * 0.05 AS DECIMAL(6,2)), ',',
+                CAST(FLOOR(p_lon / 0.05) * 0.05 AS DECIMAL(6,2)));
+END //
+
+DROP TRIGGER IF EXISTS trg_spot_region_ins //
+CREATE TRIGGER trg_spot_region_ins BEFORE INSERT ON Spot FOR EACH ROW
+BEGIN
+  SET NEW.region = spot_region(NEW.address, NEW.latitude, NEW.longitude);
+END //
+
+DROP TRIGGER IF EXISTS trg_spot_region_upd //
+CREATE TRIGGER trg_spot_region_upd BEFORE UPDATE ON Spot FOR EACH ROW
+BEGIN
+  IF NOT (NEW.address <=> OLD.address AND NEW.latitude <=> OLD.latitude
+          AND NEW.longitude <=> OLD.longitude) THEN
+    SET NEW.region = spot_region(NEW.address, NEW.latitude, NEW.longitude);
+  END IF;
+END //
+
+DROP PROCEDURE IF EXISTS region_daily_rebuild //
+CREATE PROCEDURE region_daily_rebuild()
+BEGIN
+  START TRANSACTION;
+  DELETE FROM RegionDaily;
+  INSERT INTO RegionDaily (region, day, orders, revenue)
+    SELECT COALESCE(s.region, ''), o.date, COUNT(DISTINCT o.orderID), COALESCE(SUM(so.spot_cost), 0)
+    FROM Orders o
+    JOIN SpotOrder so ON so.orderID = o.orderID
+    JOIN Spot s ON s.spotID = so.spotID
+    WHERE o.date < CURDATE()
+    GROUP BY COALESCE(s.region, ''), o.date;
+  INSERT INTO KpiCounters (name, value) VALUES ('region_daily_day', TO_DAYS(CURDATE()))
+    ON DUPLICATE KEY UPDATE value = VALUES(value);
+  COMMIT;
+END //
+
+DROP EVENT IF EXISTS ev_region_daily //
+CREATE EVENT ev_region_daily
+  ON SCHEDULE EVERY 1 DAY STARTS (CURRENT_DATE + INTERVAL 1 DAY + INTERVAL 5 MINUTE)
+  DO CALL region_daily_rebuild() //
+
+DELIMITER ;
+
+-- spots seeded before the triggers existed
+UPDATE Spot SET region = spot_region(address, latitude, longitude);
+
+CALL region_daily_rebuild();